@@ -3,97 +3,684 @@ Password Generator - Flask Application
 A secure password generator with REST API
 """
 
-from flask import Flask, render_template, jsonify, request
-from datetime import datetime
-import secrets
-import string
+from flask import (Blueprint, Flask, Response, current_app, render_template,
+                   jsonify, url_for)
+import hashlib
+from itertools import product
+from types import MappingProxyType
 import os
 
-app = Flask(__name__)
+import assets
+import autotune
+import breach
+from charsets import custom_charset, get_charset, option_set_name
+import entropy
+from engine import random_string
+import jsonprovider
+from jsonprovider import Fragment, encode
+import metrics
+from passphrase import MAX_WORDS, MIN_WORDS, check_separator, generate_passphrase
+from patterns import MAX_TEMPLATE_LENGTH, compile_pattern
+from policy import CLASSES, compile_policy, required_length
+import pronounceable
+from probes import PROBE_REFRESH_SECONDS, ProbeResponses, self_test
+import ratelimit
+import validation
+from strength import score_passwords
+from pool import (PasswordPool, POOL_ENABLED, POOL_LOW_WATERMARK,
+                  POOL_OPTION_SETS, POOL_SIZE, parse_option_sets)
+
+# Longest password the generation endpoints accept
+MAX_LENGTH = 128
 
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 HOST = os.getenv('HOST', '0.0.0.0')
 PORT = int(os.getenv('PORT', 5000))
 
-APP_VERSION = os.getenv('APP_VERSION', 'unknown')
+
+class Config:
+    """Settings read from the environment once, when the module is imported"""
+    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    DEBUG = DEBUG
+    APP_VERSION = os.getenv('APP_VERSION', 'unknown')
+    ENVIRONMENT = os.getenv('FLASK_ENV', 'development')
+    MAX_BATCH_COUNT = int(os.getenv('MAX_BATCH_COUNT', 50000))
+    MAX_STREAM_COUNT = int(os.getenv('MAX_STREAM_COUNT', 10000000))
+    STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 1000))
+    PASSWORD_POOL_ENABLED = POOL_ENABLED
+    PASSWORD_POOL_SIZE = POOL_SIZE
+    PASSWORD_POOL_LOW_WATERMARK = POOL_LOW_WATERMARK
+    PASSWORD_POOL_OPTION_SETS = POOL_OPTION_SETS
+    PROBE_REFRESH_SECONDS = PROBE_REFRESH_SECONDS
+    SERVER_PLAN = autotune.plan_from_env()
+    MAX_CONTENT_LENGTH = validation.MAX_REQUEST_BYTES
+    JSON_PROVIDER = jsonprovider.JSON_PROVIDER
+    RATE_LIMIT_ENABLED = ratelimit.RATE_LIMIT_ENABLED
+    RATE_LIMIT_RATE = ratelimit.RATE_LIMIT_RATE
+    RATE_LIMIT_BURST = ratelimit.RATE_LIMIT_BURST
+    RATE_LIMIT_COST_UNIT = ratelimit.RATE_LIMIT_COST_UNIT
+    RATE_LIMIT_DIR = ratelimit.RATE_LIMIT_DIR
+    RATE_LIMIT_SLOTS = ratelimit.RATE_LIMIT_SLOTS
+    RATE_LIMIT_API_KEYS = ratelimit.RATE_LIMIT_API_KEYS
+    BREACH_FILTER_PATH = breach.BREACH_FILTER_PATH
+    BREACH_MAX_ATTEMPTS = breach.BREACH_MAX_ATTEMPTS
+
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'text': 'text/plain',
+}
+
+
+def _select_charset(use_uppercase, use_lowercase, use_digits, use_symbols,
+                   alphabet=None):
+    if alphabet is not None:
+        return custom_charset(alphabet)
+    return get_charset(use_uppercase, use_lowercase, use_digits, use_symbols)
 
 
 def generate_password(length=12, use_uppercase=True, use_lowercase=True,
-                     use_digits=True, use_symbols=True):
-    characters = ''
-    if use_lowercase:
-        characters += string.ascii_lowercase
-    if use_uppercase:
-        characters += string.ascii_uppercase
-    if use_digits:
-        characters += string.digits
-    if use_symbols:
-        characters += string.punctuation
-    if not characters:
-        characters = string.ascii_letters + string.digits + string.punctuation
-    password = ''.join(secrets.choice(characters) for _ in range(length))
+                     use_digits=True, use_symbols=True, alphabet=None, policy=None,
+                     pattern=None):
+    if pattern is not None:
+        return pattern.generate()
+    if policy is not None:
+        return policy.generate(length)
+    charset = _select_charset(use_uppercase, use_lowercase, use_digits,
+                              use_symbols, alphabet)
+    password = random_string(charset, length)
     return password
 
 
-@app.route('/health')
+def generate_passwords(count, length=12, use_uppercase=True, use_lowercase=True,
+                       use_digits=True, use_symbols=True, alphabet=None, policy=None,
+                       pattern=None):
+    if pattern is not None:
+        return pattern.generate_many(count)
+    if policy is not None:
+        return policy.generate_many(count, length)
+    charset = _select_charset(use_uppercase, use_lowercase, use_digits,
+                              use_symbols, alphabet)
+    block = random_string(charset, count * length)
+    return [block[start:start + length]
+            for start in range(0, count * length, length)]
+
+
+def _option_label(use_uppercase, use_lowercase, use_digits, use_symbols, alphabet,
+                  policy=None, pattern=None):
+    if pattern is not None:
+        return 'pattern'
+    if alphabet is not None:
+        return 'custom'
+    if policy is not None:
+        return 'policy'
+    return option_set_name(use_uppercase, use_lowercase, use_digits, use_symbols)
+
+
+def _breach_check():
+    return (current_app.extensions.get('breach_filter'),
+            current_app.config['BREACH_MAX_ATTEMPTS'])
+
+
+def _unbreached(passwords, regenerate, breach_filter, max_attempts):
+    """Replace passwords found in the breach filter.
+
+    ``regenerate(count)`` returns fresh candidates; every round replaces
+    the remaining breached passwords, so options that only produce breached
+    passwords (say, four digits) are refused instead of looping forever.
+    """
+    if breach_filter is None:
+        return passwords
+    kept = breach_filter.exclude(passwords)
+    for _ in range(max_attempts):
+        if len(kept) == len(passwords):
+            break
+        metrics.inc_counter('breached_passwords_total', (('source', 'generated'),),
+                            len(passwords) - len(kept))
+        kept.extend(breach_filter.exclude(regenerate(len(passwords) - len(kept))))
+    else:
+        if len(kept) < len(passwords):
+            raise validation.ValidationError.for_field(
+                None, 'these options keep producing breached passwords; '
+                      'use a longer length or more character types')
+    return kept
+
+
+def _generate_for_pool(count, key):
+    length, use_uppercase, use_lowercase, use_digits, use_symbols = key
+    return generate_passwords(count, length, use_uppercase, use_lowercase,
+                              use_digits, use_symbols)
+
+
+def _alphabet(value):
+    custom_charset(value)
+    return value
+
+
+def _separator(value):
+    if type(value) is not str:
+        raise ValueError('must be a string')
+    return check_separator(value)
+
+
+def _min_counts(value):
+    if not all(type(count) is int and 0 <= count <= MAX_LENGTH for count in value.values()):
+        raise ValueError(f'must map class names to integers between 0 and {MAX_LENGTH}')
+    return value
+
+
+POLICY_SCHEMA = validation.Schema({
+    'min_counts': (validation.all_of(validation.obj(), _min_counts), {}),
+    'exclude_ambiguous': (validation.boolean(), False),
+    'no_repeats': (validation.boolean(), False),
+    'prefix': (validation.choice(*CLASSES), None),
+    'suffix': (validation.choice(*CLASSES), None),
+})
+
+PASSWORD_FIELDS = {
+    'length': (validation.integer(4, MAX_LENGTH), 12),
+    'uppercase': (validation.boolean(), True),
+    'lowercase': (validation.boolean(), True),
+    'digits': (validation.boolean(), True),
+    'symbols': (validation.boolean(), True),
+    'alphabet': (validation.all_of(validation.string(1024, 1), _alphabet), None),
+    'policy': (validation.obj(), None),
+    'pattern': (validation.string(MAX_TEMPLATE_LENGTH, 1), None),
+}
+
+GENERATE_SCHEMA = validation.Schema(dict(
+    PASSWORD_FIELDS,
+    mode=(validation.choice('password', 'passphrase', 'pronounceable'), 'password'),
+    words=(validation.integer(MIN_WORDS, MAX_WORDS), 6),
+    separator=(_separator, '-'),
+    capitalize=(validation.boolean(), False),
+    include_digit=(validation.boolean(), False),
+    include_symbol=(validation.boolean(), False),
+))
+
+BATCH_SCHEMA = validation.Schema(dict(
+    PASSWORD_FIELDS,
+    count=(validation.integer(1), 10),
+))
+
+STREAM_SCHEMA = validation.Schema(dict(
+    PASSWORD_FIELDS,
+    count=(validation.integer(1), 1000),
+    format=(validation.choice(*STREAM_FORMATS), 'ndjson'),
+))
+
+STRENGTH_SCHEMA = validation.Schema({
+    'password': (validation.string(4096, 1), None),
+    'passwords': (validation.string_list(), None),
+    'options': (validation.obj(), None),
+})
+
+
+def _parse_policy(data):
+    """Compile the validated ``policy`` field, or None when absent."""
+    policy = data['policy']
+    if policy is None:
+        return None
+    if data['alphabet'] is not None:
+        raise validation.ValidationError.for_field(
+            'policy', 'cannot be combined with a custom alphabet')
+    try:
+        rules = POLICY_SCHEMA.validate(policy)
+    except validation.ValidationError as e:
+        raise validation.ValidationError([
+            {'field': f"policy.{detail['field']}", 'message': detail['message']}
+            for detail in e.details])
+    # Checked before compiling so impossible rules never reach the policy cache
+    min_length = required_length(rules['min_counts'], rules['prefix'], rules['suffix'])
+    if data['length'] < min_length:
+        raise validation.ValidationError.for_field(
+            'length', f'policy needs a length of at least {min_length}')
+    flags = (('uppercase', data['uppercase']), ('lowercase', data['lowercase']),
+             ('digits', data['digits']), ('symbols', data['symbols']))
+    try:
+        compiled = compile_policy(
+            tuple(name for name, enabled in flags if enabled),
+            tuple(sorted(rules['min_counts'].items())),
+            rules['exclude_ambiguous'],
+            rules['no_repeats'],
+            rules['prefix'],
+            rules['suffix']
+        )
+    except ValueError as e:
+        raise validation.ValidationError.for_field('policy', str(e))
+    return compiled
+
+
+def _parse_pattern(data):
+    """Compiled (and cached) ``pattern`` template, or None when absent."""
+    if data['pattern'] is None:
+        return None
+    if data['alphabet'] is not None or data['policy'] is not None:
+        raise validation.ValidationError.for_field(
+            'pattern', 'cannot be combined with a custom alphabet or policy')
+    try:
+        return compile_pattern(data['pattern'])
+    except ValueError as e:
+        raise validation.ValidationError.for_field('pattern', str(e))
+
+
+def _options(data, policy):
+    options = {
+        'uppercase': data['uppercase'],
+        'lowercase': data['lowercase'],
+        'digits': data['digits'],
+        'symbols': data['symbols']
+    }
+    if data['alphabet'] is not None:
+        options['alphabet'] = data['alphabet']
+    if policy is not None:
+        options['policy'] = data['policy']
+    if data['pattern'] is not None:
+        options['pattern'] = data['pattern']
+    return options
+
+
+# "options" objects for every flag combination, encoded once instead of
+# being rebuilt and serialized on every response
+OPTIONS_FRAGMENTS = MappingProxyType({
+    flags: Fragment(dict(zip(('uppercase', 'lowercase', 'digits', 'symbols'), flags)))
+    for flags in product((False, True), repeat=4)
+})
+
+
+def _options_fragment(data, policy):
+    if data['alphabet'] is None and policy is None and data['pattern'] is None:
+        return OPTIONS_FRAGMENTS[(data['uppercase'], data['lowercase'],
+                                  data['digits'], data['symbols'])]
+    return _options(data, policy)
+
+
+bp = Blueprint('main', __name__)
+
+
+def _probe(name):
+    body, status = current_app.extensions['probes'].get(name)
+    return Response(body, status=status, mimetype='application/json',
+                    headers={'Cache-Control': 'no-store'})
+
+
+@bp.route('/health')
 def health():
-    return jsonify({
-        'status': 'healthy',
-        'service': 'password-generator',
-        'version': APP_VERSION,
-        'timestamp': str(datetime.now())
-    }), 200
+    return _probe('health')
 
 
-@app.route('/version')
+@bp.route('/health/live')
+def health_live():
+    return _probe('live')
+
+
+@bp.route('/health/ready')
+def health_ready():
+    return _probe('ready')
+
+
+@bp.route('/version')
 def version():
-    return jsonify({
-        'version': APP_VERSION,
-        'service': 'password-generator',
-        'environment': os.getenv('FLASK_ENV', 'development'),
-        'timestamp': str(datetime.now())
-    }), 200
+    return _probe('version')
 
 
-@app.route('/')
+@bp.route('/')
 def home():
-    return render_template('index.html')
+    page = current_app.extensions.get('home_page')
+    if page is None:
+        return render_template('index.html')
+    return assets.send_asset(page, assets.REVALIDATE)
 
 
-@app.route('/api/generate', methods=['POST'])
-def api_generate():
-    data = request.get_json() or {}
-    length = data.get('length', 12)
-    use_uppercase = data.get('uppercase', True)
-    use_lowercase = data.get('lowercase', True)
-    use_digits = data.get('digits', True)
-    use_symbols = data.get('symbols', True)
-
-    length = int(length)
-    length = max(4, min(128, length))
-
-    password = generate_password(
-        length=length,
-        use_uppercase=use_uppercase,
-        use_lowercase=use_lowercase,
-        use_digits=use_digits,
-        use_symbols=use_symbols
-    )
+# Static files the home page needs, cached by the service worker for offline use
+OFFLINE_ASSETS = ('style.css', 'script.js')
+
+
+def _render_service_worker():
+    """Render ``sw.js`` with the URLs to precache and a cache version.
+
+    The version hashes the page and the asset bodies, so any change to
+    either installs a new worker that replaces the old cache (the asset
+    URLs are not fingerprinted in debug mode).
+    """
+    home_url = url_for('main.home')
+    version = hashlib.sha256(render_template('index.html').encode('utf-8'))
+    for filename in OFFLINE_ASSETS:
+        with open(os.path.join(current_app.static_folder, filename), 'rb') as source:
+            version.update(source.read())
+    return render_template(
+        'sw.js', version=version.hexdigest()[:16], home=home_url,
+        precache=[home_url] + [assets.asset_url(filename) for filename in OFFLINE_ASSETS])
+
+
+@bp.route('/sw.js')
+def service_worker():
+    # Served from the root so its scope covers the whole site; never cached
+    # long, so browsers pick up new versions on the next visit
+    worker = current_app.extensions.get('service_worker')
+    if worker is None:
+        return Response(_render_service_worker(), mimetype='text/javascript',
+                        headers={'Cache-Control': assets.REVALIDATE})
+    return assets.send_asset(worker, assets.REVALIDATE)
+
+
+def _api_generate_passphrase(data):
+    words = data['words']
+
+    def generate(count):
+        return [generate_passphrase(
+            words=words,
+            separator=data['separator'],
+            capitalize=data['capitalize'],
+            include_digit=data['include_digit'],
+            include_symbol=data['include_symbol']
+        ) for _ in range(count)]
+
+    with metrics.time_generation(words, 'passphrase'):
+        (passphrase, entropy), = generate(1)
+    passphrase, = _unbreached([passphrase], lambda count: [p for p, _ in generate(count)],
+                              *_breach_check())
 
     return jsonify({
         'success': True,
-        'password': password,
-        'length': len(password),
+        'mode': 'passphrase',
+        'password': passphrase,
+        'length': len(passphrase),
+        'entropy': round(entropy, 2),
         'options': {
-            'uppercase': use_uppercase,
-            'lowercase': use_lowercase,
-            'digits': use_digits,
-            'symbols': use_symbols
+            'words': words,
+            'separator': data['separator'],
+            'capitalize': data['capitalize'],
+            'include_digit': data['include_digit'],
+            'include_symbol': data['include_symbol']
         }
     }), 200
 
 
+def _api_generate_pronounceable(data):
+    length = min(data['length'], pronounceable.MAX_LENGTH)
+
+    def generate(count):
+        return [pronounceable.generate_pronounceable(length)[0] for _ in range(count)]
+
+    with metrics.time_generation(length, 'pronounceable'):
+        password, shannon, min_entropy = pronounceable.generate_pronounceable(length)
+    password, = _unbreached([password], generate, *_breach_check())
+
+    return jsonify({
+        'success': True,
+        'mode': 'pronounceable',
+        'password': password,
+        'length': length,
+        'entropy': round(min_entropy, 2),
+        'shannon_entropy': round(shannon, 2)
+    }), 200
+
+
+@bp.route('/api/generate', methods=['POST'])
+def api_generate():
+    data = GENERATE_SCHEMA.validate(validation.json_body())
+    if data['mode'] == 'passphrase':
+        return _api_generate_passphrase(data)
+    if data['mode'] == 'pronounceable':
+        return _api_generate_pronounceable(data)
+
+    use_uppercase = data['uppercase']
+    use_lowercase = data['lowercase']
+    use_digits = data['digits']
+    use_symbols = data['symbols']
+    alphabet = data['alphabet']
+    policy = _parse_policy(data)
+    pattern = _parse_pattern(data)
+    length = data['length'] if pattern is None else pattern.length
+
+    password = None
+    password_pool = current_app.extensions.get('password_pool')
+    if (password_pool is not None and alphabet is None and policy is None
+            and pattern is None):
+        password = password_pool.take((length, use_uppercase, use_lowercase,
+                                       use_digits, use_symbols))
+    if password is None:
+        with metrics.time_generation(length, _option_label(
+                use_uppercase, use_lowercase, use_digits, use_symbols, alphabet, policy,
+                pattern)):
+            password = generate_password(
+                length=length,
+                use_uppercase=use_uppercase,
+                use_lowercase=use_lowercase,
+                use_digits=use_digits,
+                use_symbols=use_symbols,
+                alphabet=alphabet,
+                policy=policy,
+                pattern=pattern
+            )
+    password, = _unbreached([password], lambda count: generate_passwords(
+        count, length, use_uppercase, use_lowercase, use_digits, use_symbols,
+        alphabet, policy, pattern), *_breach_check())
+
+    response = {
+        'success': True,
+        'password': password,
+        'length': len(password),
+        'options': _options_fragment(data, policy)
+    }
+    if pattern is not None:
+        response['entropy'] = round(pattern.entropy, 2)
+    return jsonify(response), 200
+
+
+@bp.route('/api/generate/batch', methods=['POST'])
+def api_generate_batch():
+    data = BATCH_SCHEMA.validate(validation.json_body())
+    count = min(current_app.config['MAX_BATCH_COUNT'], data['count'])
+    policy = _parse_policy(data)
+    pattern = _parse_pattern(data)
+    length = data['length'] if pattern is None else pattern.length
+
+    def generate(count):
+        return generate_passwords(
+            count,
+            length=length,
+            use_uppercase=data['uppercase'],
+            use_lowercase=data['lowercase'],
+            use_digits=data['digits'],
+            use_symbols=data['symbols'],
+            alphabet=data['alphabet'],
+            policy=policy,
+            pattern=pattern
+        )
+
+    with metrics.time_generation(length, _option_label(
+            data['uppercase'], data['lowercase'], data['digits'], data['symbols'],
+            data['alphabet'], policy, pattern)):
+        passwords = generate(count)
+    passwords = _unbreached(passwords, generate, *_breach_check())
+
+    response = {
+        'success': True,
+        'passwords': passwords,
+        'count': len(passwords),
+        'length': length,
+        'options': _options_fragment(data, policy)
+    }
+    if pattern is not None:
+        response['entropy'] = round(pattern.entropy, 2)
+    return jsonify(response), 200
+
+
+def _stream_passwords(count, length, use_uppercase, use_lowercase, use_digits,
+                      use_symbols, alphabet, output_format, chunk_size, policy=None,
+                      breach_check=(None, 0), pattern=None, charge=None):
+    """Return an iterator over the stream's chunks.
+
+    The first chunk is generated and breach-checked before this returns, so
+    options that fail are refused with a normal error response instead of
+    an empty or truncated 200. Only one chunk is held in memory at a time;
+    if the client disconnects the WSGI server closes the iterator and no
+    further chunks are built.
+    """
+    def generate(count):
+        return generate_passwords(count, length, use_uppercase, use_lowercase,
+                                  use_digits, use_symbols, alphabet, policy, pattern)
+
+    option_label = _option_label(use_uppercase, use_lowercase, use_digits, use_symbols,
+                                 alphabet, policy, pattern)
+
+    def render(chunk_count):
+        if charge is not None:
+            charge(chunk_count)
+        with metrics.time_generation(length, option_label):
+            passwords = generate(chunk_count)
+        passwords = _unbreached(passwords, generate, *breach_check)
+        if output_format == 'ndjson':
+            lines = [f'{{"password":{encode(password).decode()}}}' for password in passwords]
+        else:
+            lines = passwords
+        lines.append('')
+        return '\n'.join(lines)
+
+    first_count = min(chunk_size, count)
+    first = render(first_count)
+
+    def chunks():
+        yield first
+        remaining = count - first_count
+        while remaining > 0:
+            chunk_count = min(chunk_size, remaining)
+            yield render(chunk_count)
+            remaining -= chunk_count
+
+    return chunks()
+
+
+@bp.route('/api/generate/stream', methods=['POST'])
+def api_generate_stream():
+    data = STREAM_SCHEMA.validate(validation.json_body())
+    count = min(current_app.config['MAX_STREAM_COUNT'], data['count'])
+    policy = _parse_policy(data)
+    pattern = _parse_pattern(data)
+    length = data['length'] if pattern is None else pattern.length
+
+    stream = _stream_passwords(count, length, data['uppercase'], data['lowercase'],
+                               data['digits'], data['symbols'], data['alphabet'],
+                               data['format'], current_app.config['STREAM_CHUNK_SIZE'],
+                               policy, _breach_check(), pattern,
+                               ratelimit.stream_meter(length))
+    return Response(stream, mimetype=STREAM_FORMATS[data['format']],
+                    headers={'X-Password-Count': str(count)})
+
+
+BREACHED_STRENGTH = MappingProxyType({
+    'score': 0,
+    'strength': 'very-weak',
+    'strength_text': 'Very Weak',
+    'warning_message': '⚠️ Found in a data breach! Never use this password.',
+})
+
+
+def _mark_breached(results, passwords, breach_filter):
+    breached = 0
+    for result, password in zip(results, passwords):
+        result['breached'] = password in breach_filter
+        if result['breached']:
+            result.update(BREACHED_STRENGTH)
+            breached += 1
+    if breached:
+        metrics.inc_counter('breached_passwords_total', (('source', 'submitted'),), breached)
+
+
+@bp.route('/api/strength', methods=['POST'])
+def api_strength():
+    data = STRENGTH_SCHEMA.validate(validation.json_body())
+    passwords = data['passwords']
+    if passwords is None:
+        if data['password'] is None:
+            raise validation.ValidationError.for_field('password', 'is required')
+        passwords = [data['password']]
+    else:
+        max_count = current_app.config['MAX_BATCH_COUNT']
+        if len(passwords) > max_count:
+            raise validation.ValidationError.for_field(
+                'passwords', f'must contain at most {max_count} passwords')
+
+    results = score_passwords(passwords, data['options'])
+    breach_filter = current_app.extensions.get('breach_filter')
+    if breach_filter is not None:
+        _mark_breached(results, passwords, breach_filter)
+    if data['passwords'] is not None:
+        return jsonify({'success': True, 'results': results, 'count': len(results)}), 200
+    return jsonify(dict(success=True, **results[0])), 200
+
+
+@bp.app_errorhandler(entropy.EntropyError)
+def entropy_unavailable(error):
+    # Never fall back to unchecked randomness; readiness fails with the source
+    return jsonify({'success': False, 'error': 'entropy source unavailable'}), 503
+
+
+@bp.route('/api/pool')
+def pool_stats():
+    password_pool = current_app.extensions.get('password_pool')
+    if password_pool is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify(dict(enabled=True, **password_pool.stats())), 200
+
+
+def create_app(config=None):
+    """Build the Flask application.
+
+    Safe to call before gunicorn forks workers (preload_app): it creates no
+    threads, open files or random state. The pool's refill thread and the
+    metrics files are created lazily inside each worker process.
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+
+    jsonprovider.init_app(app)
+    app.register_blueprint(bp)
+    validation.init_app(app)
+    ratelimit.init_app(app)
+    metrics.init_app(app)
+    assets.init_app(app)
+
+    # Train the pronounceable model before the fork so workers share its tables
+    pronounceable.load_model()
+
+    # Mapped read-only before the fork, so workers share one page cache copy
+    breach_filter = breach.load_filter(app.config['BREACH_FILTER_PATH'])
+    if breach_filter is not None:
+        app.extensions['breach_filter'] = breach_filter
+
+    if app.config['PASSWORD_POOL_ENABLED']:
+        app.extensions['password_pool'] = PasswordPool(
+            parse_option_sets(app.config['PASSWORD_POOL_OPTION_SETS']),
+            _generate_for_pool, size=app.config['PASSWORD_POOL_SIZE'],
+            low_watermark=app.config['PASSWORD_POOL_LOW_WATERMARK'])
+
+    checks = {'self_test': self_test, 'entropy': entropy.healthy}
+    if 'password_pool' in app.extensions:
+        checks['password_pool'] = app.extensions['password_pool'].healthy
+    app.extensions['probes'] = ProbeResponses(
+        app.config['APP_VERSION'], app.config['ENVIRONMENT'], checks,
+        app.config['PROBE_REFRESH_SECONDS'], app.config['SERVER_PLAN'])
+
+    # The home page has no per-request state: render and compress it once up
+    # front (templates are re-rendered per request in debug mode for live edits).
+    if not app.debug:
+        with app.test_request_context('/'):
+            app.extensions['home_page'] = assets.build_asset(
+                render_template('index.html').encode('utf-8'), 'text/html')
+            app.extensions['service_worker'] = assets.build_asset(
+                _render_service_worker().encode('utf-8'), 'text/javascript')
+
+    return app
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
     app.run(host=HOST, port=PORT, debug=DEBUG)
 
@@ -0,0 +1,123 @@
+"""
+Password Generator - Static Asset Cache
+Fingerprinted, precompressed static files and pages served from memory
+"""
+
+from collections import namedtuple
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, current_app, request, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Fingerprinted URLs never change content, so browsers may keep them forever
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Pages keep their URL across deploys and are revalidated with the ETag
+REVALIDATE = 'no-cache'
+
+# Below this size compression saves less than the header overhead
+MIN_COMPRESS_SIZE = 256
+
+CachedAsset = namedtuple('CachedAsset', ['body', 'mimetype', 'digest', 'encodings'])
+
+
+def build_asset(body, mimetype):
+    """Hash ``body`` and build its gzip/brotli variants once.
+
+    ``encodings`` maps a content coding to its body, most preferred first;
+    a variant is only kept if it is smaller than the identity body.
+    """
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    encodings = {}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        if brotli is not None:
+            encodings['br'] = brotli.compress(body, quality=11)
+        encodings['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+        encodings = {coding: data for coding, data in encodings.items()
+                     if len(data) < len(body)}
+    return CachedAsset(body, mimetype, digest, encodings)
+
+
+def fingerprint(filename, digest):
+    """``style.css`` -> ``style.<digest>.css``"""
+    root, ext = os.path.splitext(filename)
+    return f'{root}.{digest}{ext}'
+
+
+def load_static(static_folder):
+    """Read every file under ``static_folder`` into fingerprinted assets.
+
+    Returns ``(assets, urls)``: fingerprinted name -> asset, and original
+    name -> fingerprinted name.
+    """
+    assets = {}
+    urls = {}
+    for directory, _, files in os.walk(static_folder):
+        for name in files:
+            path = os.path.join(directory, name)
+            filename = os.path.relpath(path, static_folder).replace(os.sep, '/')
+            with open(path, 'rb') as source:
+                body = source.read()
+            mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            asset = build_asset(body, mimetype)
+            urls[filename] = fingerprint(filename, asset.digest)
+            assets[urls[filename]] = asset
+    return assets, urls
+
+
+def send_asset(asset, cache_control):
+    """Respond with the best encoding the client accepts, or 304 on a matching ETag."""
+    coding = None
+    for candidate in asset.encodings:
+        if request.accept_encodings[candidate]:
+            coding = candidate
+            break
+    etag = f'{asset.digest}-{coding}' if coding else asset.digest
+
+    headers = {'Cache-Control': cache_control, 'ETag': f'"{etag}"'}
+    if asset.encodings:
+        headers['Vary'] = 'Accept-Encoding'
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    if coding:
+        headers['Content-Encoding'] = coding
+    body = asset.encodings[coding] if coding else asset.body
+    return Response(body, mimetype=asset.mimetype, headers=headers)
+
+
+def asset_url(filename):
+    """URL for a static file; fingerprinted unless assets are served live."""
+    name = current_app.extensions.get('asset_urls', {}).get(filename)
+    if name is None:
+        return url_for('static', filename=filename)
+    return url_for('assets.asset', filename=name)
+
+
+def init_app(app):
+    """Register ``asset_url`` for templates and, outside debug mode, the
+    in-memory ``/assets/<fingerprinted name>`` route.
+
+    In debug mode files are left to Flask's static handler so edits show up
+    without a restart.
+    """
+    app.jinja_env.globals['asset_url'] = asset_url
+    if app.debug:
+        return
+
+    assets, urls = load_static(app.static_folder)
+    app.extensions['assets'] = assets
+    app.extensions['asset_urls'] = urls
+
+    def asset(filename):
+        cached = assets.get(filename)
+        if cached is None:
+            return Response('Not Found', status=404, mimetype='text/plain')
+        return send_asset(cached, IMMUTABLE)
+
+    app.add_url_rule('/assets/<path:filename>', 'assets.asset', asset)
@@ -0,0 +1,192 @@
+"""
+Password Generator - Worker Autotuning
+Sizes gunicorn workers, threads and max_requests from cgroup CPU and memory limits
+"""
+
+from collections import namedtuple
+import json
+import math
+import os
+import subprocess
+import sys
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+PROC_CGROUP = '/proc/self/cgroup'
+
+# Share of the memory limit workers may plan for; the rest absorbs spikes,
+# the page cache and the master
+MEMORY_FRACTION = 0.8
+# Growth allowance on top of a freshly started worker's RSS
+WORKER_GROWTH = 1.25
+# Used when a worker cannot be measured
+DEFAULT_WORKER_RSS = 64 * 1024 * 1024
+MAX_THREADS = 32
+MAX_REQUESTS = 1000
+MIN_MAX_REQUESTS = 100
+# cgroup v1 reports "no limit" as a huge page-aligned number
+_UNLIMITED = 1 << 60
+
+# Environment variable carrying the chosen plan to workers (and /version)
+PLAN_ENV = 'GUNICORN_AUTOTUNE_PLAN'
+
+Plan = namedtuple('Plan', [
+    'cpus', 'memory_limit', 'worker_rss', 'workers', 'threads',
+    'max_requests', 'max_requests_jitter', 'limited_by'])
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_paths(proc_cgroup=PROC_CGROUP):
+    """Map each controller to this process's cgroup (``''`` is cgroup v2)."""
+    paths = {}
+    for line in (_read(proc_cgroup) or '').splitlines():
+        _, controllers, path = line.split(':', 2)
+        for controller in controllers.split(','):
+            paths[controller] = path
+    return paths
+
+
+def _ancestors(base, path):
+    # Limits may be set on any ancestor; the tightest one applies
+    parts = [part for part in path.split('/') if part]
+    for depth in range(len(parts), -1, -1):
+        directory = os.path.join(base, *parts[:depth])
+        if os.path.isdir(directory):
+            yield directory
+
+
+def _v1_base(root, names):
+    for name in names:
+        if os.path.isdir(os.path.join(root, name)):
+            return os.path.join(root, name)
+    return None
+
+
+def cpu_limit(root=CGROUP_ROOT, proc_cgroup=PROC_CGROUP):
+    """CPUs this process may use: the cgroup quota, affinity and core count."""
+    paths = cgroup_paths(proc_cgroup)
+    limits = []
+    if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+        for directory in _ancestors(root, paths.get('', '/')):
+            value = _read(os.path.join(directory, 'cpu.max'))
+            if value and not value.startswith('max'):
+                quota, period = value.split()
+                limits.append(int(quota) / int(period))
+    else:
+        base = _v1_base(root, ('cpu', 'cpu,cpuacct', 'cpuacct,cpu'))
+        if base is not None:
+            for directory in _ancestors(base, paths.get('cpu', '/')):
+                quota = _read(os.path.join(directory, 'cpu.cfs_quota_us'))
+                period = _read(os.path.join(directory, 'cpu.cfs_period_us'))
+                if quota and period and int(quota) > 0:
+                    limits.append(int(quota) / int(period))
+    if hasattr(os, 'sched_getaffinity'):
+        limits.append(len(os.sched_getaffinity(0)))
+    else:
+        limits.append(os.cpu_count() or 1)
+    return min(limits)
+
+
+def memory_limit(root=CGROUP_ROOT, proc_cgroup=PROC_CGROUP):
+    """Bytes this process may use, or None when nothing limits it."""
+    paths = cgroup_paths(proc_cgroup)
+    limits = []
+    if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+        for directory in _ancestors(root, paths.get('', '/')):
+            value = _read(os.path.join(directory, 'memory.max'))
+            if value and value != 'max':
+                limits.append(int(value))
+    else:
+        base = _v1_base(root, ('memory',))
+        if base is not None:
+            for directory in _ancestors(base, paths.get('memory', '/')):
+                value = _read(os.path.join(directory, 'memory.limit_in_bytes'))
+                if value and int(value) < _UNLIMITED:
+                    limits.append(int(value))
+    if hasattr(os, 'sysconf') and 'SC_PHYS_PAGES' in os.sysconf_names:
+        limits.append(os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE'))
+    return min(limits) if limits else None
+
+
+def rss_bytes(pid='self'):
+    """Resident set size of a process from ``/proc/<pid>/statm``."""
+    statm = _read(f'/proc/{pid}/statm')
+    if statm is None:
+        return None
+    return int(statm.split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def measure_worker_rss(module='app', timeout=60):
+    """RSS of a fresh interpreter after importing ``module``, as a worker has.
+
+    Measured in a child process so the master never imports the app before
+    its environment (metrics and rate limit directories) is complete.
+    """
+    script = f'import {module}, autotune; print(autotune.rss_bytes())'
+    try:
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True,
+            timeout=timeout, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return int(result.stdout.strip().splitlines()[-1])
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+        return None
+
+
+def plan_workers(cpus, memory_limit, worker_rss, base_threads=1, master_rss=0):
+    """Choose workers, threads and max_requests for the given limits.
+
+    Workers follow the ``2 * cpus + 1`` rule, capped by how many grown
+    workers fit in ``MEMORY_FRACTION`` of the memory limit. Threaded
+    workers that were capped by memory get more threads instead. Workers
+    with little memory headroom are recycled sooner.
+    """
+    worker_rss = worker_rss or DEFAULT_WORKER_RSS
+    planned_rss = worker_rss * WORKER_GROWTH
+    cpu_workers = max(1, math.floor(2 * cpus + 1))
+    workers = cpu_workers
+    limited_by = 'cpu'
+    budget = None
+    if memory_limit:
+        budget = max(planned_rss, memory_limit * MEMORY_FRACTION - master_rss)
+        memory_workers = max(1, int(budget // planned_rss))
+        if memory_workers < cpu_workers:
+            workers, limited_by = memory_workers, 'memory'
+
+    threads = base_threads
+    if base_threads > 1 and workers < cpu_workers:
+        threads = min(MAX_THREADS, base_threads * math.ceil(cpu_workers / workers))
+
+    max_requests = MAX_REQUESTS
+    if budget is not None:
+        headroom = budget / workers - worker_rss
+        max_requests = max(MIN_MAX_REQUESTS,
+                           min(MAX_REQUESTS, int(MAX_REQUESTS * headroom / worker_rss)))
+    return Plan(round(cpus, 2), memory_limit, worker_rss, workers, threads,
+                max_requests, max(1, max_requests // 20), limited_by)
+
+
+def autotune(base_threads=1, worker_rss=None, root=CGROUP_ROOT, proc_cgroup=PROC_CGROUP):
+    if worker_rss is None:
+        worker_rss = measure_worker_rss()
+    return plan_workers(cpu_limit(root, proc_cgroup), memory_limit(root, proc_cgroup),
+                        worker_rss, base_threads, rss_bytes() or 0)
+
+
+def describe(plan):
+    memory = 'unlimited' if plan.memory_limit is None else f'{plan.memory_limit / 2 ** 20:.0f} MiB'
+    rss = 'unmeasured' if plan.worker_rss is None else f'{plan.worker_rss / 2 ** 20:.0f} MiB'
+    return (f'{plan.workers} workers x {plan.threads} threads, max_requests '
+            f'{plan.max_requests}±{plan.max_requests_jitter} ({plan.cpus} CPUs, {memory} '
+            f'memory, {rss} per worker; limited by {plan.limited_by})')
+
+
+def plan_from_env():
+    """The plan gunicorn_config.py chose, or None outside gunicorn."""
+    value = os.getenv(PLAN_ENV)
+    return json.loads(value) if value else None
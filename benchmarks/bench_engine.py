@@ -0,0 +1,62 @@
+"""
+Microbenchmark: bulk entropy engine vs. per-character secrets.choice
+
+Usage:
+    python benchmarks/bench_engine.py [--repeat 5]
+"""
+
+import argparse
+import secrets
+import string
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import compile_alphabet, random_string
+
+CHARACTERS = string.ascii_letters + string.digits + string.punctuation
+
+
+def legacy_password(length):
+    return ''.join(secrets.choice(CHARACTERS) for _ in range(length))
+
+
+def engine_password(length):
+    return random_string(compile_alphabet(CHARACTERS), length)
+
+
+def legacy_batch(count, length):
+    return [legacy_password(length) for _ in range(count)]
+
+
+def engine_batch(count, length):
+    block = random_string(compile_alphabet(CHARACTERS), count * length)
+    return [block[i:i + length] for i in range(0, count * length, length)]
+
+
+def best_of(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<28}{'legacy (us)':>14}{'engine (us)':>14}{'speedup':>10}")
+    for length in [12, 32, 128]:
+        legacy = best_of(lambda: legacy_password(length), 2000, args.repeat)
+        engine = best_of(lambda: engine_password(length), 2000, args.repeat)
+        print(f"{f'single, length={length}':<28}{legacy * 1e6:>14.2f}"
+              f"{engine * 1e6:>14.2f}{legacy / engine:>9.1f}x")
+    for count in [1000, 10000]:
+        legacy = best_of(lambda: legacy_batch(count, 16), 1, args.repeat)
+        engine = best_of(lambda: engine_batch(count, 16), 1, args.repeat)
+        print(f"{f'batch x{count}, length=16':<28}{legacy * 1e6:>14.0f}"
+              f"{engine * 1e6:>14.0f}{legacy / engine:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Microbenchmarks of generate_password across lengths and every option combination
+
+Usage:
+    python benchmarks/bench_generator.py [--repeat 5] [--number 2000]
+"""
+
+import argparse
+import itertools
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import generate_password, generate_passwords
+
+LENGTHS = (4, 8, 12, 16, 32, 64, 128)
+FLAG_LETTERS = 'ulds'  # uppercase, lowercase, digits, symbols
+
+
+def flag_name(flags):
+    return ''.join(letter for letter, on in zip(FLAG_LETTERS, flags) if on) or 'none'
+
+
+def time_per_call(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def run_micro(number=2000, repeat=5):
+    """Return {benchmark name: microseconds per call}."""
+    results = {}
+    for length, flags in itertools.product(LENGTHS, itertools.product((False, True), repeat=4)):
+        name = f'generate_password[length={length},flags={flag_name(flags)}]'
+        results[name] = time_per_call(
+            lambda: generate_password(length, *flags), number, repeat) * 1e6
+    for count in (1000, 10000):
+        name = f'generate_passwords[count={count},length=16,flags=ulds]'
+        results[name] = time_per_call(
+            lambda: generate_passwords(count, 16), max(1, number // count), repeat) * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='generate_password microbenchmarks')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, micros in run_micro(args.number, args.repeat).items():
+        print(f'{name:<60}{micros:>12.2f} us')
+
+
+if __name__ == '__main__':
+    main()
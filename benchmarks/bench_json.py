@@ -0,0 +1,74 @@
+"""
+Microbenchmark: JSON response serialization
+
+Compares Flask's default provider (stdlib, sorted keys) with the compact
+stdlib and orjson providers, and with pre-encoded option fragments, for a
+single-password and batch responses.
+
+Usage:
+    python benchmarks/bench_json.py [--repeat 5]
+"""
+
+import argparse
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app import OPTIONS_FRAGMENTS, generate_passwords
+import jsonprovider
+from jsonprovider import CompactJSONProvider, OrjsonProvider
+
+OPTIONS = {'uppercase': True, 'lowercase': True, 'digits': True, 'symbols': True}
+
+
+def make_app(provider):
+    app = Flask(__name__)
+    app.json = provider(app)
+    return app
+
+
+def best_of(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    providers = [('flask default', DefaultJSONProvider), ('compact stdlib', CompactJSONProvider)]
+    if jsonprovider.orjson is not None:
+        providers.append(('orjson', OrjsonProvider))
+
+    cases = [('single', 1, 20000), ('batch x1000', 1000, 200), ('batch x50000', 50000, 5)]
+    fragment = OPTIONS_FRAGMENTS[(True, True, True, True)]
+    print(f'orjson {getattr(jsonprovider.orjson, "__version__", "not installed")}, '
+          f'raw fragments: {jsonprovider._RAW is not None}')
+    print(f"{'provider':<26}" + ''.join(f'{name:>16}' for name, _, _ in cases) + '   (us)')
+    for name, provider in providers:
+        app = make_app(provider)
+        row_dict, row_fragment = [], []
+        for _, count, number in cases:
+            passwords = generate_passwords(count, 16)
+            payload = ({'success': True, 'password': passwords[0], 'length': 16}
+                       if count == 1 else
+                       {'success': True, 'passwords': passwords, 'count': count, 'length': 16})
+            with app.test_request_context():
+                row_dict.append(best_of(lambda: jsonify(dict(payload, options=OPTIONS)),
+                                        number, args.repeat))
+                if provider is not DefaultJSONProvider:
+                    row_fragment.append(best_of(
+                        lambda: jsonify(dict(payload, options=fragment)),
+                        number, args.repeat))
+        print(f'{name:<26}' + ''.join(f'{t * 1e6:>16.1f}' for t in row_dict))
+        if row_fragment:
+            print(f"{name + ' + fragment':<26}" + ''.join(f'{t * 1e6:>16.1f}' for t in row_fragment))
+
+
+if __name__ == '__main__':
+    main()
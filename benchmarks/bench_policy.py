@@ -0,0 +1,66 @@
+"""
+Microbenchmark: one-pass policy construction vs. generate-and-reject
+
+Generate-and-reject draws from the policy's union alphabet until a password
+happens to satisfy every rule, which is what clients did before policies.
+
+Usage:
+    python benchmarks/bench_policy.py [--repeat 5]
+"""
+
+import argparse
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import compile_alphabet, random_string
+from policy import CLASSES, Policy
+
+POLICIES = (
+    ('1 of each class', dict(min_counts={name: 1 for name in CLASSES})),
+    ('2 of each, no ambiguous', dict(min_counts={name: 2 for name in CLASSES},
+                                     exclude_ambiguous=True)),
+    ('strict (2 each, no repeats, U..9)', dict(min_counts={name: 2 for name in CLASSES},
+                                               exclude_ambiguous=True, no_repeats=True,
+                                               prefix='uppercase', suffix='digits')),
+)
+
+
+def reject_password(policy, alphabet, length):
+    attempts = 0
+    while True:
+        attempts += 1
+        password = random_string(alphabet, length)
+        if policy.satisfied_by(password):
+            return password, attempts
+
+
+def best_of(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'policy':<36}{'length':>7}{'tries':>8}{'reject (us)':>13}"
+          f"{'policy (us)':>13}{'speedup':>9}")
+    for name, rules in POLICIES:
+        policy = Policy(**rules)
+        alphabet = compile_alphabet(policy.union)
+        for length in [8, 12, 16]:
+            tries = sum(reject_password(policy, alphabet, length)[1]
+                        for _ in range(args.number)) / args.number
+            reject = best_of(lambda: reject_password(policy, alphabet, length),
+                             args.number, args.repeat)
+            one_pass = best_of(lambda: policy.generate(length), args.number, args.repeat)
+            print(f'{name:<36}{length:>7}{tries:>8.1f}{reject * 1e6:>13.2f}'
+                  f'{one_pass * 1e6:>13.2f}{reject / one_pass:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
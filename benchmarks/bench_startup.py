@@ -0,0 +1,63 @@
+"""
+Worker startup benchmark: cold import vs. fork from a preloaded master
+
+"cold" spawns a fresh interpreter that imports app.py and serves one request,
+which is what every new or recycled gunicorn worker did with preload_app off.
+"forked" imports the app once and then forks children that serve one request,
+which is what workers do with preload_app on.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+FIRST_REQUEST = ("client = app.test_client(); client.get('/'); "
+                 "client.post('/api/generate', json={})")
+
+
+def cold_start():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'from app import app; {FIRST_REQUEST}'],
+                   cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+def forked_start(app):
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        exec(FIRST_REQUEST, {'app': app})
+        os._exit(0)
+    os.waitpid(pid, 0)
+    return time.perf_counter() - start
+
+
+def report(name, samples):
+    print(f'{name:<30} median {statistics.median(samples) * 1000:8.1f} ms   '
+          f'min {min(samples) * 1000:8.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='worker startup benchmark')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    report('cold import + first request', [cold_start() for _ in range(args.runs)])
+
+    start = time.perf_counter()
+    from app import app
+    print(f"{'preload (once, in master)':<30} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    report('fork + first request', [forked_start(app) for _ in range(args.runs)])
+
+
+if __name__ == '__main__':
+    main()
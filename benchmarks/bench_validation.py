@@ -0,0 +1,55 @@
+"""
+Microbenchmark: request validation overhead
+
+Times GENERATE_SCHEMA.validate on typical bodies and compares it with a
+whole /api/generate request through the Flask test client.
+
+Usage:
+    python benchmarks/bench_validation.py [--repeat 5]
+"""
+
+import argparse
+import json
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import BATCH_SCHEMA, GENERATE_SCHEMA, create_app
+
+BODIES = (
+    ('empty', GENERATE_SCHEMA, {}),
+    ('all flags', GENERATE_SCHEMA, {'length': 16, 'uppercase': True, 'lowercase': True,
+                                    'digits': True, 'symbols': False}),
+    ('passphrase', GENERATE_SCHEMA, {'mode': 'passphrase', 'words': 6, 'separator': '-',
+                                     'capitalize': True}),
+    ('batch', BATCH_SCHEMA, {'count': 1000, 'length': 16, 'symbols': False}),
+)
+
+
+def best_of(func, number, repeat):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    client = create_app({'TESTING': True}).test_client()
+    body = json.dumps(BODIES[1][2])
+    request = best_of(lambda: client.post('/api/generate', data=body,
+                                          content_type='application/json'),
+                      args.number // 20, args.repeat)
+
+    print(f"{'body':<16}{'validate (us)':>15}{'% of request':>14}")
+    for name, schema, data in BODIES:
+        validate = best_of(lambda: schema.validate(data), args.number, args.repeat)
+        print(f'{name:<16}{validate * 1e6:>15.2f}{validate / request:>13.2%}')
+    print(f"{'full request':<16}{request * 1e6:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
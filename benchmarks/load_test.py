@@ -0,0 +1,180 @@
+"""
+HTTP load generator for the password generator service
+
+Opens --concurrency keep-alive connections that each issue requests back to
+back (optionally pausing --think seconds between requests, like slow clients)
+and reports throughput and latency percentiles.
+
+Usage:
+    python benchmarks/load_test.py --url http://127.0.0.1:5000/api/generate \\
+        --concurrency 200 --duration 10 --think 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+class Connection:
+    """Minimal HTTP/1.1 client connection that reconnects when the server closes"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def request(self, raw_request):
+        reused = self.writer is not None
+        if not reused:
+            await self._connect()
+        try:
+            self.writer.write(raw_request)
+            status, keep_alive = await asyncio.wait_for(self._read_response(), self.timeout)
+        except (ConnectionResetError, asyncio.IncompleteReadError) as error:
+            # An idle keep-alive connection closed by the server (e.g. a
+            # recycled worker) is retried once on a fresh connection, as
+            # browsers and HTTP client libraries do.
+            if not reused or getattr(error, 'partial', b''):
+                raise
+            self.close()
+            await self._connect()
+            self.writer.write(raw_request)
+            status, keep_alive = await asyncio.wait_for(self._read_response(), self.timeout)
+        if not keep_alive:
+            self.close()
+        return status
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+
+    async def _read_response(self):
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip().lower()
+        if headers.get('transfer-encoding') == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self.reader.readexactly(int(headers.get('content-length', 0)))
+        return status, headers.get('connection') != 'close'
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def build_request(url, method, body):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    payload = body.encode() if body else b''
+    head = [f'{method} {path} HTTP/1.1', f'Host: {parts.netloc}',
+            'Connection: keep-alive']
+    if payload:
+        head += ['Content-Type: application/json', f'Content-Length: {len(payload)}']
+    return ('\r\n'.join(head) + '\r\n\r\n').encode() + payload
+
+
+async def client(target, raw_request, deadline, think, timeout, latencies, errors):
+    host, port = target
+    connection = Connection(host, port, timeout)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            status = await connection.request(raw_request)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            connection.close()
+            errors.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+            continue
+        if status >= 400:
+            errors.append(time.perf_counter() - start)
+        else:
+            latencies.append(time.perf_counter() - start)
+        if think:
+            await asyncio.sleep(think)
+    connection.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(url, method='GET', body=None, concurrency=50, duration=10.0,
+                   think=0.0, timeout=30.0):
+    """Run one load test and return a summary dict."""
+    parts = urlsplit(url)
+    target = (parts.hostname, parts.port or 80)
+    raw_request = build_request(url, method, body)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[
+        client(target, raw_request, deadline, think, timeout, latencies, errors)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_rps': len(latencies) / elapsed,
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50) * 1000,
+            'p90': percentile(latencies, 0.90) * 1000,
+            'p99': percentile(latencies, 0.99) * 1000,
+            'max': (latencies[-1] if latencies else 0.0) * 1000,
+        },
+    }
+
+
+def format_summary(summary):
+    latency = summary['latency_ms']
+    return (f"{summary['url']}  c={summary['concurrency']}  "
+            f"{summary['throughput_rps']:.0f} req/s  errors={summary['errors']}  "
+            f"p50={latency['p50']:.1f}ms p90={latency['p90']:.1f}ms "
+            f"p99={latency['p99']:.1f}ms max={latency['max']:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP load generator')
+    parser.add_argument('--url', default='http://127.0.0.1:5000/api/generate')
+    parser.add_argument('--method', default=None,
+                        help='defaults to POST for /api/ URLs, GET otherwise')
+    parser.add_argument('--body', default='{"length": 16}')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--think', type=float, default=0.0,
+                        help='seconds each client idles between requests')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--json', action='store_true', help='print JSON summary')
+    args = parser.parse_args()
+
+    method = args.method or ('POST' if '/api/' in args.url else 'GET')
+    body = args.body if method == 'POST' else None
+    summary = asyncio.run(run_load(args.url, method, body, args.concurrency,
+                                   args.duration, args.think, args.timeout))
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark suite with saved baselines and regression checks
+
+Runs the generator microbenchmarks and an HTTP load test against
+/api/generate, /health and the home page, reports throughput, latency
+percentiles and server RSS, and optionally compares against a saved baseline.
+
+Usage:
+    # Spawn a local gunicorn, run everything, save as the baseline
+    python benchmarks/run_benchmarks.py --spawn --save-baseline main
+
+    # Later: fail (exit 1) if anything regressed more than 15%
+    python benchmarks/run_benchmarks.py --spawn --compare main --threshold 0.15
+
+    # Against an already running service (RSS of --server-pid and its workers)
+    python benchmarks/run_benchmarks.py --url http://127.0.0.1:5000 --server-pid 1234
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from load_test import format_summary, run_load
+
+ENDPOINTS = (
+    ('generate', 'POST', '/api/generate', '{"length": 16}'),
+    ('health', 'GET', '/health', None),
+    ('home', 'GET', '/', None),
+)
+
+
+def metric(value, better):
+    return {'value': value, 'better': better}
+
+
+def rss_bytes(pid):
+    """Resident set size of a process and all of its children."""
+    total = 0
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+            with open(f'/proc/{current}/task/{current}/children') as children:
+                pids.extend(int(child) for child in children.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(workers):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), GUNICORN_WORKERS=str(workers), LOG_LEVEL='warning')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn_config.py',
+         '--access-logfile', '/dev/null', 'app:app'],
+        cwd=ROOT, env=env)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(url + '/health', timeout=1)
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('gunicorn did not become healthy')
+
+
+def run_http(base_url, concurrency, duration, server_pid=None):
+    results = {}
+    for name, method, path, body in ENDPOINTS:
+        summary = asyncio.run(run_load(base_url + path, method, body,
+                                       concurrency, duration))
+        print(format_summary(summary))
+        results[f'http.{name}.throughput_rps'] = metric(summary['throughput_rps'], 'higher')
+        results[f'http.{name}.p50_ms'] = metric(summary['latency_ms']['p50'], 'lower')
+        results[f'http.{name}.p99_ms'] = metric(summary['latency_ms']['p99'], 'lower')
+        results[f'http.{name}.errors'] = metric(summary['errors'], 'lower')
+    if server_pid:
+        rss = rss_bytes(server_pid)
+        print(f'server RSS: {rss / 2 ** 20:.1f} MiB')
+        results['server.rss_mib'] = metric(rss / 2 ** 20, 'lower')
+    return results
+
+
+def run_micro(number, repeat):
+    from bench_generator import run_micro as micro
+    results = {}
+    for name, micros in micro(number, repeat).items():
+        print(f'{name:<60}{micros:>12.2f} us')
+        results[f'micro.{name}.us'] = metric(micros, 'lower')
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regressions worse than ``threshold`` (a fraction)."""
+    regressions = []
+    for name, base in baseline['results'].items():
+        current = results.get(name)
+        if current is None or base['value'] == 0:
+            continue
+        change = (current['value'] - base['value']) / base['value']
+        if base['better'] == 'higher':
+            change = -change
+        if change > threshold:
+            regressions.append((name, base['value'], current['value'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite')
+    parser.add_argument('--no-micro', action='store_true', help='skip microbenchmarks')
+    parser.add_argument('--number', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--url', help='base URL of a running service')
+    target.add_argument('--spawn', action='store_true', help='start a local gunicorn')
+    parser.add_argument('--server-pid', type=int, help='gunicorn master PID for RSS')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--save-baseline', metavar='NAME')
+    parser.add_argument('--compare', metavar='NAME')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='allowed regression as a fraction (default 0.15)')
+    parser.add_argument('--output', help='write results JSON to this file')
+    args = parser.parse_args()
+
+    results = {}
+    if not args.no_micro:
+        results.update(run_micro(args.number, args.repeat))
+
+    if args.spawn:
+        process, url = spawn_server(args.workers)
+        try:
+            results.update(run_http(url, args.concurrency, args.duration, process.pid))
+        finally:
+            process.terminate()
+            process.wait()
+    elif args.url:
+        results.update(run_http(args.url.rstrip('/'), args.concurrency,
+                                args.duration, args.server_pid))
+
+    report = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f'{args.save_baseline}.json')
+        with open(path, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f'baseline saved to {path}')
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{args.compare}.json')) as source:
+            baseline = json.load(source)
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, change in regressions:
+            print(f'REGRESSION {name}: {before:.2f} -> {after:.2f} ({change:+.0%})')
+        if regressions:
+            sys.exit(1)
+        print(f'no regressions beyond {args.threshold:.0%}')
+
+
+if __name__ == '__main__':
+    main()
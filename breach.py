@@ -0,0 +1,185 @@
+"""
+Password Generator - Breached Password Filter
+Memory-mapped Bloom filter of SHA-1 hashes, shared read-only by all workers
+
+The filter file is built offline from a list of SHA-1 hashes (one per line,
+hex, optionally followed by ``:count`` as in the Have I Been Pwned dumps)
+and mapped read-only, so every gunicorn worker shares the same page cache
+copy. Lookups hash the password once with SHA-1 and probe ``k`` bits derived
+from the digest by double hashing; a miss, the common case, usually exits
+after one or two probes.
+
+Usage:
+    python breach.py hashes.txt -o breached.bloom --fp-rate 0.001
+    python breach.py passwords.txt -o blocked.bloom --plaintext
+"""
+
+import argparse
+from functools import lru_cache
+from hashlib import sha1
+import math
+import mmap
+import os
+import struct
+import sys
+
+# Filter built by this module's CLI; empty disables breach checks
+BREACH_FILTER_PATH = os.getenv('BREACH_FILTER_PATH', '')
+# Fresh passwords drawn per breached one before the options are refused
+BREACH_MAX_ATTEMPTS = int(os.getenv('BREACH_MAX_ATTEMPTS', 20))
+
+MAGIC = b'PWBLOOM1'
+# magic, probes per key, log2 of the bit count, keys inserted
+_HEADER = struct.Struct('<8sIIQ')
+# Bit array offset (keeps it page-friendly and leaves room in the header)
+_OFFSET = 64
+# Two 64-bit halves of a SHA-1 digest seed the probe sequence
+_SEEDS = struct.Struct('<QQ')
+
+
+def filter_shape(count, fp_rate):
+    """Return ``(k, log2_bits)`` for ``count`` keys at ``fp_rate``.
+
+    The bit count is rounded up to a power of two so a probe position is a
+    mask instead of a modulo; that only lowers the real false-positive rate.
+    ``k`` stays optimal for the unrounded size, keeping lookups short.
+    """
+    count = max(1, count)
+    bits = -count * math.log(fp_rate) / math.log(2) ** 2
+    log2_bits = max(6, math.ceil(math.log2(bits)))
+    k = max(1, round(-math.log2(fp_rate)))
+    return k, log2_bits
+
+
+def false_positive_rate(k, bits, count):
+    """Expected false-positive rate ``(1 - e^(-kn/m))^k``."""
+    return (1 - math.exp(-k * count / bits)) ** k
+
+
+class BreachFilter:
+    """Read-only Bloom filter over a mapped file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.k, log2_bits, self.count = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a breach filter file')
+        self.path = path
+        self.bits = 1 << log2_bits
+        if len(self._map) < _OFFSET + self.bits // 8:
+            raise ValueError(f'{path} is truncated')
+        self._mask = self.bits - 1
+        self._table = memoryview(self._map)[_OFFSET:_OFFSET + self.bits // 8]
+
+    @property
+    def false_positive_rate(self):
+        return false_positive_rate(self.k, self.bits, self.count)
+
+    def contains_digest(self, digest):
+        h1, h2 = _SEEDS.unpack_from(digest)
+        h2 |= 1
+        table = self._table
+        mask = self._mask
+        for _ in range(self.k):
+            position = h1 & mask
+            if not table[position >> 3] >> (position & 7) & 1:
+                return False
+            h1 += h2
+        return True
+
+    def __contains__(self, password):
+        return self.contains_digest(sha1(password.encode('utf-8')).digest())
+
+    def exclude(self, passwords):
+        """Return the passwords that are not in the filter."""
+        contains = self.contains_digest
+        return [p for p in passwords if not contains(sha1(p.encode('utf-8')).digest())]
+
+
+@lru_cache(maxsize=None)
+def load_filter(path=BREACH_FILTER_PATH):
+    """Map a filter file once per path; None when no path is configured."""
+    if not path:
+        return None
+    return BreachFilter(path)
+
+
+def _digests(lines, plaintext):
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(b'#'):
+            continue
+        if plaintext:
+            yield sha1(line).digest()
+        else:
+            yield bytes.fromhex(line.split(b':', 1)[0].decode('ascii'))
+
+
+def count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b'')) + 1
+
+
+def build_filter(source, output, fp_rate=0.001, plaintext=False, count=None):
+    """Build a filter file from ``source`` and return the number of keys.
+
+    ``count`` (keys expected) defaults to the number of lines in ``source``.
+    The file is written beside ``output`` and renamed over it, so workers
+    mapping the old filter keep a consistent copy.
+    """
+    if count is None:
+        count = count_lines(source)
+    k, log2_bits = filter_shape(count, fp_rate)
+    mask = (1 << log2_bits) - 1
+    table = bytearray(1 << log2_bits >> 3)
+    inserted = 0
+    with open(source, 'rb') as f:
+        for digest in _digests(f, plaintext):
+            h1, h2 = _SEEDS.unpack_from(digest)
+            h2 |= 1
+            for _ in range(k):
+                position = h1 & mask
+                table[position >> 3] |= 1 << (position & 7)
+                h1 += h2
+            inserted += 1
+
+    header = _HEADER.pack(MAGIC, k, log2_bits, inserted).ljust(_OFFSET, b'\0')
+    temporary = f'{output}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(header)
+        f.write(table)
+    os.replace(temporary, output)
+    return inserted
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Build a breached-password Bloom filter')
+    parser.add_argument('source', help='file of SHA-1 hashes (hex, optional :count), one per line')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--fp-rate', type=float, default=0.001,
+                        help='target false-positive rate (default 0.001)')
+    parser.add_argument('--plaintext', action='store_true',
+                        help='source lists passwords instead of hashes')
+    args = parser.parse_args(argv)
+    if not 0 < args.fp_rate < 1:
+        parser.error('--fp-rate must be between 0 and 1')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        build_filter(args.source, args.output, args.fp_rate, args.plaintext)
+    except (OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    breach_filter = BreachFilter(args.output)
+    print(f'wrote {breach_filter.count} hashes to {args.output}: '
+          f'{breach_filter.bits // 8:,} bytes, {breach_filter.k} probes, '
+          f'false-positive rate {breach_filter.false_positive_rate:.2e}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Password Generator - Bulk Generation CLI
+Writes millions of passwords to a file for offline provisioning
+
+Work is split into shards generated by a process pool, one per core, so
+generation is never limited by a single interpreter's GIL. Shards come back
+as ready-to-write bytes and the parent only issues large ``writev`` calls.
+
+Usage:
+    python bulk_generate.py --count 10000000 --length 16 -o passwords.txt
+    python bulk_generate.py --count 1000000 --format csv --no-symbols -o out.csv
+    python bulk_generate.py --count 10000000 -o passwords.txt --resume
+"""
+
+import argparse
+from multiprocessing import get_context
+import os
+import queue
+import sys
+import time
+
+from charsets import custom_charset, get_charset
+from engine import random_string
+
+FORMATS = ('text', 'csv', 'ndjson')
+CSV_HEADER = b'password\r\n'
+
+# Passwords generated per engine call inside a shard (bounds worker memory)
+BLOCK_SIZE = 65536
+# Flush buffered shards once this many bytes are pending
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+# Shards submitted but not yet written, per worker; enough to keep workers
+# busy while the parent writes, without queueing the whole output in memory
+IN_FLIGHT_PER_WORKER = 2
+IOV_MAX = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+
+
+def format_passwords(passwords, output_format):
+    """Encode passwords as newline-terminated records.
+
+    Alphabets are limited to printable ASCII, so escaping is just quotes
+    and backslashes and needs no per-record ``csv``/``json`` call.
+    """
+    if output_format == 'csv':
+        passwords = [f'"{p.replace(chr(34), chr(34) * 2)}"' if ('"' in p or ',' in p) else p
+                     for p in passwords]
+        return ('\r\n'.join(passwords) + '\r\n').encode('ascii')
+    if output_format == 'ndjson':
+        passwords = ['{"password": "' + p.replace('\\', '\\\\').replace('"', '\\"') + '"}'
+                     for p in passwords]
+    return ('\n'.join(passwords) + '\n').encode('ascii')
+
+
+def generate_shard(task):
+    """Process-pool worker: ``(count, length, characters, format)`` -> bytes."""
+    count, length, characters, output_format = task
+    alphabet = custom_charset(characters)
+    blocks = []
+    for start in range(0, count, BLOCK_SIZE):
+        block_count = min(BLOCK_SIZE, count - start)
+        block = random_string(alphabet, block_count * length)
+        blocks.append(format_passwords(
+            [block[i:i + length] for i in range(0, block_count * length, length)],
+            output_format))
+    return count, b''.join(blocks)
+
+
+def shards(count, shard_size):
+    while count > 0:
+        size = min(shard_size, count)
+        yield size
+        count -= size
+
+
+def bounded_imap(pool, func, tasks, limit):
+    """Like ``pool.imap_unordered`` with at most ``limit`` results outstanding.
+
+    A new task is only submitted once a finished one has been taken by the
+    caller, so a slow consumer (a saturated disk) stalls the workers instead
+    of piling finished shards up in the parent.
+    """
+    results = queue.SimpleQueue()
+    tasks = iter(tasks)
+
+    def submit():
+        for task in tasks:
+            pool.apply_async(func, (task,), callback=results.put,
+                             error_callback=results.put)
+            return 1
+        return 0
+
+    outstanding = sum(submit() for _ in range(limit))
+    while outstanding:
+        result = results.get()
+        if isinstance(result, BaseException):
+            raise result
+        yield result
+        outstanding += submit() - 1
+
+
+def write_all(fd, buffers):
+    """``writev`` every buffer, continuing after short writes."""
+    for start in range(0, len(buffers), IOV_MAX):
+        batch = [memoryview(buffer) for buffer in buffers[start:start + IOV_MAX]]
+        while batch:
+            written = os.writev(fd, batch)
+            while batch and written >= len(batch[0]):
+                written -= len(batch[0])
+                batch.pop(0)
+            if batch and written:
+                batch[0] = batch[0][written:]
+
+
+def existing_records(path, output_format):
+    """Count complete records in ``path``, truncating a partial last line.
+
+    Returns None if the file does not exist.
+    """
+    try:
+        output = open(path, 'r+b')
+    except FileNotFoundError:
+        return None
+    with output:
+        lines = 0
+        size = 0
+        last_newline = -1
+        while True:
+            chunk = output.read(WRITE_BUFFER_SIZE)
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            position = chunk.rfind(b'\n')
+            if position >= 0:
+                last_newline = size + position
+            size += len(chunk)
+        if last_newline + 1 != size:
+            output.truncate(last_newline + 1)
+    if output_format == 'csv' and lines:
+        lines -= 1
+    return lines
+
+
+def select_characters(args):
+    if args.alphabet is not None:
+        return custom_charset(args.alphabet).characters
+    return get_charset(args.uppercase, args.lowercase, args.digits, args.symbols).characters
+
+
+def run(args, log=sys.stderr):
+    characters = select_characters(args)
+
+    done = existing_records(args.output, args.format) if args.resume else None
+    if done is None:
+        done = 0
+        mode = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    else:
+        mode = os.O_WRONLY | os.O_APPEND
+    remaining = max(0, args.count - done)
+    if done:
+        print(f'resuming: {done} passwords already in {args.output}', file=log)
+
+    fd = os.open(args.output, mode, 0o600)
+    start = time.perf_counter()
+    written = 0
+    try:
+        if args.format == 'csv' and os.fstat(fd).st_size == 0:
+            os.write(fd, CSV_HEADER)
+        tasks = ((size, args.length, characters, args.format)
+                 for size in shards(remaining, args.shard_size))
+        pending, pending_bytes = [], 0
+        next_report = start + args.progress_interval
+        with get_context('fork').Pool(args.workers) as pool:
+            for count, data in bounded_imap(pool, generate_shard, tasks,
+                                            IN_FLIGHT_PER_WORKER * args.workers):
+                pending.append(data)
+                pending_bytes += len(data)
+                written += count
+                if pending_bytes >= WRITE_BUFFER_SIZE:
+                    write_all(fd, pending)
+                    pending, pending_bytes = [], 0
+                now = time.perf_counter()
+                if args.progress_interval and now >= next_report:
+                    print(f'{done + written}/{args.count} passwords '
+                          f'({written / (now - start):,.0f}/s)', file=log)
+                    next_report = now + args.progress_interval
+            write_all(fd, pending)
+    finally:
+        os.close(fd)
+
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed else 0.0
+    print(f'wrote {written} passwords to {args.output} in {elapsed:.2f}s '
+          f'({rate:,.0f} passwords/s)', file=log)
+    return written, rate
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate passwords in bulk to a file')
+    parser.add_argument('-n', '--count', type=int, required=True)
+    parser.add_argument('-l', '--length', type=int, default=16)
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('-f', '--format', choices=FORMATS, default='text')
+    parser.add_argument('--uppercase', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--lowercase', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--digits', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--symbols', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--alphabet', help='custom alphabet (printable ASCII)')
+    parser.add_argument('--resume', action='store_true',
+                        help='keep complete records already in the output file')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--shard-size', type=int, default=250000,
+                        help='passwords generated per process-pool task')
+    parser.add_argument('--progress-interval', type=float, default=5.0,
+                        help='seconds between progress lines (0 disables)')
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error('--count must be positive')
+    if not 4 <= args.length <= 128:
+        parser.error('--length must be between 4 and 128')
+    if args.workers < 1 or args.shard_size < 1:
+        parser.error('--workers and --shard-size must be positive')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        run(args)
+    except ValueError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
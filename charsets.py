@@ -0,0 +1,64 @@
+"""
+Password Generator - Character Set Registry
+Precomputed lookup tables for every option combination plus cached custom alphabets
+"""
+
+from functools import lru_cache
+from itertools import product
+from types import MappingProxyType
+import string
+import os
+
+from engine import compile_alphabet
+
+CUSTOM_CHARSET_CACHE_SIZE = int(os.getenv('CUSTOM_CHARSET_CACHE_SIZE', 256))
+
+DEFAULT_CHARACTERS = string.ascii_letters + string.digits + string.punctuation
+
+
+def _characters(use_uppercase, use_lowercase, use_digits, use_symbols):
+    characters = ''
+    if use_lowercase:
+        characters += string.ascii_lowercase
+    if use_uppercase:
+        characters += string.ascii_uppercase
+    if use_digits:
+        characters += string.digits
+    if use_symbols:
+        characters += string.punctuation
+    return characters or DEFAULT_CHARACTERS
+
+
+# Keyed by (uppercase, lowercase, digits, symbols); all 16 combinations are
+# compiled once at import so requests never rebuild alphabets or tables.
+CHARSETS = MappingProxyType({
+    flags: compile_alphabet(_characters(*flags))
+    for flags in product((False, True), repeat=4)
+})
+
+
+def get_charset(use_uppercase=True, use_lowercase=True,
+                use_digits=True, use_symbols=True):
+    return CHARSETS[(bool(use_uppercase), bool(use_lowercase),
+                     bool(use_digits), bool(use_symbols))]
+
+
+def option_set_name(use_uppercase, use_lowercase, use_digits, use_symbols):
+    """Short label for a flag combination, e.g. ``'ulds'`` or ``'ld'``."""
+    flags = (use_uppercase, use_lowercase, use_digits, use_symbols)
+    return ''.join(letter for letter, on in zip('ulds', flags) if on) or 'ulds'
+
+
+@lru_cache(maxsize=CUSTOM_CHARSET_CACHE_SIZE)
+def custom_charset(alphabet):
+    """Compile a user-supplied alphabet, reusing tables for repeated alphabets.
+
+    Raises ValueError unless the alphabet has at least two distinct printable
+    ASCII characters: one character gives zero-entropy passwords, and
+    control characters break line-oriented output.
+    """
+    if not alphabet.isascii() or not alphabet.isprintable():
+        raise ValueError('alphabet must contain only printable ASCII characters')
+    if len(set(alphabet)) < 2:
+        raise ValueError('alphabet must contain at least two distinct characters')
+    return compile_alphabet(alphabet)
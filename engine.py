@@ -0,0 +1,119 @@
+"""
+Password Generator - Bulk Entropy Engine
+Maps blocks of entropy-source randomness onto an alphabet with unbiased rejection sampling
+"""
+
+from array import array
+from collections import namedtuple
+
+import entropy
+
+# Largest single read from the entropy source
+MAX_DRAW = 1 << 20
+
+# 32-bit unsigned array typecode ('I' on every mainstream platform)
+_WORD_TYPE = 'I' if array('I').itemsize == 4 else 'L'
+_WORD_SPACE = 1 << 32
+
+# Callables invoked with the number of random bytes read on every draw
+draw_listeners = []
+
+CompiledAlphabet = namedtuple(
+    'CompiledAlphabet', ['characters', 'size', 'table', 'reject', 'acceptance'])
+
+
+def compile_alphabet(characters):
+    """Build the byte lookup tables used to sample from ``characters``.
+
+    Every byte value below the largest multiple of the alphabet size maps to
+    ``characters[byte % size]``; the remaining bytes are rejected, so each
+    character is drawn with exactly equal probability.
+    """
+    characters = ''.join(dict.fromkeys(characters))
+    size = len(characters)
+    if not 1 <= size <= 256:
+        raise ValueError('alphabet must contain between 1 and 256 distinct characters')
+    if not characters.isascii():
+        raise ValueError('alphabet must contain only ASCII characters')
+
+    limit = 256 - (256 % size)
+    encoded = characters.encode('ascii')
+    table = (encoded * (256 // size + 1))[:256]
+    reject = bytes(range(limit, 256))
+    return CompiledAlphabet(characters, size, table, reject, limit / 256)
+
+
+def random_string(alphabet, length):
+    """Return ``length`` uniformly random characters from a compiled alphabet.
+
+    Random bytes are drawn in blocks sized for the expected rejection rate and
+    translated in a single ``bytes.translate`` call, which both maps accepted
+    bytes to characters and deletes the rejected ones.
+    """
+    chunks = []
+    needed = length
+    while needed > 0:
+        draw = min(MAX_DRAW, int(needed / alphabet.acceptance) + 16)
+        chunk = entropy.read(draw).translate(alphabet.table, alphabet.reject)
+        for listener in draw_listeners:
+            listener(draw)
+        chunk = chunk[:needed]
+        chunks.append(chunk)
+        needed -= len(chunk)
+    return b''.join(chunks).decode('ascii')
+
+
+def random_below(n, count):
+    """Return ``count`` uniformly random integers in ``[0, n)``.
+
+    Values are read as big-endian integers of the smallest byte width that
+    covers ``n``; values at or above the largest multiple of ``n`` are
+    rejected so the modulo reduction stays unbiased.
+    """
+    if n < 1:
+        raise ValueError('n must be positive')
+    width = max(1, ((n - 1).bit_length() + 7) // 8)
+    space = 1 << (8 * width)
+    limit = space - space % n
+    values = []
+    while len(values) < count:
+        needed = count - len(values)
+        draw = min(MAX_DRAW, (int(needed * space / limit) + 4) * width)
+        data = entropy.read(draw)
+        for listener in draw_listeners:
+            listener(draw)
+        values.extend(value % n for value in (
+            int.from_bytes(data[start:start + width], 'big')
+            for start in range(0, draw - width + 1, width)) if value < limit)
+    return values[:count]
+
+
+class RandomIndexes:
+    """Uniform integers below varying bounds served from buffered draws.
+
+    Each value consumes one 32-bit word; words at or above the largest
+    multiple of ``n`` below 2**32 are skipped, so every result is unbiased
+    while the entropy source is only asked for randomness once per block.
+    """
+
+    def __init__(self, expected=64):
+        self._expected = max(16, expected)
+        self._words = array(_WORD_TYPE)
+        self._position = 0
+
+    def _refill(self):
+        draw = min(MAX_DRAW, self._expected * 4)
+        self._words = array(_WORD_TYPE, entropy.read(draw))
+        self._position = 0
+        for listener in draw_listeners:
+            listener(draw)
+
+    def below(self, n):
+        limit = _WORD_SPACE - _WORD_SPACE % n
+        while True:
+            if self._position == len(self._words):
+                self._refill()
+            value = self._words[self._position]
+            self._position += 1
+            if value < limit:
+                return value % n
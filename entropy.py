@@ -0,0 +1,200 @@
+"""
+Password Generator - Entropy Sources
+Buffered OS randomness with continuous health tests and a test-only seeded source
+"""
+
+import hashlib
+import math
+import os
+import threading
+
+# Bytes fetched from the OS per refill; small draws are served from this buffer
+ENTROPY_BUFFER_SIZE = int(os.getenv('ENTROPY_BUFFER_SIZE', 64 * 1024))
+
+# SP 800-90B 4.4 continuous health tests: assessed min-entropy per byte,
+# false-alarm probability per test, and the adaptive proportion window
+HEALTH_MIN_ENTROPY = 8
+HEALTH_ALPHA = 2.0 ** -40
+APT_WINDOW = 512
+
+
+class EntropyError(RuntimeError):
+    """The entropy source failed its health tests and must not be used."""
+
+
+def rct_cutoff(min_entropy=HEALTH_MIN_ENTROPY, alpha=HEALTH_ALPHA):
+    """Repetition count test cutoff: ``1 + ceil(-log2(alpha) / H)``."""
+    return 1 + math.ceil(-math.log2(alpha) / min_entropy)
+
+
+def apt_cutoff(window=APT_WINDOW, min_entropy=HEALTH_MIN_ENTROPY, alpha=HEALTH_ALPHA):
+    """Adaptive proportion test cutoff: ``1 + CRITBINOM(W, 2**-H, 1 - alpha)``.
+
+    The upper tail is summed directly (not ``1 - cdf``) so tiny ``alpha``
+    values do not vanish in floating point cancellation.
+    """
+    p = 2.0 ** -min_entropy
+    pmf = [math.comb(window, k) * p ** k * (1 - p) ** (window - k) for k in range(window + 1)]
+    tail = 0.0
+    for k in range(window, -1, -1):
+        tail += pmf[k]
+        if tail > alpha:
+            return 1 + k
+    return 1
+
+
+class HealthTests:
+    """Repetition count and adaptive proportion tests over a byte stream.
+
+    The repetition count test XORs the block with itself shifted by one
+    byte (as big integers) and looks for ``rct_cutoff - 1`` zero bytes in a
+    row, carrying the tail across blocks; the adaptive proportion test
+    counts the first byte of each 512-byte window within that window. Both
+    run in C instead of looping over bytes in Python.
+    """
+
+    def __init__(self, min_entropy=HEALTH_MIN_ENTROPY, alpha=HEALTH_ALPHA, window=APT_WINDOW):
+        self.rct_cutoff = rct_cutoff(min_entropy, alpha)
+        self.apt_cutoff = apt_cutoff(window, min_entropy, alpha)
+        self.window = window
+        self._run = bytes(self.rct_cutoff - 1)
+        self._carry = b''
+
+    def check(self, block):
+        """Return False if ``block`` fails either test."""
+        joined = self._carry + block
+        self._carry = joined[-(self.rct_cutoff - 1):]
+        if len(joined) > 1:
+            same = (int.from_bytes(joined[:-1], 'big') ^ int.from_bytes(joined[1:], 'big'))
+            if same.to_bytes(len(joined) - 1, 'big').find(self._run) >= 0:
+                return False
+        window = self.window
+        for start in range(0, len(block) - window + 1, window):
+            if block.count(block[start:start + 1], start, start + window) >= self.apt_cutoff:
+                return False
+        return True
+
+    def reset(self):
+        self._carry = b''
+
+
+class EntropySource:
+    """Interface for random byte sources used by the engine."""
+
+    def read(self, n):
+        """Return ``n`` random bytes."""
+        raise NotImplementedError
+
+    def reseed(self):
+        """Drop any buffered state (called after fork)."""
+
+    def healthy(self):
+        return True
+
+
+class OSEntropySource(EntropySource):
+    """Buffered reader over ``os.urandom`` with continuous health tests.
+
+    Small reads are sliced from a shared block, so a password costs one
+    ``getrandom`` call per ``buffer_size`` bytes instead of one per draw;
+    reads of at least a block go to the OS directly. Every block is health
+    tested. A failing block is discarded and fetched once more; a second
+    consecutive failure marks the source unhealthy and raises EntropyError.
+    The buffer is dropped in forked children so two processes never hand
+    out the same bytes.
+    """
+
+    def __init__(self, buffer_size=ENTROPY_BUFFER_SIZE, health_tests=None):
+        self.buffer_size = max(APT_WINDOW, buffer_size // APT_WINDOW * APT_WINDOW)
+        self.health_tests = health_tests or HealthTests()
+        self.failures = 0
+        self._failed = False
+        self._lock = threading.Lock()
+        self._buffer = b''
+        self._position = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reseed)
+
+    def _fetch(self, n):
+        for _ in range(2):
+            block = os.urandom(n)
+            if self.health_tests.check(block):
+                return block
+            self.failures += 1
+            self.health_tests.reset()
+        self._failed = True
+        raise EntropyError('OS entropy source failed repeated health tests')
+
+    def read(self, n):
+        with self._lock:
+            if self._failed:
+                raise EntropyError('OS entropy source failed health tests')
+            if n >= self.buffer_size:
+                return self._fetch(n)
+            if len(self._buffer) - self._position < n:
+                self._buffer = self._fetch(self.buffer_size)
+                self._position = 0
+            start = self._position
+            self._position += n
+            return self._buffer[start:self._position]
+
+    def reseed(self):
+        # Runs in the forked child, possibly while another parent thread held the lock
+        self._lock = threading.Lock()
+        self._buffer = b''
+        self._position = 0
+        self.health_tests.reset()
+
+    def healthy(self):
+        return not self._failed
+
+
+class SeededEntropySource(EntropySource):
+    """Deterministic SHAKE-256 counter-mode stream for reproducible tests.
+
+    Refuses to exist outside a running pytest test, so it can never end
+    up generating real passwords.
+    """
+
+    def __init__(self, seed):
+        if 'PYTEST_CURRENT_TEST' not in os.environ:
+            raise RuntimeError('SeededEntropySource is only available inside tests')
+        self.seed = seed if isinstance(seed, bytes) else str(seed).encode('utf-8')
+        self._counter = 0
+        self._buffer = b''
+
+    def read(self, n):
+        while len(self._buffer) < n:
+            block = hashlib.shake_256(self.seed + self._counter.to_bytes(8, 'big')).digest(4096)
+            self._buffer += block
+            self._counter += 1
+        data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+
+_source = OSEntropySource()
+
+
+def get_source():
+    return _source
+
+
+def set_source(source):
+    """Install ``source`` and return the previous one."""
+    global _source
+    previous, _source = _source, source
+    return previous
+
+
+def read(n):
+    """Return ``n`` bytes from the active entropy source."""
+    return _source.read(n)
+
+
+def reseed():
+    """Drop buffered randomness (gunicorn post_fork hook)."""
+    _source.reseed()
+
+
+def healthy():
+    return _source.healthy()
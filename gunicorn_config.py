@@ -2,8 +2,12 @@
 Gunicorn configuration file for Password Generator
 """
 
+import json
 import os
 import multiprocessing
+import shutil
+
+import autotune
 
 # ============================================================================
 # Server Socket
@@ -14,14 +18,46 @@ backlog = 2048
 # ============================================================================
 # Worker Processes
 # ============================================================================
-# Calculate optimal workers: (2 x CPU cores) + 1
-workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
-worker_class = 'sync'  # Options: sync, gevent, eventlet
-worker_connections = 1000
-max_requests = 1000  # Restart workers after this many requests (prevents memory leaks)
-max_requests_jitter = 50  # Randomize restart to avoid all workers restarting at once
+# Serving profiles, selected with GUNICORN_WORKER_CLASS:
+#   sync    - one request per process; slow clients pin a whole worker
+#   gthread - thread pool per worker; idle keep-alive connections wait in a
+#             selector instead of holding a thread (no extra dependencies)
+#   gevent  - cooperative greenlets, thousands of concurrent keep-alive
+#             connections per worker (requires: pip install gevent)
+WORKER_PROFILES = {
+    'sync': {'threads': 1, 'worker_connections': 1000, 'keepalive': 2},
+    'gthread': {'threads': 8, 'worker_connections': 2000, 'keepalive': 75},
+    'gevent': {'threads': 1, 'worker_connections': 4000, 'keepalive': 75},
+}
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+if worker_class not in WORKER_PROFILES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of: {', '.join(WORKER_PROFILES)}")
+_profile = WORKER_PROFILES[worker_class]
+
+# Worker count, threads and max_requests come from the container's cgroup
+# CPU quota and memory limit (not the host's cores) and the measured RSS of
+# a freshly started worker; GUNICORN_WORKERS, GUNICORN_THREADS and
+# GUNICORN_MAX_REQUESTS still override. GUNICORN_AUTOTUNE=False restores
+# the plain (2 x host cores) + 1 rule.
+if os.getenv('GUNICORN_AUTOTUNE', 'True').lower() == 'true':
+    _plan = autotune.autotune(_profile['threads'])
+else:
+    _plan = autotune.Plan(multiprocessing.cpu_count(), None, None,
+                          multiprocessing.cpu_count() * 2 + 1, _profile['threads'],
+                          1000, 50, 'disabled')
+workers = int(os.getenv('GUNICORN_WORKERS', _plan.workers))
+threads = int(os.getenv('GUNICORN_THREADS', _plan.threads))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', _profile['worker_connections']))
+# Restart workers after this many requests (bounds memory growth); the
+# jitter keeps them from all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', _plan.max_requests))
+max_requests_jitter = max(1, max_requests // 20)
+_plan = _plan._replace(workers=workers, threads=threads, max_requests=max_requests,
+                       max_requests_jitter=max_requests_jitter)
+# Workers (and /version) read the final plan from the environment
+os.environ[autotune.PLAN_ENV] = json.dumps(_plan._asdict())
 timeout = 30
-keepalive = 2
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', _profile['keepalive']))
 
 # ============================================================================
 # Logging
@@ -58,8 +94,122 @@ user = None  # Run as current user (appuser in Docker)
 group = None
 tmp_upload_dir = None
 
-# Preload app for faster worker spawn (use with caution)
-preload_app = False
+# Preload the app in the master so workers (and recycled workers) fork a
+# fully imported app instead of re-importing Flask and rendering templates.
+# app.create_app() creates no threads, files or random state before fork.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# ============================================================================
+# Metrics
+# ============================================================================
+def _instance_dir(name, default):
+    """Point ``name`` at a subdirectory of its configured value named after
+    this master's pid, so a second instance (or a USR2 upgrade) never clears
+    or adds up this instance's files. The configured parent is remembered in
+    ``<name>_BASE`` because a re-executed master inherits our environment.
+    An empty value keeps the state in-process."""
+    base = os.environ.get(f'{name}_BASE', os.environ.get(name, default))
+    os.environ[f'{name}_BASE'] = base
+    os.environ[name] = os.path.join(base, str(os.getpid())) if base else ''
+    return os.environ[name]
+
+
+# Workers share /metrics state through files in this directory
+_metrics_dir = _instance_dir('METRICS_MULTIPROC_DIR', '/tmp/password-generator-metrics')
+# Rate limit buckets are shared by all workers through a file in this directory
+_rate_limit_dir = _instance_dir('RATE_LIMIT_DIR', '/tmp/password-generator-ratelimit')
+
+# ============================================================================
+# Probes
+# ============================================================================
+# The master answers /health, /health/live, /health/ready and /version on
+# this port from its own thread, so probes never queue behind busy workers
+# (0 disables; the same paths stay available on the main port). If the port
+# is taken (a second instance, a USR2 upgrade) probes stay on the main port.
+# Its readiness includes every worker's pool and entropy checks, reported
+# through files in this master's METRICS_MULTIPROC_DIR.
+probe_port = int(os.getenv('PROBE_PORT', 5001))
+_probe_server = None
+_worker_health = None
+
+# ============================================================================
+# Server Hooks
+# ============================================================================
+def on_starting(server):
+    import metrics
+    import ratelimit
+    # Only this master's own directory (left over if its pid was reused)
+    metrics.clear_directory()
+    ratelimit.clear_directory()
+
+
+def when_ready(server):
+    global _probe_server, _worker_health
+    server.log.info('Autotune: %s', autotune.describe(_plan))
+    if not probe_port:
+        return
+    from app import app
+    import entropy
+    from probes import ProbeResponses, WorkerHealth, self_test, start_probe_server
+    refresh_seconds = app.config['PROBE_REFRESH_SECONDS']
+    worker_health = WorkerHealth(_metrics_dir, refresh_seconds) if _metrics_dir else None
+
+    def workers_ready():
+        pids = list(server.WORKERS)
+        if worker_health is None:
+            return len(pids) > 0
+        return worker_health.ready(pids)
+
+    probes = ProbeResponses(
+        app.config['APP_VERSION'], app.config['ENVIRONMENT'],
+        {'self_test': self_test, 'entropy': entropy.healthy, 'workers': workers_ready},
+        refresh_seconds, _plan._asdict())
+    try:
+        _probe_server = start_probe_server(probes, probe_port)
+    except OSError as e:
+        server.log.warning('Probe port %s unavailable (%s); probes are served on '
+                           'the main port only', probe_port, e)
+        return
+    _worker_health = worker_health
+    server.log.info('Probe server listening on port %s', probe_port)
+
+
+def post_fork(server, worker):
+    import entropy
+    # Never serve random bytes buffered before the fork (also done by a
+    # register_at_fork handler; explicit here in case the app preloaded)
+    entropy.reseed()
+    # Workers inherit the master's probe socket; only the master serves it
+    if _probe_server is not None:
+        _probe_server.socket.close()
+
+
+def post_worker_init(worker):
+    # Publish this worker's readiness (pool, entropy) for the master's probe
+    if _worker_health is not None:
+        from app import app
+        _worker_health.start_reporting(app.extensions['probes'].checks)
+
+
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
+    if _worker_health is not None:
+        _worker_health.remove(worker.pid)
+
+
+def on_exit(server):
+    for directory in (_metrics_dir, _rate_limit_dir):
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def worker_exit(server, worker):
+    # Wipe pre-generated passwords before the worker goes away
+    from app import app
+    password_pool = app.extensions.get('password_pool')
+    if password_pool is not None:
+        password_pool.clear()
 
 # ============================================================================
 # Security
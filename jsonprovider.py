@@ -0,0 +1,104 @@
+"""
+Password Generator - JSON Provider
+orjson-backed Flask JSON provider with a compact stdlib fallback and
+pre-encoded response fragments
+"""
+
+import json
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json with compact separators
+    orjson = None
+
+# auto (orjson when installed), orjson or stdlib
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+
+# orjson >= 3.9 copies pre-encoded bytes straight into its output
+_RAW = getattr(orjson, 'Fragment', None)
+
+
+class Fragment:
+    """A constant JSON value encoded once, for use anywhere in a response.
+
+    orjson >= 3.9 inserts ``raw`` without re-encoding; older orjson and the
+    stdlib encoder fall back to serializing ``value``. (Not a tuple: the
+    stdlib encoder would serialize tuples itself without asking ``default``.)
+    """
+
+    __slots__ = ('value', 'raw')
+
+    def __init__(self, value):
+        self.value = value
+        self.raw = encode(value)
+
+
+def _default(o):
+    if isinstance(o, Fragment):
+        return _RAW(o.raw) if _RAW is not None else o.value
+    return DefaultJSONProvider.default(o)
+
+
+def _stdlib_default(o):
+    if isinstance(o, Fragment):
+        return o.value
+    return DefaultJSONProvider.default(o)
+
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """Stdlib provider without key sorting; compact unless in debug mode."""
+
+    sort_keys = False
+    default = staticmethod(_stdlib_default)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serializes with orjson; objects it cannot encode (and datetimes, to
+    keep Flask's HTTP date format) go through Flask's default hook."""
+
+    default = staticmethod(_default)
+
+    def _option(self):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self._option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=self._option()),
+            mimetype=self.mimetype)
+
+
+def provider_class(name=JSON_PROVIDER):
+    if name not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError('JSON_PROVIDER must be one of: auto, orjson, stdlib')
+    if name == 'orjson' and orjson is None:
+        raise ValueError('JSON_PROVIDER=orjson but orjson is not installed')
+    if name == 'stdlib' or orjson is None:
+        return CompactJSONProvider
+    return OrjsonProvider
+
+
+_encoder = json.JSONEncoder(separators=(',', ':'), default=CompactJSONProvider.default)
+
+
+def encode(obj):
+    """Compact JSON bytes, usable without an application."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return _encoder.encode(obj).encode('utf-8')
+
+
+def init_app(app):
+    app.json = provider_class(app.config['JSON_PROVIDER'])(app)
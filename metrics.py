@@ -0,0 +1,359 @@
+"""
+Password Generator - Prometheus Metrics
+Request, latency and generation metrics aggregated across gunicorn worker processes
+"""
+
+from contextlib import contextmanager
+import fcntl
+import glob
+import mmap
+import os
+import struct
+import threading
+import time
+
+from flask import Response, g, request
+
+import engine
+
+# Directory shared by all workers; empty keeps metrics in-process only
+METRICS_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+GENERATION_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                      0.0025, 0.005, 0.01, 0.05, 0.25, 1.0)
+LENGTH_BUCKETS = ((8, '4-8'), (16, '9-16'), (32, '17-32'), (64, '33-64'), (128, '65-128'))
+
+METRICS = {
+    'http_requests_total': ('counter', 'Total HTTP requests.'),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by route.'),
+    'http_requests_in_flight': ('gauge', 'HTTP requests currently being handled.'),
+    'password_generation_seconds': ('histogram', 'Password generation time by length bucket and option set.'),
+    'password_entropy_bytes_total': ('counter', 'Random bytes read from the OS entropy source.'),
+    'breached_passwords_total': ('counter', 'Passwords found in the breach filter, by source.'),
+}
+
+_HEADER = struct.Struct('<Q')  # bytes used
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+_INITIAL_SIZE = 64 * 1024
+
+
+class _MmapValues:
+    """Append-only ``key -> float`` file written by a single process.
+
+    Records are ``[u32 key length][key, padded to 8 bytes][f64 value]`` after an
+    8-byte header holding the number of bytes in use, so other processes can
+    read a consistent snapshot at any time without locking.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or _HEADER.size
+        self._positions = {key: position for key, position, _ in _read_records(self._map)}
+
+    def inc(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._append(key)
+        value = _VALUE.unpack_from(self._map, position)[0]
+        _VALUE.pack_into(self._map, position, value + amount)
+
+    def _append(self, key):
+        encoded = key.encode('utf-8')
+        padded = (_KEY_LENGTH.size + len(encoded) + 7) // 8 * 8
+        needed = self._used + padded + _VALUE.size
+        if needed > len(self._map):
+            size = len(self._map)
+            while size < needed:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        _KEY_LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + _KEY_LENGTH.size:self._used + _KEY_LENGTH.size + len(encoded)] = encoded
+        position = self._used + padded
+        _VALUE.pack_into(self._map, position, 0.0)
+        self._used = position + _VALUE.size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = position
+        return position
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def _read_records(data):
+    used = _HEADER.unpack_from(data, 0)[0] if len(data) >= _HEADER.size else 0
+    offset = _HEADER.size
+    while offset < used:
+        key_length = _KEY_LENGTH.unpack_from(data, offset)[0]
+        start = offset + _KEY_LENGTH.size
+        key = bytes(data[start:start + key_length]).decode('utf-8')
+        position = offset + (_KEY_LENGTH.size + key_length + 7) // 8 * 8
+        yield key, position, _VALUE.unpack_from(data, position)[0]
+        offset = position + _VALUE.size
+
+
+def _read_file(path):
+    try:
+        with open(path, 'rb') as source:
+            data = source.read()
+    except FileNotFoundError:
+        return
+    yield from ((key, value) for key, _, value in _read_records(data))
+
+
+class MetricsStore:
+    """Counter/gauge storage shared across worker processes.
+
+    Cumulative values live in ``metrics_<pid>.db`` and in-flight gauges in
+    ``live_<pid>.db``. When a worker dies its cumulative values are merged
+    into ``metrics_archive.db`` and its live file is removed.
+    """
+
+    def __init__(self, directory=METRICS_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pid = None
+        self._values = {}
+        self._live = {}
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def _files(self):
+        # Called with the lock held; files are opened lazily per process so
+        # a store created before a fork never shares the parent's files.
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid = pid
+            self._values = _MmapValues(os.path.join(self.directory, f'metrics_{pid}.db'))
+            self._live = _MmapValues(os.path.join(self.directory, f'live_{pid}.db'))
+        return self._values, self._live
+
+    def inc(self, key, amount=1.0):
+        with self._lock:
+            if self.directory:
+                self._files()[0].inc(key, amount)
+            else:
+                self._values[key] = self._values.get(key, 0.0) + amount
+
+    def inc_live(self, key, amount=1.0):
+        with self._lock:
+            if self.directory:
+                self._files()[1].inc(key, amount)
+            else:
+                self._live[key] = self._live.get(key, 0.0) + amount
+
+    def collect(self):
+        """Return every key summed over live and dead worker processes."""
+        if not self.directory:
+            with self._lock:
+                totals = dict(self._values)
+                for key, value in self._live.items():
+                    totals[key] = totals.get(key, 0.0) + value
+            return totals
+        totals = {}
+        with _archive_lock(self.directory, fcntl.LOCK_SH):
+            paths = glob.glob(os.path.join(self.directory, '*.db'))
+            for path in paths:
+                for key, value in _read_file(path):
+                    totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._live = {}
+        self._pid = None
+
+
+@contextmanager
+def _archive_lock(directory, operation):
+    with open(os.path.join(directory, 'archive.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Dead workers waiting to be folded, and whether this process is folding
+_dead_pids = []
+_folding = False
+
+
+def _fold(pid, directory):
+    path = os.path.join(directory, f'metrics_{pid}.db')
+    archive = _MmapValues(os.path.join(directory, 'metrics_archive.db'))
+    try:
+        for key, value in _read_file(path):
+            archive.inc(key, value)
+    finally:
+        archive.close()
+    for name in (f'metrics_{pid}.db', f'live_{pid}.db'):
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+def mark_process_dead(pid, directory=METRICS_DIR):
+    """Fold a dead worker's counters into the archive (gunicorn child_exit hook).
+
+    gunicorn reaps workers from its SIGCHLD handler, so this can be entered
+    again while it holds the archive lock. ``flock`` on a second descriptor
+    would then block on this process's own lock forever; a nested call only
+    queues its pid for the fold already running.
+    """
+    global _folding
+    if not directory:
+        return
+    _dead_pids.append(pid)
+    while _dead_pids and not _folding:
+        _folding = True
+        try:
+            with _archive_lock(directory, fcntl.LOCK_EX):
+                while _dead_pids:
+                    _fold(_dead_pids.pop(), directory)
+        finally:
+            _folding = False
+
+
+def clear_directory(directory=METRICS_DIR):
+    """Remove stale files from a previous run (gunicorn on_starting hook)."""
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        os.remove(path)
+
+
+store = MetricsStore()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _key(family, sample, labels):
+    rendered = ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f'{family}|{sample}|{rendered}'
+
+
+def inc_counter(name, labels=(), amount=1.0):
+    store.inc(_key(name, name, labels), amount)
+
+
+def observe(name, value, buckets, labels=()):
+    # Buckets are stored non-cumulatively and summed at render time
+    for bound in buckets:
+        if value <= bound:
+            break
+    else:
+        bound = '+Inf'
+    store.inc(_key(name, name + '_bucket', labels + (('le', bound),)))
+    store.inc(_key(name, name + '_sum', labels), value)
+    store.inc(_key(name, name + '_count', labels))
+
+
+def length_bucket(length):
+    for bound, label in LENGTH_BUCKETS:
+        if length <= bound:
+            return label
+    return f'>{LENGTH_BUCKETS[-1][0]}'
+
+
+@contextmanager
+def time_generation(length, option_set):
+    start = time.perf_counter()
+    yield
+    observe('password_generation_seconds', time.perf_counter() - start,
+            GENERATION_BUCKETS, (('length', length_bucket(length)), ('options', option_set)))
+
+
+def render(values):
+    """Render collected values in the Prometheus text exposition format."""
+    families = {}
+    for key, value in values.items():
+        family, sample, labels = key.split('|', 2)
+        families.setdefault(family, []).append((sample, labels, value))
+
+    lines = []
+    for family in sorted(families):
+        kind, help_text = METRICS.get(family, ('untyped', family))
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {kind}')
+        if kind == 'histogram':
+            samples = _cumulative_buckets(families[family])
+        else:
+            samples = sorted(families[family])
+        for sample, labels, value in samples:
+            value = int(value) if value == int(value) else value
+            lines.append(f'{sample}{{{labels}}} {value}' if labels else f'{sample} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _cumulative_buckets(samples):
+    series = {}
+    others = []
+    for sample, labels, value in samples:
+        if sample.endswith('_bucket'):
+            base, _, bound = labels.rpartition('le="')
+            series.setdefault((sample, base.rstrip(',')), {})[bound.rstrip('"')] = value
+        else:
+            others.append((sample, labels, value))
+    buckets_by_family = {'http_request_duration_seconds': REQUEST_BUCKETS,
+                         'password_generation_seconds': GENERATION_BUCKETS}
+    result = []
+    for (sample, base), counts in sorted(series.items()):
+        bounds = buckets_by_family.get(sample[:-len('_bucket')], ())
+        running = 0.0
+        for bound in [str(b) for b in bounds] + ['+Inf']:
+            running += counts.get(bound, 0.0)
+            labels = f'{base},le="{bound}"' if base else f'le="{bound}"'
+            result.append((sample, labels, running))
+    return sorted(others) + result
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    store.inc_live(_key('http_requests_in_flight', 'http_requests_in_flight', ()))
+
+
+def _after_request(response):
+    route = request.url_rule.rule if request.url_rule else '<unmatched>'
+    inc_counter('http_requests_total', (('method', request.method), ('route', route),
+                                        ('status', response.status_code)))
+    start = g.pop('metrics_start', None)
+    if start is not None:
+        observe('http_request_duration_seconds', time.perf_counter() - start,
+                REQUEST_BUCKETS, (('route', route),))
+        # Streaming responses stay in flight until the body is fully sent
+        response.call_on_close(_request_finished)
+    return response
+
+
+def _request_finished():
+    store.inc_live(_key('http_requests_in_flight', 'http_requests_in_flight', ()), -1.0)
+
+
+def _record_entropy(count):
+    inc_counter('password_entropy_bytes_total', amount=count)
+
+
+def init_app(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if _record_entropy not in engine.draw_listeners:
+        engine.draw_listeners.append(_record_entropy)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render(store.collect()),
+                        mimetype='text/plain; version=0.0.4')
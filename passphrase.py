@@ -0,0 +1,113 @@
+"""
+Password Generator - Passphrase Mode
+Diceware-style passphrases drawn from a memory-mapped wordlist
+"""
+
+from array import array
+from functools import lru_cache
+import math
+import mmap
+import os
+import string
+
+from engine import random_below
+
+WORDLIST_PATH = os.getenv(
+    'WORDLIST_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wordlists', 'eff_large.txt'))
+
+MIN_WORDS = 3
+MAX_WORDS = 20
+MAX_SEPARATOR_LENGTH = 8
+DIGITS = string.digits
+SYMBOLS = string.punctuation
+
+
+class Wordlist:
+    """Newline-separated wordlist indexed by an array of line offsets.
+
+    The file is mapped read-only, so forked workers share its pages, and the
+    index is a single ``array('I')`` instead of one ``str`` object per word.
+    Words are only decoded when they are picked. Lines with anything but
+    letters (the EFF list has four hyphenated words) are left out of the
+    index, so no valid separator can appear inside a word and the entropy
+    is computed from the words actually drawn from.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as source:
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets = array('I')
+        position = 0
+        size = len(self._map)
+        while position < size:
+            end = self._map.find(b'\n', position)
+            if end == -1:
+                end = size
+            if end > position and self._map[position:end].decode('utf-8').rstrip('\r').isalpha():
+                offsets.append(position)
+            position = end + 1
+        self._offsets = offsets
+        if len(self) < 2:
+            raise ValueError(f'wordlist {path} must contain at least two words')
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        start = self._offsets[index]
+        end = self._map.find(b'\n', start)
+        if end == -1:
+            end = len(self._map)
+        return self._map[start:end].decode('utf-8').rstrip('\r')
+
+
+@lru_cache(maxsize=None)
+def load_wordlist(path=WORDLIST_PATH):
+    """Load and index a wordlist once per path."""
+    return Wordlist(path)
+
+
+def check_separator(separator):
+    """Raise ValueError unless words stay unambiguous once joined.
+
+    An empty separator or one containing letters lets adjacent words run
+    together, so the passphrase no longer has the entropy reported for it.
+    """
+    if not 1 <= len(separator) <= MAX_SEPARATOR_LENGTH:
+        raise ValueError(f'separator must be 1-{MAX_SEPARATOR_LENGTH} characters long')
+    if any(c.isalpha() for c in separator):
+        raise ValueError('separator must not contain letters')
+    return separator
+
+
+def passphrase_entropy(words, wordlist_size, include_digit=False, include_symbol=False):
+    """Bits of entropy of a passphrase built by ``generate_passphrase``."""
+    bits = words * math.log2(wordlist_size)
+    if include_digit:
+        bits += math.log2(len(DIGITS) * words)
+    if include_symbol:
+        bits += math.log2(len(SYMBOLS) * words)
+    return bits
+
+
+def generate_passphrase(words=6, separator='-', capitalize=False,
+                        include_digit=False, include_symbol=False, wordlist=None):
+    """Return ``(passphrase, entropy_bits)``.
+
+    A digit and/or symbol is appended to a uniformly chosen word when
+    requested; each adds ``log2(choices * words)`` bits.
+    """
+    check_separator(separator)
+    wordlist = wordlist or load_wordlist()
+    chosen = [wordlist[index] for index in random_below(len(wordlist), words)]
+    if capitalize:
+        chosen = [word.capitalize() for word in chosen]
+    if include_digit:
+        position, digit = random_below(words, 1)[0], random_below(len(DIGITS), 1)[0]
+        chosen[position] += DIGITS[digit]
+    if include_symbol:
+        position, symbol = random_below(words, 1)[0], random_below(len(SYMBOLS), 1)[0]
+        chosen[position] += SYMBOLS[symbol]
+    entropy = passphrase_entropy(words, len(wordlist), include_digit, include_symbol)
+    return separator.join(chosen), entropy
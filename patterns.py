@@ -0,0 +1,164 @@
+"""
+Password Generator - Pattern Templates
+Compiles templates such as ``Aaaa-9999-!!`` or ``[A-Z]{3}[0-9]{4}`` into cached plans
+"""
+
+from functools import lru_cache
+from itertools import repeat
+import math
+import os
+import string
+
+from charsets import DEFAULT_CHARACTERS, custom_charset
+from engine import random_string
+
+PATTERN_CACHE_SIZE = int(os.getenv('PATTERN_CACHE_SIZE', 256))
+
+MAX_TEMPLATE_LENGTH = 256
+MAX_PATTERN_LENGTH = 128
+
+# Single-character placeholders; any other character is a literal unless
+# escaped with a backslash or written as a [class]
+PLACEHOLDERS = {
+    'A': string.ascii_uppercase,
+    'a': string.ascii_lowercase,
+    '9': string.digits,
+    '!': string.punctuation,
+    '*': DEFAULT_CHARACTERS,
+}
+
+
+def _parse_class(template, position):
+    """Parse ``[...]`` starting after the ``[``; return ``(characters, end)``."""
+    characters = []
+    while True:
+        if position >= len(template):
+            raise ValueError('unterminated character class')
+        char = template[position]
+        if char == ']' and characters:
+            return ''.join(characters), position + 1
+        if char == '\\':
+            position += 1
+            if position >= len(template):
+                raise ValueError('pattern ends with a backslash')
+            char = template[position]
+        if (position + 2 < len(template) and template[position + 1] == '-'
+                and template[position + 2] != ']'):
+            last = template[position + 2]
+            if ord(last) < ord(char):
+                raise ValueError(f'invalid range {char}-{last}')
+            characters.extend(chr(code) for code in range(ord(char), ord(last) + 1))
+            position += 3
+        else:
+            characters.append(char)
+            position += 1
+
+
+def _parse_repeat(template, position):
+    """Parse an optional ``{n}`` quantifier; return ``(count, end)``."""
+    if position >= len(template) or template[position] != '{':
+        return 1, position
+    end = template.find('}', position)
+    count = template[position + 1:end] if end > 0 else ''
+    if not count.isdigit():
+        raise ValueError('repeat counts must be written as {n}')
+    return int(count), end + 1
+
+
+def parse_template(template):
+    """Split a template into ``(alphabet_or_None, text)`` tokens.
+
+    Literal tokens carry their text with no alphabet; placeholder and class
+    tokens carry their characters and are repeated ``{n}`` times.
+    """
+    if not template:
+        raise ValueError('pattern must not be empty')
+    if len(template) > MAX_TEMPLATE_LENGTH:
+        raise ValueError(f'pattern must be at most {MAX_TEMPLATE_LENGTH} characters')
+    if not template.isprintable():
+        raise ValueError('pattern must contain only printable characters')
+    tokens = []
+    position = 0
+    while position < len(template):
+        char = template[position]
+        if char == '[':
+            characters, position = _parse_class(template, position + 1)
+            alphabet = characters
+        elif char == '\\':
+            if position + 1 >= len(template):
+                raise ValueError('pattern ends with a backslash')
+            alphabet, char = None, template[position + 1]
+            position += 2
+        elif char in '{}]':
+            raise ValueError(f'unexpected {char!r} at position {position}')
+        else:
+            alphabet = PLACEHOLDERS.get(char)
+            position += 1
+        count, position = _parse_repeat(template, position)
+        if len(tokens) + count > MAX_PATTERN_LENGTH:
+            raise ValueError(f'pattern must produce at most {MAX_PATTERN_LENGTH} characters')
+        tokens.extend([(alphabet, char)] * count)
+    return tokens
+
+
+class Pattern:
+    """A template compiled into per-position alphabets and fixed literals.
+
+    Positions that share an alphabet are filled from one bulk draw: for
+    ``count`` passwords each alphabet is sampled once for all of its
+    positions, every position becomes a column string of ``count``
+    characters, and passwords are assembled column-wise with ``zip``.
+    Adjacent literals are merged into a single repeated column.
+    """
+
+    def __init__(self, template):
+        tokens = parse_template(template)
+        if not any(alphabet for alphabet, _ in tokens):
+            raise ValueError('pattern must contain a placeholder or character class')
+        self.template = template
+        self.length = len(tokens)
+        # Columns are either an alphabet key (index into self.alphabets) or a literal string
+        self.alphabets = []
+        self.columns = []
+        self.positions = []  # per alphabet: column indexes it fills
+        keys = {}
+        for alphabet, text in tokens:
+            if alphabet is not None and len(set(alphabet)) == 1:
+                alphabet, text = None, alphabet[0]  # a one-character class is a literal
+            if alphabet is None:
+                if self.columns and isinstance(self.columns[-1], str):
+                    self.columns[-1] += text
+                else:
+                    self.columns.append(text)
+                continue
+            compiled = custom_charset(alphabet)
+            key = keys.setdefault(compiled.characters, len(self.alphabets))
+            if key == len(self.alphabets):
+                self.alphabets.append(compiled)
+                self.positions.append([])
+            self.positions[key].append(len(self.columns))
+            self.columns.append(key)
+        self.entropy = sum(len(self.positions[key]) * math.log2(alphabet.size)
+                           for key, alphabet in enumerate(self.alphabets))
+        if not self.entropy:
+            raise ValueError('pattern must have at least one position with two or more choices')
+
+    def generate_many(self, count):
+        if count <= 0:
+            return []
+        columns = [repeat(column, count) if isinstance(column, str) else None
+                   for column in self.columns]
+        for alphabet, positions in zip(self.alphabets, self.positions):
+            block = random_string(alphabet, count * len(positions))
+            for index, column in enumerate(positions):
+                columns[column] = block[index * count:(index + 1) * count]
+        return list(map(''.join, zip(*columns)))
+
+    def generate(self):
+        return self.generate_many(1)[0]
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(template):
+    """Compile a template once; raises ValueError for invalid templates."""
+    return Pattern(template)
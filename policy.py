@@ -0,0 +1,142 @@
+"""
+Password Generator - Password Policies
+Builds passwords that satisfy composition rules in one pass, without retries
+"""
+
+from functools import lru_cache
+import string
+
+from engine import RandomIndexes
+
+CLASSES = {
+    'lowercase': string.ascii_lowercase,
+    'uppercase': string.ascii_uppercase,
+    'digits': string.digits,
+    'symbols': string.punctuation,
+}
+
+# Characters commonly confused with one another in print or handwriting
+AMBIGUOUS_CHARACTERS = '0Oo1lI|'
+
+
+def _remaining_counts(min_counts, prefix, suffix):
+    # Prefix and suffix characters count towards their class minimum
+    required = dict(min_counts)
+    for name in (prefix, suffix):
+        if name is not None and required.get(name, 0) > 0:
+            required[name] -= 1
+    return required
+
+
+def required_length(min_counts=(), prefix=None, suffix=None):
+    """Shortest password length that can satisfy the given rules."""
+    required = _remaining_counts(min_counts, prefix, suffix)
+    return sum(required.values()) + bool(prefix) + bool(suffix)
+
+
+class Policy:
+    """Composition rules compiled into per-position character classes.
+
+    A password is built by placing the required class slots at uniformly
+    random positions (a partial Fisher-Yates shuffle) and filling every
+    other slot from the union of the enabled classes. Characters are then
+    drawn left to right; with ``no_repeats`` the previous character is
+    removed from the choices for the next slot, so no retry is ever needed.
+    """
+
+    def __init__(self, classes=tuple(CLASSES), min_counts=(), exclude_ambiguous=False,
+                 no_repeats=False, prefix=None, suffix=None):
+        classes = [name for name in CLASSES if name in set(classes)] or list(CLASSES)
+        min_counts = dict(min_counts)
+        for name in list(min_counts) + [prefix, suffix]:
+            if name is not None and name not in classes:
+                raise ValueError(f'policy class {name!r} is not enabled')
+        if any(count < 0 for count in min_counts.values()):
+            raise ValueError('policy minimum counts must not be negative')
+
+        excluded = set(AMBIGUOUS_CHARACTERS) if exclude_ambiguous else set()
+        self.alphabets = {name: ''.join(c for c in CLASSES[name] if c not in excluded)
+                          for name in classes}
+        self.union = ''.join(self.alphabets.values())
+        if no_repeats and any(len(alphabet) < 2 for alphabet in self.alphabets.values()):
+            raise ValueError('no_repeats needs at least two characters per class')
+
+        # (alphabet, count) per class with required slots outside prefix/suffix
+        required = _remaining_counts(min_counts, prefix, suffix)
+        self.required = tuple((self.alphabets[name], required[name]) for name in classes
+                              if required.get(name, 0) > 0)
+        self.required_count = sum(count for _, count in self.required)
+        self.prefix = self.alphabets[prefix] if prefix else None
+        self.suffix = self.alphabets[suffix] if suffix else None
+        self.no_repeats = no_repeats
+        self.min_length = self.required_count + bool(prefix) + bool(suffix)
+
+    def _slots(self, length, indexes):
+        middle = length - bool(self.prefix) - bool(self.suffix)
+        slots = [self.union] * middle
+        positions = list(range(middle))
+        i = 0
+        for alphabet, count in self.required:
+            for _ in range(count):
+                j = i + indexes.below(middle - i)
+                positions[i], positions[j] = positions[j], positions[i]
+                slots[positions[i]] = alphabet
+                i += 1
+        if self.prefix:
+            slots.insert(0, self.prefix)
+        if self.suffix:
+            slots.append(self.suffix)
+        return slots
+
+    def _build(self, length, indexes):
+        characters = []
+        previous = ''
+        for alphabet in self._slots(length, indexes):
+            skip = alphabet.find(previous) if self.no_repeats and previous else -1
+            if skip < 0:
+                previous = alphabet[indexes.below(len(alphabet))]
+            else:
+                index = indexes.below(len(alphabet) - 1)
+                previous = alphabet[index + (index >= skip)]
+            characters.append(previous)
+        return ''.join(characters)
+
+    def generate(self, length):
+        return self.generate_many(1, length)[0]
+
+    def generate_many(self, count, length):
+        """Return ``count`` compliant passwords sharing one random buffer."""
+        if length < self.min_length:
+            raise ValueError(f'policy needs a length of at least {self.min_length}')
+        indexes = RandomIndexes(count * (length + self.required_count))
+        return [self._build(length, indexes) for _ in range(count)]
+
+    def satisfied_by(self, password):
+        """Check a password against the policy (used by tests and benchmarks)."""
+        if any(c not in self.union for c in password):
+            return False
+        if self.no_repeats and any(a == b for a, b in zip(password, password[1:])):
+            return False
+        if self.prefix and (not password or password[0] not in self.prefix):
+            return False
+        if self.suffix and (not password or password[-1] not in self.suffix):
+            return False
+        for alphabet, needed in self.required:
+            needed += (self.prefix == alphabet) + (self.suffix == alphabet)
+            if sum(c in alphabet for c in password) < needed:
+                return False
+        return True
+
+
+@lru_cache(maxsize=128)
+def compile_policy(classes, min_counts=(), exclude_ambiguous=False, no_repeats=False,
+                   prefix=None, suffix=None):
+    """Cached ``Policy`` for hashable arguments (``min_counts`` as item pairs).
+
+    Raises ValueError for unknown or disabled classes and impossible rules.
+    """
+    unknown = [name for name in (*classes, *dict(min_counts), prefix, suffix)
+               if name is not None and name not in CLASSES]
+    if unknown:
+        raise ValueError(f"unknown policy class {unknown[0]!r}; expected one of: {', '.join(CLASSES)}")
+    return Policy(classes, min_counts, exclude_ambiguous, no_repeats, prefix, suffix)
@@ -0,0 +1,144 @@
+"""
+Password Generator - Pre-generated Password Pool
+Per-worker pools of ready passwords for common option sets, refilled in the background
+"""
+
+from collections import deque
+import atexit
+import os
+import threading
+
+POOL_ENABLED = os.getenv('PASSWORD_POOL_ENABLED', 'False').lower() == 'true'
+POOL_SIZE = int(os.getenv('PASSWORD_POOL_SIZE', 1000))
+POOL_LOW_WATERMARK = int(os.getenv('PASSWORD_POOL_LOW_WATERMARK', 250))
+POOL_OPTION_SETS = os.getenv('PASSWORD_POOL_OPTION_SETS', '12:ulds')
+
+_FLAG_LETTERS = 'ulds'  # uppercase, lowercase, digits, symbols
+
+
+def parse_option_sets(spec):
+    """Parse ``"12:ulds,16:uld"`` into pool keys.
+
+    Each key is ``(length, uppercase, lowercase, digits, symbols)``, matching
+    the arguments of ``generate_password``.
+    """
+    keys = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        length, _, flags = item.partition(':')
+        if set(flags) - set(_FLAG_LETTERS):
+            raise ValueError(f'invalid pool option set: {item!r}')
+        keys.append((int(length),) + tuple(letter in flags for letter in _FLAG_LETTERS))
+    return keys
+
+
+class PasswordPool:
+    """Hands out pre-generated passwords exactly once.
+
+    ``generate(count, key)`` must return ``count`` fresh passwords for a pool
+    key. The refill thread is started lazily in the process that first uses
+    the pool, so a pool created before a fork never leaks passwords or a dead
+    thread into the child.
+    """
+
+    def __init__(self, option_sets, generate, size=POOL_SIZE,
+                 low_watermark=POOL_LOW_WATERMARK):
+        self.size = size
+        self.low_watermark = min(low_watermark, size)
+        self._generate = generate
+        self._keys = tuple(option_sets)
+        self._queues = {key: deque() for key in self._keys}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self.clear)
+
+    def take(self, key):
+        """Return a pooled password for ``key``, or None on a miss."""
+        queue = self._queues.get(key)
+        if queue is None:
+            return None
+        self._ensure_refill_thread()
+        try:
+            password = queue.popleft()
+        except IndexError:
+            password = None
+        with self._lock:
+            if password is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if len(queue) < self.low_watermark:
+            self._wakeup.set()
+        return password
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'size': self.size,
+            'low_watermark': self.low_watermark,
+            'available': {
+                ':'.join([str(key[0]), ''.join(
+                    letter for letter, on in zip(_FLAG_LETTERS, key[1:]) if on)]):
+                    len(queue)
+                for key, queue in self._queues.items()
+            }
+        }
+
+    def healthy(self):
+        """False once the refill thread started in this process has died."""
+        thread = self._thread
+        return thread is None or self._pid != os.getpid() or thread.is_alive()
+
+    def refill(self):
+        """Top every queue back up to ``size``."""
+        for key, queue in self._queues.items():
+            missing = self.size - len(queue)
+            if missing > 0:
+                queue.extend(self._generate(missing, key))
+
+    def clear(self):
+        """Discard every pooled password."""
+        for queue in self._queues.values():
+            queue.clear()
+
+    def _ensure_refill_thread(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._wakeup.set()
+            self._thread = threading.Thread(target=self._run, name='password-pool-refill',
+                                            daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._pid != pid:
+                break
+            self.refill()
+
+    def _after_fork(self):
+        # Never hand out passwords generated in another process
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.clear()
@@ -0,0 +1,201 @@
+"""
+Password Generator - Health Probes
+Pre-serialized health, version and readiness bodies plus an isolated probe server
+"""
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import time
+
+from charsets import get_charset
+from engine import random_string
+
+# Probe bodies (timestamp and readiness checks) are rebuilt at most this often
+PROBE_REFRESH_SECONDS = float(os.getenv('PROBE_REFRESH_SECONDS', 1.0))
+
+SERVICE = 'password-generator'
+SELF_TEST_LENGTH = 64
+
+ROUTES = {
+    '/health': 'health',
+    '/health/live': 'live',
+    '/health/ready': 'ready',
+    '/version': 'version',
+}
+
+
+def run_checks(checks):
+    """Run readiness checks; a check that raises counts as failed."""
+    results = {}
+    for name, check in checks.items():
+        try:
+            results[name] = bool(check())
+        except Exception:
+            results[name] = False
+    return results
+
+
+def self_test():
+    """Generate a password through the engine and check it is well formed."""
+    charset = get_charset()
+    password = random_string(charset, SELF_TEST_LENGTH)
+    return (len(password) == SELF_TEST_LENGTH
+            and set(password) <= set(charset.characters)
+            and len(set(password)) > 1)
+
+
+class ProbeResponses:
+    """Serialized probe bodies shared by every request until they expire.
+
+    ``checks`` maps a readiness check name to a callable returning a bool;
+    a check that raises counts as failed. Bodies are rebuilt lazily by the
+    first request after ``refresh_seconds``, so nothing runs between probes
+    and no thread exists before a fork.
+    """
+
+    def __init__(self, version, environment, checks, refresh_seconds=PROBE_REFRESH_SECONDS,
+                 server=None):
+        self.version = version
+        self.environment = environment
+        self.checks = checks
+        self.server = server
+        self.refresh_seconds = refresh_seconds
+        self._bodies = None
+        self._expires = 0.0
+
+    def get(self, name):
+        """Return ``(body, status)`` for ``health``, ``version``, ``live`` or ``ready``."""
+        if time.monotonic() >= self._expires:
+            self.refresh()
+        return self._bodies[name]
+
+    def refresh(self):
+        timestamp = str(datetime.now())
+        results = run_checks(self.checks)
+        ready = all(results.values())
+
+        def body(payload, status=200):
+            return json.dumps(payload).encode('utf-8'), status
+
+        version = {'version': self.version, 'service': SERVICE,
+                   'environment': self.environment, 'timestamp': timestamp}
+        if self.server is not None:
+            version['server'] = self.server
+
+        # Swap the whole mapping so concurrent readers never see a mix
+        self._bodies = {
+            'health': body({'status': 'healthy', 'service': SERVICE,
+                            'version': self.version, 'timestamp': timestamp}),
+            'version': body(version),
+            'live': body({'status': 'alive', 'service': SERVICE, 'timestamp': timestamp}),
+            'ready': body({'status': 'ready' if ready else 'not_ready', 'service': SERVICE,
+                           'checks': results, 'timestamp': timestamp},
+                          200 if ready else 503),
+        }
+        self._expires = time.monotonic() + self.refresh_seconds
+
+
+class WorkerHealth:
+    """Worker readiness shared with the gunicorn master through files.
+
+    Each worker runs a daemon thread that evaluates its app's readiness
+    checks (pool refill thread, entropy source) every ``refresh_seconds``
+    and rewrites ``health_<pid>.db`` in ``directory`` with ``1`` or ``0``.
+    The master, which has no pool of its own, reads the files of its live
+    workers. Reports older than ``stale_after`` are ignored, so a worker
+    that has not reported yet neither passes nor fails readiness.
+    """
+
+    def __init__(self, directory, refresh_seconds=PROBE_REFRESH_SECONDS):
+        self.directory = directory
+        self.refresh_seconds = refresh_seconds
+        self.stale_after = max(5.0, 3 * refresh_seconds)
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'health_{pid}.db')
+
+    def report(self, ready, pid=None):
+        path = self._path(pid or os.getpid())
+        with open(path + '.tmp', 'wb') as f:
+            f.write(b'1' if ready else b'0')
+        os.replace(path + '.tmp', path)
+
+    def start_reporting(self, checks):
+        """Report this process's readiness from a daemon thread (post_worker_init).
+
+        Returns an event that stops the thread when set.
+        """
+        stop = threading.Event()
+
+        def loop():
+            while True:
+                self.report(all(run_checks(checks).values()))
+                if stop.wait(self.refresh_seconds):
+                    return
+
+        os.makedirs(self.directory, exist_ok=True)
+        threading.Thread(target=loop, name='worker-health', daemon=True).start()
+        return stop
+
+    def ready(self, pids):
+        """True when at least one live worker reports ready and none reports failure."""
+        now = time.time()
+        states = []
+        for pid in pids:
+            try:
+                with open(self._path(pid), 'rb') as f:
+                    if now - os.fstat(f.fileno()).st_mtime <= self.stale_after:
+                        states.append(f.read() == b'1')
+            except FileNotFoundError:
+                continue
+        return bool(states) and all(states)
+
+    def remove(self, pid):
+        """Forget a dead worker (gunicorn child_exit hook)."""
+        try:
+            os.remove(self._path(pid))
+        except FileNotFoundError:
+            pass
+
+
+class _ProbeHandler(BaseHTTPRequestHandler):
+    server_version = SERVICE
+
+    def _respond(self, send_body):
+        name = ROUTES.get(self.path.split('?', 1)[0])
+        if name is None:
+            body, status = b'{"error": "not found"}', 404
+        else:
+            body, status = self.server.probes.get(name)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_probe_server(probes, port, host='0.0.0.0'):
+    """Serve ``probes`` from a daemon thread of the current process.
+
+    Used by the gunicorn master (``when_ready`` hook) so orchestrator probes
+    are answered on their own port and never wait for a busy worker.
+    """
+    server = ThreadingHTTPServer((host, port), _ProbeHandler)
+    server.daemon_threads = True
+    server.probes = probes
+    threading.Thread(target=server.serve_forever, name='probe-server', daemon=True).start()
+    return server
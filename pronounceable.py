@@ -0,0 +1,165 @@
+"""
+Password Generator - Pronounceable Mode
+Letter-level Markov chain trained on the wordlist, sampled with alias tables
+"""
+
+from array import array
+from functools import lru_cache
+import math
+import re
+
+from engine import RandomIndexes
+from passphrase import WORDLIST_PATH, load_wordlist
+
+MIN_LENGTH = 4
+MAX_LENGTH = 64
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+_START = len(LETTERS)  # context symbol before the first letter
+_SYMBOLS = len(LETTERS) + 1
+_WORD = re.compile('[a-z]+')
+
+
+def _alias_table(weights):
+    """Vose's alias method on integer weights.
+
+    Column ``i`` is picked uniformly and keeps outcome ``i`` when a uniform
+    integer below ``total`` is under ``threshold[i]``, else takes
+    ``alias[i]``. Thresholds stay integers (weights scaled by the column
+    count) so sampled probabilities equal ``weight / total`` exactly.
+    """
+    columns = len(weights)
+    total = sum(weights)
+    scaled = [weight * columns for weight in weights]
+    threshold = [total] * columns
+    alias = list(range(columns))
+    small = [i for i, weight in enumerate(scaled) if weight < total]
+    large = [i for i, weight in enumerate(scaled) if weight >= total]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        threshold[less] = scaled[less]
+        alias[less] = more
+        scaled[more] -= total - scaled[less]
+        (small if scaled[more] < total else large).append(more)
+    return total, threshold, alias
+
+
+class MarkovModel:
+    """Order-2 letter model with flat alias tables for every context.
+
+    A context is the previous two letters (``_START`` before the first
+    ones); contexts never seen in training back off to the previous letter,
+    then to letter frequencies, so every context has a distribution and the
+    next letter is a pure function of the last two. All tables are flat
+    ``array`` objects built once per wordlist, so forked workers share them.
+    Sampling costs one uniform integer and two table lookups per letter.
+    """
+
+    def __init__(self, words):
+        trigrams = [[[0] * len(LETTERS) for _ in range(_SYMBOLS)] for _ in range(_SYMBOLS)]
+        bigrams = [[0] * len(LETTERS) for _ in range(_SYMBOLS)]
+        unigrams = [0] * len(LETTERS)
+        for word in words:
+            first = second = _START
+            for letter in word:
+                index = ord(letter) - 97
+                trigrams[first][second][index] += 1
+                bigrams[second][index] += 1
+                unigrams[index] += 1
+                first, second = second, index
+
+        self.offsets = array('I')
+        self.columns = array('I')
+        self.totals = array('Q')
+        self.letters = array('B')
+        self.thresholds = array('Q')
+        self.aliases = array('B')
+        # Per context: [(letter, probability)], for entropy accounting
+        self.transitions = []
+        for first in range(_SYMBOLS):
+            for second in range(_SYMBOLS):
+                counts = trigrams[first][second]
+                if not any(counts):
+                    counts = bigrams[second] if any(bigrams[second]) else unigrams
+                outcomes = [(letter, count) for letter, count in enumerate(counts) if count]
+                total, threshold, alias = _alias_table([count for _, count in outcomes])
+                self.offsets.append(len(self.letters))
+                self.columns.append(len(outcomes))
+                self.totals.append(total)
+                self.letters.extend(letter for letter, _ in outcomes)
+                self.thresholds.extend(threshold)
+                self.aliases.extend(outcomes[i][0] for i in alias)
+                self.transitions.append([(letter, count / total) for letter, count in outcomes])
+        self.shannon, self.min_entropy = self._entropy_by_length(MAX_LENGTH)
+
+    def _entropy_by_length(self, max_length):
+        """Exact Shannon and min-entropy of the first ``n`` letters, for every ``n``.
+
+        The chain's context determines each letter's distribution, so the
+        Shannon entropy of a whole password is the sum over positions of the
+        expected per-context entropy (a forward pass over the context
+        distribution); min-entropy follows the single most likely password
+        (a Viterbi pass over log probabilities).
+        """
+        context_entropy = [-sum(p * math.log2(p) for _, p in transitions)
+                           for transitions in self.transitions]
+        start = _START * _SYMBOLS + _START
+        distribution = {start: 1.0}
+        best = {start: 0.0}
+        shannon = [0.0]
+        min_entropy = [0.0]
+        for _ in range(max_length):
+            shannon.append(shannon[-1] + sum(
+                probability * context_entropy[context]
+                for context, probability in distribution.items()))
+            following = {}
+            best_following = {}
+            for context, probability in distribution.items():
+                second = context % _SYMBOLS
+                bits = best[context]
+                for letter, p in self.transitions[context]:
+                    successor = second * _SYMBOLS + letter
+                    following[successor] = following.get(successor, 0.0) + probability * p
+                    candidate = bits - math.log2(p)
+                    if candidate < best_following.get(successor, math.inf):
+                        best_following[successor] = candidate
+            distribution, best = following, best_following
+            min_entropy.append(min(best.values()))
+        return shannon, min_entropy
+
+    def generate(self, length, indexes=None):
+        indexes = indexes or RandomIndexes(length)
+        below = indexes.below
+        offsets, columns, totals = self.offsets, self.columns, self.totals
+        letters, thresholds, aliases = self.letters, self.thresholds, self.aliases
+        context = _START * _SYMBOLS + _START
+        out = bytearray(length)
+        for position in range(length):
+            total = totals[context]
+            column, draw = divmod(below(columns[context] * total), total)
+            slot = offsets[context] + column
+            letter = letters[slot] if draw < thresholds[slot] else aliases[slot]
+            out[position] = 97 + letter
+            context = context % _SYMBOLS * _SYMBOLS + letter
+        return out.decode('ascii')
+
+    def entropy(self, length):
+        """``(shannon_bits, min_entropy_bits)`` of passwords of ``length``."""
+        return self.shannon[length], self.min_entropy[length]
+
+
+@lru_cache(maxsize=None)
+def load_model(path=WORDLIST_PATH):
+    """Train the model on a wordlist once per path."""
+    wordlist = load_wordlist(path)
+    return MarkovModel(part for index in range(len(wordlist))
+                       for part in _WORD.findall(wordlist[index].lower()))
+
+
+def generate_pronounceable(length=12, model=None):
+    """Return ``(password, shannon_bits, min_entropy_bits)``."""
+    if not MIN_LENGTH <= length <= MAX_LENGTH:
+        raise ValueError(f'length must be between {MIN_LENGTH} and {MAX_LENGTH}')
+    model = model or load_model()
+    shannon, min_entropy = model.entropy(length)
+    return model.generate(length), shannon, min_entropy
@@ -0,0 +1,278 @@
+"""
+Password Generator - Rate Limiting
+Token buckets per client shared by all workers, checked before any generation
+"""
+
+from hashlib import blake2b
+import fcntl
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from flask import current_app, g, jsonify, request
+
+from patterns import compile_pattern
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'False').lower() == 'true'
+# Tokens added per second and bucket capacity; one token buys COST_UNIT characters
+RATE_LIMIT_RATE = float(os.getenv('RATE_LIMIT_RATE', 200))
+RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', 2000))
+RATE_LIMIT_COST_UNIT = int(os.getenv('RATE_LIMIT_COST_UNIT', 16))
+# Directory shared by all workers; empty keeps buckets in-process only
+RATE_LIMIT_DIR = os.getenv('RATE_LIMIT_DIR', '')
+RATE_LIMIT_SLOTS = int(os.getenv('RATE_LIMIT_SLOTS', 65536))
+# Comma separated API keys that get their own bucket (others are limited by IP)
+RATE_LIMIT_API_KEYS = os.getenv('RATE_LIMIT_API_KEYS', '')
+
+# Generation endpoint -> password count when the request gives none
+COSTED_ENDPOINTS = {
+    'main.api_generate': 1,
+    'main.api_generate_batch': 10,
+    'main.api_generate_stream': 1000,
+}
+# Config key capping the count each endpoint actually serves
+MAX_COUNTS = {
+    'main.api_generate_batch': 'MAX_BATCH_COUNT',
+    'main.api_generate_stream': 'MAX_STREAM_COUNT',
+}
+STREAM_ENDPOINT = 'main.api_generate_stream'
+
+_SLOT = struct.Struct('<Qdd')  # key hash, tokens, last update (monotonic)
+_GROUP = 8  # slots probed per key; one lock covers one group
+
+
+class TokenBuckets:
+    """Fixed-size hash table of token buckets.
+
+    Keys hash to a group of eight slots; a new key takes an empty slot or
+    evicts the bucket that was idle longest (an idle bucket is full anyway).
+    With a ``directory`` the table lives in a shared ``ratelimit.db`` mmap
+    and each group is guarded by an ``fcntl`` byte-range lock, so workers
+    only contend when their clients hash to the same group.
+    """
+
+    def __init__(self, rate, burst, slots=RATE_LIMIT_SLOTS, directory=RATE_LIMIT_DIR):
+        self.rate = rate
+        self.burst = burst
+        self.groups = max(1, slots // _GROUP)
+        self.directory = directory
+        self._size = self.groups * _GROUP * _SLOT.size
+        self._pid = None
+        self._file = None
+        self._map = None
+        self._lock = threading.Lock()
+
+    def _table(self):
+        # Opened lazily per process, like the metrics files
+        pid = os.getpid()
+        if self._pid != pid:
+            self._lock = threading.Lock()
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = open(os.path.join(self.directory, 'ratelimit.db'), 'a+b')
+                if os.fstat(self._file.fileno()).st_size < self._size:
+                    self._file.truncate(self._size)
+                self._map = mmap.mmap(self._file.fileno(), self._size)
+            else:
+                self._map = mmap.mmap(-1, self._size)
+            self._pid = pid
+        return self._map
+
+    def acquire(self, key, cost, now=None):
+        """Take ``cost`` tokens from ``key``'s bucket.
+
+        Returns ``(allowed, retry_after_seconds)``; a refused request takes
+        nothing. A cost above the burst size is never allowed; callers
+        refuse such requests up front (see ``_check_rate_limit``).
+        """
+        digest = int.from_bytes(blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+        digest = digest or 1
+        start = (digest % self.groups) * _GROUP * _SLOT.size
+        table = self._table()
+        with self._lock:
+            if self.directory:
+                fcntl.lockf(self._file, fcntl.LOCK_EX, _GROUP * _SLOT.size, start)
+            try:
+                now = time.monotonic() if now is None else now
+                position, tokens, last = self._find(table, start, digest)
+                if last is None:
+                    tokens = self.burst
+                else:
+                    tokens = min(self.burst, tokens + max(0.0, now - last) * self.rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                _SLOT.pack_into(table, position, digest, tokens, now)
+            finally:
+                if self.directory:
+                    fcntl.lockf(self._file, fcntl.LOCK_UN, _GROUP * _SLOT.size, start)
+        return allowed, 0.0 if allowed else (cost - tokens) / self.rate
+
+    @staticmethod
+    def _find(table, start, digest):
+        oldest = None
+        for position in range(start, start + _GROUP * _SLOT.size, _SLOT.size):
+            key, tokens, last = _SLOT.unpack_from(table, position)
+            if key == digest:
+                return position, tokens, last
+            if key == 0:
+                return position, 0.0, None
+            if oldest is None or last < oldest[1]:
+                oldest = (position, last)
+        return oldest[0], 0.0, None
+
+
+def clear_directory(directory=RATE_LIMIT_DIR):
+    """Remove buckets from a previous run (gunicorn on_starting hook)."""
+    if not directory:
+        return
+    try:
+        os.remove(os.path.join(directory, 'ratelimit.db'))
+    except FileNotFoundError:
+        pass
+
+
+def _int(value, default):
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+def request_size(endpoint, data, max_count=None):
+    """``(count, characters_each)`` a request asks for, with the count capped
+    at ``max_count`` (what the endpoint will actually serve).
+
+    Strength checks count as a single item of all submitted characters.
+    """
+    if endpoint == 'main.api_strength':
+        passwords = data.get('passwords')
+        if not isinstance(passwords, list):
+            passwords = [data.get('password')]
+        return 1, sum(len(p) for p in passwords if isinstance(p, str))
+    count = _int(data.get('count'), COSTED_ENDPOINTS[endpoint])
+    if max_count is not None:
+        count = min(count, max_count)
+    if data.get('mode') == 'passphrase':
+        length = min(_int(data.get('words'), 6), 20) * 8
+    elif isinstance(data.get('pattern'), str):
+        length = _pattern_length(data['pattern'])
+    else:
+        length = min(_int(data.get('length'), 12), 128)
+    return count, length
+
+
+def request_cost(endpoint, data, cost_unit, max_count=None):
+    """Tokens for a request, proportional to the characters it asks for."""
+    count, length = request_size(endpoint, data, max_count)
+    return max(1.0, count * length / cost_unit)
+
+
+def _pattern_length(template):
+    # Compiled plans are cached, so the request handler reuses this one;
+    # invalid templates are rejected later and cost the minimum here
+    try:
+        return compile_pattern(template).length
+    except ValueError:
+        return 1
+
+
+def client_key(api_keys):
+    api_key = request.headers.get('X-API-Key')
+    if api_key and api_key in api_keys:
+        return f'key:{api_key}'
+    return f'ip:{request.remote_addr}'
+
+
+def _check_rate_limit():
+    endpoint = request.endpoint
+    if endpoint not in COSTED_ENDPOINTS and endpoint != 'main.api_strength':
+        return None
+    data = request.get_json(silent=True)
+    data = data if isinstance(data, dict) else {}
+    cost_unit = current_app.config['RATE_LIMIT_COST_UNIT']
+    max_count = current_app.config.get(MAX_COUNTS.get(endpoint))
+    cost = request_cost(endpoint, data, cost_unit, max_count)
+    buckets = current_app.extensions['rate_limiter']
+    if endpoint == STREAM_ENDPOINT:
+        # Streams are admitted with at most a full bucket; stream_meter
+        # charges the rest chunk by chunk as it is generated
+        cost = min(cost, buckets.burst)
+        g.rate_limit_prepaid = cost
+    elif cost > buckets.burst:
+        return _too_large(endpoint, data, buckets.burst * cost_unit, max_count)
+    allowed, retry_after = buckets.acquire(
+        client_key(current_app.extensions['rate_limit_api_keys']), cost)
+    if allowed:
+        return None
+    response = jsonify({
+        'success': False,
+        'error': 'rate limit exceeded',
+        'retry_after': round(retry_after, 3)
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def _too_large(endpoint, data, max_characters, max_count):
+    # More than a full bucket can never be admitted; waiting would not help,
+    # so say how much fits instead of sending Retry-After
+    body = {'success': False, 'error': 'request exceeds rate limit burst'}
+    if endpoint == 'main.api_strength':
+        body['max_characters'] = int(max_characters)
+    else:
+        body['max_count'] = int(max_characters // request_size(endpoint, data, max_count)[1])
+    response = jsonify(body)
+    response.status_code = 413
+    return response
+
+
+def stream_meter(length):
+    """Return ``charge(count)`` for a stream of ``length``-character passwords,
+    or None when rate limiting is off.
+
+    ``charge`` is called before each chunk is generated. It first uses the
+    tokens taken when the request was admitted, then waits for the client's
+    bucket to refill, so a long stream runs at ``RATE_LIMIT_RATE`` instead
+    of being refused up front. It captures the client's bucket because
+    stream chunks are generated after the request context is gone.
+    """
+    buckets = current_app.extensions.get('rate_limiter')
+    if buckets is None:
+        return None
+    cost_unit = current_app.config['RATE_LIMIT_COST_UNIT']
+    key = client_key(current_app.extensions['rate_limit_api_keys'])
+    prepaid = g.get('rate_limit_prepaid', 0.0)
+
+    def charge(count):
+        nonlocal prepaid
+        cost = count * length / cost_unit
+        paid = min(prepaid, cost)
+        prepaid -= paid
+        cost -= paid
+        while cost > 0:
+            # acquire never admits more than a full bucket at once
+            piece = min(cost, buckets.burst)
+            allowed, retry_after = buckets.acquire(key, piece)
+            if allowed:
+                cost -= piece
+            else:
+                time.sleep(retry_after)
+
+    return charge
+
+
+def init_app(app):
+    """Check every generation request against its client's bucket before the view runs."""
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return
+    app.extensions['rate_limiter'] = TokenBuckets(
+        app.config['RATE_LIMIT_RATE'], app.config['RATE_LIMIT_BURST'],
+        app.config['RATE_LIMIT_SLOTS'], app.config['RATE_LIMIT_DIR'])
+    app.extensions['rate_limit_api_keys'] = frozenset(
+        key.strip() for key in app.config['RATE_LIMIT_API_KEYS'].split(',') if key.strip())
+    app.before_request(_check_rate_limit)
@@ -1,6 +1,130 @@
 // Global variable to store current password
 let currentPassword = '';
 
+// Character classes, concatenated in the same order as the server's
+// charsets._characters() so both engines sample the same alphabet
+const LOWERCASE = 'abcdefghijklmnopqrstuvwxyz';
+const UPPERCASE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ';
+const DIGITS = '0123456789';
+const SYMBOLS = '!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~';
+const DEFAULT_CHARACTERS = LOWERCASE + UPPERCASE + DIGITS + SYMBOLS;
+
+// Largest getRandomValues() request the Web Crypto API allows
+const MAX_RANDOM_BYTES = 65536;
+
+// localStorage key remembering the chosen engine
+const ENGINE_KEY = 'passwordEngine';
+
+// Whether this browser can generate passwords itself
+function localEngineAvailable() {
+    return Boolean(window.crypto && window.crypto.getRandomValues);
+}
+
+// Alphabet for the selected options (all characters if none are selected)
+function buildAlphabet(options) {
+    let characters = '';
+    if (options.lowercase) characters += LOWERCASE;
+    if (options.uppercase) characters += UPPERCASE;
+    if (options.digits) characters += DIGITS;
+    if (options.symbols) characters += SYMBOLS;
+    return characters || DEFAULT_CHARACTERS;
+}
+
+// Uniformly random string from crypto.getRandomValues(), unbiased like the
+// server's engine.random_string(): bytes at or above the largest multiple of
+// the alphabet size are rejected, the rest map to alphabet[byte % size]
+function randomString(alphabet, length) {
+    const size = alphabet.length;
+    const limit = 256 - (256 % size);
+    const acceptance = limit / 256;
+    let result = '';
+    while (result.length < length) {
+        const needed = length - result.length;
+        const bytes = new Uint8Array(
+            Math.min(MAX_RANDOM_BYTES, Math.ceil(needed / acceptance) + 16));
+        window.crypto.getRandomValues(bytes);
+        for (let i = 0; i < bytes.length && result.length < length; i++) {
+            if (bytes[i] < limit) result += alphabet[bytes[i] % size];
+        }
+    }
+    return result;
+}
+
+// Generate in the browser; resolves to the same shape as /api/generate
+function generateLocally(options) {
+    const password = randomString(buildAlphabet(options), options.length);
+    return Promise.resolve({
+        success: true,
+        password: password,
+        length: password.length,
+        options: {
+            uppercase: options.uppercase,
+            lowercase: options.lowercase,
+            digits: options.digits,
+            symbols: options.symbols
+        }
+    });
+}
+
+// Generate on the server
+function generateOnServer(options) {
+    return fetch('/api/generate', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(options)
+    })
+    .then(response => response.json());
+}
+
+// Whether the "generate in browser" toggle is on
+function useLocalEngine() {
+    const localCheck = document.getElementById('localCheck');
+    return Boolean(localCheck && localCheck.checked && localEngineAvailable());
+}
+
+// Restore the engine toggle and keep the footer in sync with it
+function initEngineToggle() {
+    const localCheck = document.getElementById('localCheck');
+    if (!localCheck) return;
+    if (!localEngineAvailable()) {
+        localCheck.checked = false;
+        localCheck.disabled = true;
+    } else if (localStorage.getItem(ENGINE_KEY)) {
+        localCheck.checked = localStorage.getItem(ENGINE_KEY) === 'local';
+    }
+    updateEngineInfo();
+    localCheck.addEventListener('change', () => {
+        localStorage.setItem(ENGINE_KEY, localCheck.checked ? 'local' : 'server');
+        updateEngineInfo();
+    });
+}
+
+function updateEngineInfo() {
+    document.getElementById('engineInfo').textContent = useLocalEngine()
+        ? '🔒 Passwords are generated locally in your browser'
+        : '🌐 Passwords are generated on the server';
+}
+
+// Cache the page and its assets so the local engine also works offline
+function registerServiceWorker() {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch(error => {
+            console.error('Service worker registration failed:', error);
+        });
+    }
+}
+
+// Guarded so the scoring functions can also be loaded outside a browser
+// (the strength parity tests run this file in node)
+if (typeof document !== 'undefined') {
+    document.addEventListener('DOMContentLoaded', () => {
+        initEngineToggle();
+        registerServiceWorker();
+    });
+}
+
 // Update length display
 function updateLength(value) {
     document.getElementById('lengthValue').textContent = value;
@@ -23,21 +147,15 @@ function generatePassword() {
     const digits = document.getElementById('digitsCheck').checked;
     const symbols = document.getElementById('symbolsCheck').checked;
     
-    // Call API
-    fetch('/api/generate', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-            length: length,
-            uppercase: uppercase,
-            lowercase: lowercase,
-            digits: digits,
-            symbols: symbols
-        })
-    })
-    .then(response => response.json())
+    const options = {
+        length: length,
+        uppercase: uppercase,
+        lowercase: lowercase,
+        digits: digits,
+        symbols: symbols
+    };
+
+    (useLocalEngine() ? generateLocally(options) : generateOnServer(options))
     .then(result => {
         if (result.success) {
             // Store and display password
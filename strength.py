@@ -0,0 +1,176 @@
+"""
+Password Generator - Strength Scoring
+Server-side port of calculatePasswordStrength/estimateCrackTime from static/script.js
+"""
+
+from functools import lru_cache
+import math
+import re
+
+_UPPERCASE = re.compile('[A-Z]')
+_LOWERCASE = re.compile('[a-z]')
+_DIGITS = re.compile('[0-9]')
+_SYMBOLS = re.compile('[^A-Za-z0-9]')
+
+# Assume 10 billion attempts/second (modern GPU)
+ATTEMPTS_PER_SECOND = 10e9
+
+STRENGTH_LEVELS = (
+    (25, 'very-weak', 'Very Weak', '⚠️ Extremely unsafe! Can be cracked in seconds!'),
+    (45, 'weak', 'Weak', '⚠️ Unsafe! Vulnerable to attacks.'),
+    (65, 'medium', 'Medium', '⚡ Acceptable, but could be stronger.'),
+    (85, 'strong', 'Strong', '✅ Good! Secure for most purposes.'),
+    (math.inf, 'very-strong', 'Very Strong', '🛡️ Excellent! Highly secure password.'),
+)
+
+CRACK_TIME_UNITS = (
+    (60, 1, 'seconds'),
+    (3600, 60, 'minutes'),
+    (86400, 3600, 'hours'),
+    (2592000, 86400, 'days'),
+    (31536000, 2592000, 'months'),
+    (3153600000, 31536000, 'years'),
+)
+
+
+def _js_round(value):
+    # Math.round rounds halves up, unlike Python's round-half-to-even
+    return math.floor(value + 0.5)
+
+
+def _js_length(password):
+    # String.length counts UTF-16 code units
+    if password.isascii():
+        return len(password)
+    return len(password.encode('utf-16-le')) // 2
+
+
+def estimate_crack_time(combinations):
+    seconds = combinations / ATTEMPTS_PER_SECOND / 2  # Average case
+    if seconds < 1:
+        return 'Instant'
+    for limit, unit_seconds, unit in CRACK_TIME_UNITS:
+        if seconds < limit:
+            return f'{_js_round(seconds / unit_seconds)} {unit}'
+    return 'Millions of years'
+
+
+@lru_cache(maxsize=4096)
+def _score_features(length, char_types, pool_size, unique_chars):
+    score = 0
+
+    entropy = length * math.log2(pool_size or 1)
+
+    # 1. Length score (0-35 points)
+    if length >= 20:
+        score += 35
+    elif length >= 16:
+        score += 30
+    elif length >= 12:
+        score += 22
+    elif length >= 8:
+        score += 12
+    elif length >= 6:
+        score += 5
+
+    # 2. Character variety (0-30 points)
+    score += char_types * 7.5
+
+    # 3. Entropy bonus (0-25 points)
+    if entropy >= 80:
+        score += 25
+    elif entropy >= 60:
+        score += 20
+    elif entropy >= 40:
+        score += 12
+    elif entropy >= 28:
+        score += 5
+
+    # 4. Uniqueness (0-10 points)
+    unique_ratio = unique_chars / length if length else 0
+    if unique_ratio >= 0.9:
+        score += 10
+    elif unique_ratio >= 0.7:
+        score += 7
+    elif unique_ratio >= 0.5:
+        score += 4
+
+    # Penalties for dangerous patterns
+    if length < 8 and char_types <= 2:
+        score = min(score, 20)
+    if length < 6:
+        score = min(score, 15)
+    if char_types == 1:
+        score = min(score, 45)
+
+    for limit, strength, strength_text, warning_message in STRENGTH_LEVELS:
+        if score < limit:
+            break
+
+    try:
+        combinations = float(pool_size) ** length
+    except OverflowError:
+        combinations = math.inf
+
+    return (_js_round(score), strength, strength_text, warning_message,
+            _js_round(entropy), _js_round(unique_ratio * 100),
+            estimate_crack_time(combinations))
+
+
+def _result(length, char_types, features):
+    score, strength, strength_text, warning_message, entropy, uniqueness, crack_time = features
+    return {
+        'score': score,
+        'strength': strength,
+        'strength_text': strength_text,
+        'warning_message': warning_message,
+        'details': {
+            'length': length,
+            'char_types': char_types,
+            'entropy': entropy,
+            'uniqueness': uniqueness,
+            'crack_time': crack_time
+        }
+    }
+
+
+def score_passwords(passwords, options=None):
+    """Score many passwords with the same algorithm as the web UI.
+
+    ``options`` holds the generation flags (uppercase, lowercase, digits,
+    symbols) exactly like the UI passes them; when omitted, each flag is
+    inferred from the characters present in the password.
+    """
+    if options is not None:
+        flags = (bool(options.get('uppercase')), bool(options.get('lowercase')),
+                 bool(options.get('digits')), bool(options.get('symbols')))
+    upper_search = _UPPERCASE.search
+    lower_search = _LOWERCASE.search
+    digit_search = _DIGITS.search
+    symbol_search = _SYMBOLS.search
+    score_features = _score_features
+
+    results = []
+    for password in passwords:
+        has_upper = upper_search(password) is not None
+        has_lower = lower_search(password) is not None
+        has_digit = digit_search(password) is not None
+        has_symbol = symbol_search(password) is not None
+        if options is None:
+            use_upper, use_lower, use_digit, use_symbol = has_upper, has_lower, has_digit, has_symbol
+        else:
+            use_upper, use_lower, use_digit, use_symbol = flags
+
+        char_types = ((use_upper and has_upper) + (use_lower and has_lower) +
+                      (use_digit and has_digit) + (use_symbol and has_symbol))
+        pool_size = (26 * (use_lower or has_lower) + 26 * (use_upper or has_upper) +
+                     10 * (use_digit or has_digit) + 33 * (use_symbol or has_symbol))
+        length = _js_length(password)
+
+        results.append(_result(length, char_types, score_features(
+            length, char_types, pool_size, len(set(password)))))
+    return results
+
+
+def score_password(password, options=None):
+    return score_passwords([password], options)[0]
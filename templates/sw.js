@@ -0,0 +1,49 @@
+// Service worker for offline use of the browser-side generator.
+// Rendered by the server: the cache name changes whenever the page or any
+// fingerprinted asset changes, which replaces the previous cache.
+const CACHE_NAME = 'password-generator-{{ version }}';
+const PRECACHE = {{ precache | tojson }};
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(cache => cache.addAll(PRECACHE))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(names
+                .filter(name => name.startsWith('password-generator-') && name !== CACHE_NAME)
+                .map(name => caches.delete(name))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    // The API is never cached: server-side generation needs the network
+    if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+
+    if (request.mode === 'navigate') {
+        // The page is revalidated on every visit; the cached copy is the
+        // offline fallback
+        event.respondWith(
+            fetch(request)
+                .then(response => {
+                    if (response.ok) {
+                        const copy = response.clone();
+                        caches.open(CACHE_NAME).then(cache => cache.put(request, copy));
+                    }
+                    return response;
+                })
+                .catch(() => caches.match(request).then(cached => cached || caches.match('{{ home }}')))
+        );
+    } else if (PRECACHE.includes(url.pathname)) {
+        // Fingerprinted assets never change under the same URL
+        event.respondWith(caches.match(request).then(cached => cached || fetch(request)));
+    }
+});
@@ -11,6 +11,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from app import app
+from policy import compile_policy
 
 
 @pytest.fixture
@@ -45,6 +46,32 @@ class TestHomeEndpoint:
         assert b'Password Generator' in response.data
 
 
+class TestAppFactory:
+    """Test the preload-safe application factory"""
+    
+    def test_create_app_with_overrides(self):
+        """Test config overrides are applied"""
+        from app import create_app
+        
+        custom = create_app({'APP_VERSION': 'v9.9.9', 'TESTING': True})
+        response = custom.test_client().get('/version')
+        assert json.loads(response.data)['version'] == 'v9.9.9'
+    
+    def test_create_app_starts_no_threads(self):
+        """Test building the app before fork starts no background threads"""
+        import threading
+        from app import create_app
+        
+        before = threading.active_count()
+        create_app({'PASSWORD_POOL_ENABLED': True})
+        assert threading.active_count() == before
+    
+    def test_home_page_prerendered(self, client):
+        """Test the home page is served from the pre-rendered copy"""
+        response = client.get('/')
+        assert response.data == app.extensions['home_page'].body
+
+
 class TestGenerateAPI:
     """Test /api/generate endpoint"""
     
@@ -196,3 +223,223 @@ class TestGenerateAPI:
         assert 'lowercase' in data['options']
         assert 'digits' in data['options']
         assert 'symbols' in data['options']
+
+    def test_generate_custom_alphabet(self, client):
+        """Test generate with a user-supplied alphabet"""
+        response = client.post('/api/generate',
+                               data=json.dumps({'length': 32, 'alphabet': 'ACGT'}),
+                               content_type='application/json')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert set(data['password']) <= set('ACGT')
+        assert data['options']['alphabet'] == 'ACGT'
+    
+    def test_generate_invalid_alphabet(self, client):
+        """Test invalid alphabets are rejected with 400"""
+        for alphabet in ['', 'abcé', 42, 'aaaa', 'a\nb']:
+            response = client.post('/api/generate',
+                                   data=json.dumps({'alphabet': alphabet}),
+                                   content_type='application/json')
+            assert response.status_code == 400
+            assert json.loads(response.data)['success'] is False
+
+    def test_generate_passphrase(self, client):
+        """Test passphrase mode returns words and entropy"""
+        response = client.post('/api/generate',
+                               data=json.dumps({'mode': 'passphrase', 'words': 5,
+                                                'separator': '.', 'capitalize': True}),
+                               content_type='application/json')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['mode'] == 'passphrase'
+        assert len(data['password'].split('.')) == 5
+        assert data['entropy'] == pytest.approx(64.62, abs=0.01)
+        assert data['options']['words'] == 5
+    
+    def test_generate_invalid_mode(self, client):
+        """Test unknown modes and separators are rejected"""
+        for body in [{'mode': 'emoji'}, {'mode': 'passphrase', 'separator': 'x' * 20},
+                     {'mode': 'passphrase', 'separator': ''},
+                     {'mode': 'passphrase', 'separator': 'and'}]:
+            response = client.post('/api/generate',
+                                   data=json.dumps(body),
+                                   content_type='application/json')
+            assert response.status_code == 400
+
+    def test_generate_with_policy(self, client):
+        """Test policy rules are applied to a single password"""
+        policy = {'min_counts': {'digits': 2, 'symbols': 1}, 'prefix': 'uppercase',
+                  'exclude_ambiguous': True, 'no_repeats': True}
+        response = client.post('/api/generate',
+                               data=json.dumps({'length': 4, 'policy': policy}),
+                               content_type='application/json')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        password = data['password']
+        assert password[0].isupper()
+        assert sum(c.isdigit() for c in password) >= 2
+        assert data['options']['policy'] == policy
+    
+    def test_generate_invalid_policy(self, client):
+        """Test impossible or malformed policies return 400"""
+        for body in [{'policy': 'strict'},
+                     {'length': 4, 'policy': {'min_counts': {'digits': 5}}},
+                     {'digits': False, 'policy': {'min_counts': {'digits': 1}}},
+                     {'alphabet': 'abc', 'policy': {}}]:
+            response = client.post('/api/generate',
+                                   data=json.dumps(body),
+                                   content_type='application/json')
+            assert response.status_code == 400
+
+    def test_oversized_min_counts_rejected_before_compiling(self, client):
+        """Test huge or over-length minimum counts never reach the policy cache"""
+        compile_policy.cache_clear()
+        for body in [{'policy': {'min_counts': {'digits': 10000001}}},
+                     {'length': 8, 'policy': {'min_counts': {'digits': 5, 'symbols': 4}}},
+                     {'length': 8, 'policy': {'min_counts': {'digits': 7},
+                                              'prefix': 'uppercase', 'suffix': 'symbols'}}]:
+            response = client.post('/api/generate', json=body)
+            assert response.status_code == 400
+        assert compile_policy.cache_info().currsize == 0
+
+
+class TestBatchGenerateAPI:
+    """Test /api/generate/batch endpoint"""
+    
+    def test_batch_default(self, client):
+        """Test batch with default parameters"""
+        response = client.post('/api/generate/batch',
+                               data=json.dumps({}),
+                               content_type='application/json')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['success'] is True
+        assert data['count'] == 10
+        assert len(data['passwords']) == 10
+        assert all(len(pwd) == 12 for pwd in data['passwords'])
+    
+    def test_batch_custom_count_and_options(self, client):
+        """Test batch with custom count and shared options"""
+        response = client.post('/api/generate/batch',
+                               data=json.dumps({
+                                   'count': 200,
+                                   'length': 20,
+                                   'uppercase': False,
+                                   'lowercase': True,
+                                   'digits': False,
+                                   'symbols': False
+                               }),
+                               content_type='application/json')
+        
+        data = json.loads(response.data)
+        assert data['count'] == 200
+        assert data['length'] == 20
+        assert data['options']['uppercase'] is False
+        assert all(pwd.islower() and pwd.isalpha() for pwd in data['passwords'])
+    
+    def test_batch_count_constraints(self, client):
+        """Test count is constrained to 1..MAX_BATCH_COUNT"""
+        max_batch_count = app.config['MAX_BATCH_COUNT']
+        
+        response = client.post('/api/generate/batch',
+                               data=json.dumps({'count': 0}),
+                               content_type='application/json')
+        assert json.loads(response.data)['count'] == 1
+        
+        response = client.post('/api/generate/batch',
+                               data=json.dumps({'count': max_batch_count + 1,
+                                                'length': 4}),
+                               content_type='application/json')
+        assert json.loads(response.data)['count'] == max_batch_count
+
+
+class TestStreamGenerateAPI:
+    """Test /api/generate/stream endpoint"""
+    
+    def test_stream_ndjson(self, client):
+        """Test NDJSON output has one JSON object per password"""
+        response = client.post('/api/generate/stream',
+                               data=json.dumps({'count': 2500, 'length': 10}),
+                               content_type='application/json')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = response.data.decode().splitlines()
+        assert len(lines) == 2500
+        assert all(len(json.loads(line)['password']) == 10 for line in lines)
+    
+    def test_stream_text(self, client):
+        """Test plain text output has one password per line"""
+        response = client.post('/api/generate/stream',
+                               data=json.dumps({'count': 5, 'format': 'text',
+                                                'digits': True, 'uppercase': False,
+                                                'lowercase': False, 'symbols': False}),
+                               content_type='application/json')
+        
+        assert response.mimetype == 'text/plain'
+        lines = response.data.decode().splitlines()
+        assert len(lines) == 5
+        assert all(line.isdigit() for line in lines)
+    
+    def test_stream_invalid_format(self, client):
+        """Test unknown formats are rejected"""
+        response = client.post('/api/generate/stream',
+                               data=json.dumps({'format': 'xml'}),
+                               content_type='application/json')
+        assert response.status_code == 400
+
+    def test_stream_rejects_control_characters(self, client):
+        """Test alphabets that would break line-delimited output are rejected"""
+        response = client.post('/api/generate/stream',
+                               json={'alphabet': 'a\nb', 'format': 'text'})
+        assert response.status_code == 400
+    
+    def test_stream_stops_when_closed(self, client, monkeypatch):
+        """Test no more chunks are generated once the client goes away"""
+        import app as app_module
+        
+        calls = []
+        original = app_module.generate_passwords
+        
+        def counting_generate(*args, **kwargs):
+            calls.append(args[0])
+            return original(*args, **kwargs)
+        
+        monkeypatch.setattr(app_module, 'generate_passwords', counting_generate)
+        response = client.post('/api/generate/stream',
+                               data=json.dumps({'count': 1000000}),
+                               content_type='application/json',
+                               buffered=False)
+        next(response.response)
+        response.close()
+        assert len(calls) == 1
+
+    """Test /api/generate served from the password pool"""
+    
+    def test_generate_served_from_pool(self, client, monkeypatch):
+        """Test pooled option sets are answered from the pool"""
+        from pool import PasswordPool
+        
+        key = (12, True, True, True, True)
+        pool = PasswordPool([key], lambda count, k: ['Pooled-Pass1'] * count,
+                            size=3, low_watermark=0)
+        pool.refill()
+        monkeypatch.setitem(app.extensions, 'password_pool', pool)
+        
+        response = client.post('/api/generate',
+                               data=json.dumps({}),
+                               content_type='application/json')
+        assert json.loads(response.data)['password'] == 'Pooled-Pass1'
+        
+        stats = json.loads(client.get('/api/pool').data)
+        assert stats['enabled'] is True
+        assert stats['hits'] == 1
+    
+    def test_pool_disabled_by_default(self, client):
+        """Test /api/pool reports a disabled pool"""
+        response = client.get('/api/pool')
+        assert json.loads(response.data) == {'enabled': False}
@@ -0,0 +1,146 @@
+"""
+Unit tests for fingerprinted, precompressed static assets
+"""
+
+import pytest
+import ast
+import gzip
+import json
+import re
+import shutil
+import string
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import _render_service_worker, app
+from assets import build_asset, fingerprint
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def asset_path(client, filename):
+    """Fingerprinted URL of a static file as linked from the home page"""
+    root, ext = filename.rsplit('.', 1)
+    page = client.get('/').data.decode('utf-8')
+    return re.search(rf'/assets/{root}\.[0-9a-f]{{16}}\.{ext}', page).group(0)
+
+
+class TestBuildAsset:
+    """Test asset hashing and compression"""
+
+    def test_fingerprint(self):
+        """Test the digest is inserted before the extension"""
+        assert fingerprint('css/site.css', 'abc') == 'css/site.abc.css'
+
+    def test_gzip_variant(self):
+        """Test large bodies get a smaller, deterministic gzip variant"""
+        asset = build_asset(b'password ' * 200, 'text/plain')
+        assert gzip.decompress(asset.encodings['gzip']) == asset.body
+        assert asset.encodings['gzip'] == build_asset(asset.body, 'text/plain').encodings['gzip']
+
+    def test_small_bodies_not_compressed(self):
+        """Test tiny bodies are only served uncompressed"""
+        assert build_asset(b'ok', 'text/plain').encodings == {}
+
+
+class TestAssetRoutes:
+    """Test fingerprinted asset serving"""
+
+    def test_home_page_links_fingerprinted_assets(self, client):
+        """Test the cached page references hashed asset URLs"""
+        assert asset_path(client, 'style.css')
+        assert asset_path(client, 'script.js')
+
+    def test_immutable_cache_headers(self, client):
+        """Test fingerprinted assets are cacheable forever"""
+        response = client.get(asset_path(client, 'style.css'))
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+        assert response.mimetype == 'text/css'
+        with open(os.path.join(app.static_folder, 'style.css'), 'rb') as source:
+            assert response.data == source.read()
+
+    def test_gzip_negotiation(self, client):
+        """Test the precompressed variant is served when accepted"""
+        response = client.get(asset_path(client, 'script.js'),
+                              headers={'Accept-Encoding': 'gzip, deflate'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        with open(os.path.join(app.static_folder, 'script.js'), 'rb') as source:
+            assert gzip.decompress(response.data) == source.read()
+
+    def test_etag_not_modified(self, client):
+        """Test a matching If-None-Match returns an empty 304"""
+        path = asset_path(client, 'style.css')
+        etag = client.get(path).headers['ETag']
+        response = client.get(path, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_unknown_asset(self, client):
+        """Test stale or unknown fingerprints return 404"""
+        assert client.get('/assets/style.0000000000000000.css').status_code == 404
+
+
+class TestHomePageCache:
+    """Test the pre-rendered home page"""
+
+    def test_home_page_revalidated(self, client):
+        """Test the page carries an ETag and answers 304 when unchanged"""
+        response = client.get('/')
+        assert response.headers['Cache-Control'] == 'no-cache'
+        response = client.get('/', headers={'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+
+    def test_home_page_gzip(self, client):
+        """Test the page is served precompressed"""
+        response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert b'Password Generator' in gzip.decompress(response.data)
+
+
+class TestServiceWorker:
+    """Test the offline service worker"""
+
+    def test_precaches_page_assets(self, client):
+        """Test the worker precaches the page and its fingerprinted assets"""
+        response = client.get('/sw.js')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/javascript'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        body = response.data.decode('utf-8')
+        precache = json.loads(re.search(r'const PRECACHE = (.*);', body).group(1))
+        assert precache == ['/', asset_path(client, 'style.css'), asset_path(client, 'script.js')]
+
+    def test_version_follows_assets(self, tmp_path, monkeypatch):
+        """Test the cache name changes when an offline asset changes"""
+        cache_name = re.compile(r"CACHE_NAME = '(.*)'")
+        for filename in ('style.css', 'script.js'):
+            shutil.copy(os.path.join(app.static_folder, filename), tmp_path)
+        monkeypatch.setattr(app, 'static_folder', str(tmp_path))
+        with app.test_request_context('/'):
+            before = cache_name.search(_render_service_worker()).group(1)
+            with open(tmp_path / 'script.js', 'a') as script:
+                script.write('\n')
+            after = cache_name.search(_render_service_worker()).group(1)
+        assert before != after
+
+    def test_client_alphabets_match_server(self):
+        """Test the browser engine uses the server's character classes"""
+        with open(os.path.join(app.static_folder, 'script.js')) as source:
+            script = source.read()
+        constants = {name: ast.literal_eval(value) for name, value in
+                     re.findall(r"^const (LOWERCASE|UPPERCASE|DIGITS|SYMBOLS) = ('.*');$",
+                                script, re.MULTILINE)}
+        assert constants == {'LOWERCASE': string.ascii_lowercase,
+                             'UPPERCASE': string.ascii_uppercase,
+                             'DIGITS': string.digits, 'SYMBOLS': string.punctuation}
@@ -0,0 +1,121 @@
+"""
+Unit tests for cgroup-aware worker autotuning
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import autotune
+from autotune import cpu_limit, describe, memory_limit, plan_workers
+from app import create_app
+
+MiB = 1024 * 1024
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def v2(tmp_path):
+    """A cgroup v2 tree where the process sits below the limited group"""
+    root = tmp_path / 'cgroup'
+    write(root / 'cgroup.controllers', 'cpu memory')
+    write(root / 'docker' / 'cpu.max', '50000 100000')
+    write(root / 'docker' / 'memory.max', str(256 * MiB))
+    write(root / 'docker' / 'app' / 'cpu.max', 'max 100000')
+    write(root / 'docker' / 'app' / 'memory.max', 'max')
+    write(tmp_path / 'proc_cgroup', '0::/docker/app\n')
+    return str(root), str(tmp_path / 'proc_cgroup')
+
+
+@pytest.fixture
+def v1(tmp_path):
+    """A cgroup v1 tree with separate cpu and memory hierarchies"""
+    root = tmp_path / 'cgroup'
+    write(root / 'cpu,cpuacct' / 'cpu.cfs_quota_us', '-1')
+    write(root / 'cpu,cpuacct' / 'cpu.cfs_period_us', '100000')
+    write(root / 'cpu,cpuacct' / 'docker' / 'cpu.cfs_quota_us', '150000')
+    write(root / 'cpu,cpuacct' / 'docker' / 'cpu.cfs_period_us', '100000')
+    write(root / 'memory' / 'memory.limit_in_bytes', '9223372036854771712')
+    write(root / 'memory' / 'docker' / 'memory.limit_in_bytes', str(512 * MiB))
+    write(tmp_path / 'proc_cgroup', '4:memory:/docker\n3:cpu,cpuacct:/docker\n')
+    return str(root), str(tmp_path / 'proc_cgroup')
+
+
+class TestLimits:
+    """Test reading cgroup limits"""
+
+    def test_v2(self, v2):
+        """Test the tightest ancestor limit applies under cgroup v2"""
+        assert cpu_limit(*v2) == 0.5
+        assert memory_limit(*v2) == 256 * MiB
+
+    def test_v1(self, v1):
+        """Test quota and memory limits under cgroup v1"""
+        assert cpu_limit(*v1) == min(1.5, len(os.sched_getaffinity(0)))
+        assert memory_limit(*v1) == 512 * MiB
+
+    def test_no_cgroup(self, tmp_path):
+        """Test hosts without cgroups fall back to cores and physical memory"""
+        root, proc = str(tmp_path / 'missing'), str(tmp_path / 'missing_proc')
+        assert cpu_limit(root, proc) == len(os.sched_getaffinity(0))
+        assert memory_limit(root, proc) == os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+    def test_rss(self):
+        """Test this process's RSS is readable"""
+        assert autotune.rss_bytes() > MiB
+
+
+class TestPlan:
+    """Test worker planning"""
+
+    def test_half_cpu_container(self):
+        """Test docker-compose limits on a big host give a couple of workers"""
+        plan = plan_workers(0.5, 256 * MiB, 40 * MiB, master_rss=30 * MiB)
+        assert plan.workers == 2
+        assert plan.limited_by == 'cpu'
+        assert plan.max_requests == 1000
+
+    def test_memory_caps_workers(self):
+        """Test many cores with little memory are limited by memory"""
+        plan = plan_workers(64, 256 * MiB, 40 * MiB, master_rss=30 * MiB)
+        assert plan.workers == 3
+        assert plan.limited_by == 'memory'
+        assert plan.workers * plan.worker_rss * autotune.WORKER_GROWTH <= 256 * MiB
+        assert plan.max_requests < 1000
+        assert plan.max_requests_jitter == plan.max_requests // 20
+
+    def test_threads_make_up_for_capped_workers(self):
+        """Test gthread workers capped by memory get more threads"""
+        plan = plan_workers(2, 256 * MiB, 40 * MiB, base_threads=8, master_rss=30 * MiB)
+        assert plan.workers == 3
+        assert plan.threads == 16
+        plan = plan_workers(64, 256 * MiB, 40 * MiB, base_threads=8, master_rss=30 * MiB)
+        assert plan.threads == autotune.MAX_THREADS
+
+    def test_unlimited(self):
+        """Test no memory limit keeps the (2 x CPUs) + 1 rule"""
+        plan = plan_workers(4, None, None)
+        assert plan.workers == 9
+        assert plan.worker_rss == autotune.DEFAULT_WORKER_RSS
+        assert 'unlimited' in describe(plan)
+
+
+class TestVersion:
+    """Test the plan is reported by /version"""
+
+    def test_plan_in_version(self, monkeypatch):
+        """Test /version includes the plan chosen by gunicorn_config.py"""
+        plan = plan_workers(0.5, 256 * MiB, 40 * MiB)
+        monkeypatch.setenv(autotune.PLAN_ENV, json.dumps(plan._asdict()))
+        app = create_app({'SERVER_PLAN': autotune.plan_from_env()})
+        data = json.loads(app.test_client().get('/version').data)
+        assert data['server']['workers'] == 2
+        assert data['server']['limited_by'] == 'cpu'
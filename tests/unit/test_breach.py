@@ -0,0 +1,142 @@
+"""
+Unit tests for the breached-password Bloom filter
+"""
+
+import pytest
+from hashlib import sha1
+from itertools import product
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from breach import BreachFilter, build_filter, filter_shape, load_filter, main
+
+
+def write_filter(tmp_path, passwords, fp_rate=0.001):
+    source = tmp_path / 'hashes.txt'
+    source.write_text(''.join(f'{sha1(p.encode()).hexdigest().upper()}:1\n' for p in passwords))
+    output = str(tmp_path / 'breached.bloom')
+    build_filter(str(source), output, fp_rate)
+    return output
+
+
+class TestFilterShape:
+    """Test filter sizing"""
+
+    def test_power_of_two_bits(self):
+        """Test the bit count is a power of two at least the optimal size"""
+        k, log2_bits = filter_shape(1000000, 0.001)
+        assert k == 10
+        assert (1 << log2_bits) >= 1000000 * 14.37
+
+
+class TestBreachFilter:
+    """Test building and querying filters"""
+
+    def test_members_found(self, tmp_path):
+        """Test every inserted password is reported (no false negatives)"""
+        passwords = [f'password{i}' for i in range(5000)]
+        breach_filter = BreachFilter(write_filter(tmp_path, passwords))
+        assert breach_filter.count == 5000
+        assert all(p in breach_filter for p in passwords)
+        assert breach_filter.exclude(passwords + ['not-breached-at-all']) == ['not-breached-at-all']
+
+    def test_false_positive_rate(self, tmp_path):
+        """Test the measured false-positive rate is within the documented one"""
+        breach_filter = BreachFilter(write_filter(tmp_path, [f'p{i}' for i in range(20000)], 0.01))
+        assert breach_filter.false_positive_rate <= 0.01
+        trials = 50000
+        hits = sum(f'other{i}' in breach_filter for i in range(trials))
+        assert hits / trials < 2 * breach_filter.false_positive_rate + 0.001
+
+    def test_plaintext_source(self, tmp_path):
+        """Test filters can be built from a plain password list"""
+        source = tmp_path / 'blocked.txt'
+        source.write_text('# company blocklist\nhunter2\n\nletmein\n')
+        output = str(tmp_path / 'blocked.bloom')
+        assert build_filter(str(source), output, plaintext=True) == 2
+        breach_filter = BreachFilter(output)
+        assert 'hunter2' in breach_filter and 'letmein' in breach_filter
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test files without the filter header are refused"""
+        path = tmp_path / 'bogus.bloom'
+        path.write_bytes(b'\0' * 128)
+        with pytest.raises(ValueError):
+            BreachFilter(str(path))
+
+    def test_no_path_disables(self):
+        """Test an empty path means no filter"""
+        assert load_filter('') is None
+
+    def test_cli(self, tmp_path, capsys):
+        """Test the build command line"""
+        source = tmp_path / 'hashes.txt'
+        source.write_text(sha1(b'secret').hexdigest() + '\n')
+        output = str(tmp_path / 'cli.bloom')
+        assert main([str(source), '-o', output]) == 0
+        assert 'secret' in BreachFilter(output)
+        assert 'false-positive rate' in capsys.readouterr().err
+        source.write_text('not-hex\n')
+        assert main([str(source), '-o', output]) == 2
+
+
+class TestBreachEndpoints:
+    """Test breach checks in generation and scoring"""
+
+    def test_generation_skips_breached(self, tmp_path):
+        """Test generated passwords are never in the filter"""
+        breached = ['a' + ''.join(p) for p in product('ab', repeat=3)]
+        client = create_app({'BREACH_FILTER_PATH': write_filter(tmp_path, breached)}).test_client()
+        for _ in range(20):
+            response = client.post('/api/generate', json={'length': 4, 'alphabet': 'ab'})
+            assert json.loads(response.data)['password'].startswith('b')
+        response = client.post('/api/generate/batch',
+                               json={'length': 4, 'alphabet': 'ab', 'count': 200})
+        passwords = json.loads(response.data)['passwords']
+        assert len(passwords) == 200
+        assert all(p.startswith('b') for p in passwords)
+        response = client.post('/api/generate/stream',
+                               json={'length': 4, 'alphabet': 'ab', 'count': 200, 'format': 'text'})
+        assert all(p.startswith('b') for p in response.data.decode().split())
+
+    def test_only_breached_refused(self, tmp_path):
+        """Test options that only produce breached passwords return 400"""
+        breached = [''.join(p) for p in product('ab', repeat=4)]
+        client = create_app({'BREACH_FILTER_PATH': write_filter(tmp_path, breached)}).test_client()
+        response = client.post('/api/generate', json={'length': 4, 'alphabet': 'ab'})
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'validation_error'
+
+    def test_stream_refused_before_headers(self, tmp_path):
+        """Test a stream that can only produce breached passwords is a 400, not a 200"""
+        breached = [''.join(p) for p in product('ab', repeat=4)]
+        client = create_app({'BREACH_FILTER_PATH': write_filter(tmp_path, breached)}).test_client()
+        response = client.post('/api/generate/stream',
+                               json={'length': 4, 'alphabet': 'ab', 'count': 5, 'format': 'text'})
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'validation_error'
+
+    def test_strength_flags_breached(self, tmp_path):
+        """Test breached passwords score zero and are flagged"""
+        client = create_app({
+            'BREACH_FILTER_PATH': write_filter(tmp_path, ['Password123!'])
+        }).test_client()
+        data = json.loads(client.post('/api/strength', json={
+            'passwords': ['Password123!', 'kT9#qL2@wZ7$']}).data)
+        breached, fresh = data['results']
+        assert breached['breached'] is True
+        assert breached['score'] == 0
+        assert breached['strength'] == 'very-weak'
+        assert fresh['breached'] is False
+        assert fresh['score'] > 0
+
+    def test_disabled_by_default(self):
+        """Test responses are unchanged without a filter"""
+        data = json.loads(create_app().test_client().post(
+            '/api/strength', json={'password': 'Password123!'}).data)
+        assert 'breached' not in data
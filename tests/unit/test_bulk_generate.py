@@ -0,0 +1,120 @@
+"""
+Unit tests for the bulk generation CLI
+"""
+
+import pytest
+import csv
+import io
+import json
+from multiprocessing.pool import ThreadPool
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from bulk_generate import bounded_imap, format_passwords, main, parse_args, run, write_all
+
+
+def generate(tmp_path, *extra, name='out'):
+    output = tmp_path / name
+    args = parse_args(['--count', '1000', '--length', '12', '--workers', '2',
+                       '--shard-size', '150', '-o', str(output), *extra])
+    written, _ = run(args, log=io.StringIO())
+    return output, written
+
+
+class TestFormats:
+    """Test record encoding"""
+
+    def test_csv_quoting_matches_csv_module(self):
+        """Test quotes and commas are escaped like the csv module"""
+        passwords = ['a,b', 'q"uote', 'plain']
+        rows = list(csv.reader(io.StringIO(format_passwords(passwords, 'csv').decode())))
+        assert rows == [[p] for p in passwords]
+
+    def test_ndjson_escaping(self):
+        """Test quotes and backslashes produce valid JSON lines"""
+        passwords = ['back\\slash', 'q"uote']
+        lines = format_passwords(passwords, 'ndjson').decode().splitlines()
+        assert [json.loads(line)['password'] for line in lines] == passwords
+
+
+class TestBulkGenerate:
+    """Test sharded generation to a file"""
+
+    @pytest.mark.parametrize('output_format', ['text', 'csv', 'ndjson'])
+    def test_formats(self, tmp_path, output_format):
+        """Test every format writes exactly count records"""
+        output, written = generate(tmp_path, '--format', output_format)
+        assert written == 1000
+        with open(output, newline='') as source:
+            if output_format == 'csv':
+                rows = list(csv.reader(source))
+                assert rows[0] == ['password']
+                passwords = [row[0] for row in rows[1:]]
+            elif output_format == 'ndjson':
+                passwords = [json.loads(line)['password'] for line in source]
+            else:
+                passwords = source.read().splitlines()
+        assert len(passwords) == 1000
+        assert all(len(password) == 12 for password in passwords)
+
+    def test_character_flags(self, tmp_path):
+        """Test class flags restrict the alphabet"""
+        output, _ = generate(tmp_path, '--no-uppercase', '--no-lowercase', '--no-symbols')
+        assert set(output.read_text()) <= set('0123456789\n')
+
+    def test_resume_truncates_partial_record(self, tmp_path):
+        """Test resuming keeps complete records and drops a torn last line"""
+        output = tmp_path / 'out'
+        output.write_text('aaaaaaaaaaaa\nbbbbbbbbbbbb\nccc')
+        _, written = generate(tmp_path, '--resume')
+        lines = output.read_text().splitlines()
+        assert written == 998
+        assert len(lines) == 1000
+        assert lines[:2] == ['aaaaaaaaaaaa', 'bbbbbbbbbbbb']
+        assert all(len(line) == 12 for line in lines)
+
+    def test_resume_complete_file(self, tmp_path):
+        """Test resuming a finished file writes nothing"""
+        output, _ = generate(tmp_path, '--format', 'csv')
+        before = output.read_bytes()
+        _, written = generate(tmp_path, '--format', 'csv', '--resume')
+        assert written == 0
+        assert output.read_bytes() == before
+
+    def test_invalid_arguments(self, tmp_path):
+        """Test out-of-range lengths and non-printable alphabets are rejected"""
+        with pytest.raises(SystemExit):
+            parse_args(['--count', '10', '--length', '2', '-o', str(tmp_path / 'x')])
+        assert main(['--count', '10', '--alphabet', 'ab\n', '-o', str(tmp_path / 'x')]) == 2
+
+    def test_write_all_short_writes(self, tmp_path, monkeypatch):
+        """Test partially written buffers are resumed"""
+        real_writev = os.writev
+        monkeypatch.setattr(os, 'writev', lambda fd, buffers: real_writev(fd, [buffers[0][:3]]))
+        path = tmp_path / 'out'
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT)
+        try:
+            write_all(fd, [b'abcdefg', b'hij'])
+        finally:
+            os.close(fd)
+        assert path.read_bytes() == b'abcdefghij'
+
+    def test_in_flight_shards_bounded(self):
+        """Test no more than ``limit`` shards are outstanding while the consumer is slow"""
+        pulled = []
+        tasks = (pulled.append(n) or n for n in range(50))
+        with ThreadPool(4) as pool:
+            results = []
+            for result in bounded_imap(pool, lambda n: n * n, tasks, 3):
+                assert len(pulled) - len(results) <= 3
+                results.append(result)
+        assert sorted(results) == [n * n for n in range(50)]
+
+    def test_in_flight_errors_raised(self):
+        """Test a failing shard stops the run with its exception"""
+        with ThreadPool(2) as pool:
+            with pytest.raises(ZeroDivisionError):
+                list(bounded_imap(pool, lambda n: 1 / n, range(-3, 3), 2))
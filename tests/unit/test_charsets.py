@@ -0,0 +1,58 @@
+"""
+Unit tests for the character set registry
+"""
+
+import pytest
+import string
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from charsets import CHARSETS, DEFAULT_CHARACTERS, custom_charset, get_charset
+
+
+class TestCharsetRegistry:
+    """Test precomputed option-flag character sets"""
+
+    def test_all_combinations_precomputed(self):
+        """Test every flag combination has a compiled entry"""
+        assert len(CHARSETS) == 16
+
+    def test_registry_is_immutable(self):
+        """Test the registry cannot be modified at runtime"""
+        with pytest.raises(TypeError):
+            CHARSETS[(True, True, True, True)] = None
+
+    def test_lookup_returns_shared_instance(self):
+        """Test lookups return the same precomputed object"""
+        assert get_charset() is get_charset(True, True, True, True)
+        assert get_charset(1, 0, 0, 0) is get_charset(True, False, False, False)
+
+    def test_flag_contents(self):
+        """Test each flag contributes its character class"""
+        assert get_charset(False, False, True, False).characters == string.digits
+        assert get_charset(True, True, False, False).characters == \
+            string.ascii_lowercase + string.ascii_uppercase
+
+    def test_no_flags_falls_back_to_all(self):
+        """Test the empty combination falls back to every class"""
+        charset = get_charset(False, False, False, False)
+        assert set(charset.characters) == set(DEFAULT_CHARACTERS)
+
+
+class TestCustomCharsets:
+    """Test user-supplied alphabets"""
+
+    def test_custom_alphabet_cached(self):
+        """Test repeated custom alphabets reuse the compiled tables"""
+        first = custom_charset('abc123')
+        assert custom_charset('abc123') is first
+        assert custom_charset.cache_info().maxsize is not None
+
+    def test_invalid_custom_alphabet(self):
+        """Test invalid alphabets raise ValueError"""
+        for alphabet in ['', 'aaaa', 'a\nb', 'ab\x00', 'abé']:
+            with pytest.raises(ValueError):
+                custom_charset(alphabet)
@@ -0,0 +1,122 @@
+"""
+Unit tests for the bulk entropy engine
+"""
+
+import pytest
+import math
+import string
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from engine import compile_alphabet, random_below, random_string
+
+
+def chi_square_critical(df, z=5.0):
+    """Wilson-Hilferty approximation of the chi-square critical value (~3e-7 tail)"""
+    return df * (1 - 2 / (9 * df) + z * math.sqrt(2 / (9 * df))) ** 3
+
+
+def chi_square(sample, alphabet):
+    expected = len(sample) / len(alphabet)
+    return sum((sample.count(c) - expected) ** 2 / expected for c in alphabet)
+
+
+class TestCompileAlphabet:
+    """Test alphabet lookup table construction"""
+
+    def test_rejection_threshold(self):
+        """Test bytes above the largest multiple of the size are rejected"""
+        alphabet = compile_alphabet(string.digits)
+        assert alphabet.size == 10
+        assert len(alphabet.reject) == 6
+        assert alphabet.acceptance == 250 / 256
+
+    def test_power_of_two_rejects_nothing(self):
+        """Test alphabets dividing 256 never reject a byte"""
+        alphabet = compile_alphabet(string.ascii_letters[:32])
+        assert alphabet.reject == b''
+
+    def test_table_maps_every_character_equally(self):
+        """Test each character owns the same number of accepted byte values"""
+        alphabet = compile_alphabet(string.punctuation)
+        accepted = alphabet.table[:256 - len(alphabet.reject)]
+        counts = {accepted.count(c) for c in alphabet.characters.encode()}
+        assert len(counts) == 1
+
+    def test_duplicates_removed(self):
+        """Test duplicate characters do not skew the distribution"""
+        alphabet = compile_alphabet('aab')
+        assert alphabet.characters == 'ab'
+
+    def test_invalid_alphabets(self):
+        """Test empty and non-ASCII alphabets are rejected"""
+        with pytest.raises(ValueError):
+            compile_alphabet('')
+        with pytest.raises(ValueError):
+            compile_alphabet('abcé')
+
+
+class TestRandomString:
+    """Test random string sampling"""
+
+    def test_length(self):
+        """Test exact output lengths including large draws"""
+        alphabet = compile_alphabet(string.ascii_letters)
+        for length in [0, 1, 12, 128, 3_000_000]:
+            assert len(random_string(alphabet, length)) == length
+
+    def test_only_alphabet_characters(self):
+        """Test output never contains characters outside the alphabet"""
+        alphabet = compile_alphabet('xyz')
+        assert set(random_string(alphabet, 10000)) == {'x', 'y', 'z'}
+
+    @pytest.mark.parametrize('characters', [
+        string.digits,
+        string.ascii_lowercase,
+        string.ascii_letters + string.digits + string.punctuation,
+    ])
+    def test_uniform_distribution(self, characters):
+        """Test character frequencies pass a chi-square uniformity test"""
+        alphabet = compile_alphabet(characters)
+        sample = random_string(alphabet, 500 * len(characters))
+        statistic = chi_square(sample, alphabet.characters)
+        assert statistic < chi_square_critical(len(characters) - 1)
+
+    def test_uniform_positions(self):
+        """Test every position of a password is uniformly distributed"""
+        alphabet = compile_alphabet(string.digits)
+        passwords = [random_string(alphabet, 8) for _ in range(5000)]
+        for position in range(8):
+            column = ''.join(pwd[position] for pwd in passwords)
+            assert chi_square(column, string.digits) < chi_square_critical(9)
+
+
+class TestRandomBelow:
+    """Test uniform integer sampling"""
+
+    def test_range_and_count(self):
+        """Test values fall in [0, n) for several byte widths"""
+        for n in [1, 7, 256, 7776, 70000]:
+            values = random_below(n, 500)
+            assert len(values) == 500
+            assert all(0 <= value < n for value in values)
+
+    def test_uniform_distribution(self):
+        """Test a non power-of-two range passes a chi-square test"""
+        n = 300
+        values = random_below(n, 300 * n)
+        expected = len(values) / n
+        counts = [0] * n
+        for value in values:
+            counts[value] += 1
+        statistic = sum((count - expected) ** 2 / expected for count in counts)
+        assert statistic < chi_square_critical(n - 1)
+
+    def test_invalid_range(self):
+        """Test an empty range is rejected"""
+        with pytest.raises(ValueError):
+            random_below(0, 1)
+
@@ -0,0 +1,169 @@
+"""
+Unit tests for entropy sources and continuous health tests
+"""
+
+import pytest
+import json
+import string
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+import entropy
+from entropy import (EntropyError, HealthTests, OSEntropySource, SeededEntropySource,
+                     apt_cutoff, rct_cutoff)
+from engine import compile_alphabet, random_below, random_string
+
+
+@pytest.fixture
+def seeded():
+    previous = entropy.set_source(SeededEntropySource(b'test'))
+    yield
+    entropy.set_source(previous)
+
+
+class TestCutoffs:
+    """Test SP 800-90B cutoff values"""
+
+    def test_reference_values(self):
+        """Test cutoffs match the SP 800-90B tables at alpha = 2**-20"""
+        assert rct_cutoff(1, 2.0 ** -20) == 21
+        assert apt_cutoff(1024, 1, 2.0 ** -20) == 589
+        assert apt_cutoff(512, 1, 2.0 ** -20) == 311
+        assert apt_cutoff(512, 8, 2.0 ** -20) == 13
+
+    def test_defaults(self):
+        """Test the defaults for full-entropy bytes at alpha = 2**-40"""
+        tests = HealthTests()
+        assert tests.rct_cutoff == 6
+        assert tests.apt_cutoff == 19
+
+
+class TestHealthTests:
+    """Test continuous health tests on the raw stream"""
+
+    def test_random_data_passes(self):
+        """Test OS randomness passes both tests"""
+        tests = HealthTests()
+        assert all(tests.check(os.urandom(65536)) for _ in range(16))
+
+    def test_repetition_count(self):
+        """Test a run of cutoff identical bytes fails, one shorter passes"""
+        assert HealthTests().check(b'ab' + b'\x00' * 5 + b'cd')
+        assert not HealthTests().check(b'ab' + b'\x00' * 6 + b'cd')
+
+    def test_repetition_across_blocks(self):
+        """Test runs split between two blocks are still detected"""
+        tests = HealthTests()
+        assert tests.check(b'abc\x01\x01\x01')
+        assert not tests.check(b'\x01\x01\x01def')
+
+    def test_adaptive_proportion(self):
+        """Test a window dominated by its first byte fails"""
+        window = bytearray(os.urandom(512))
+        window[0:40:2] = b'\x07' * 20
+        assert not HealthTests().check(bytes(window))
+
+
+class TestOSEntropySource:
+    """Test the buffered OS reader"""
+
+    def test_small_reads_share_one_block(self, monkeypatch):
+        """Test small reads are sliced from one OS read without reuse"""
+        blocks = []
+        urandom = os.urandom
+        monkeypatch.setattr(entropy.os, 'urandom', lambda n: blocks.append(urandom(n)) or blocks[-1])
+        source = OSEntropySource(buffer_size=4096)
+        chunks = [source.read(16) for _ in range(256)]
+        assert len(blocks) == 1
+        assert b''.join(chunks) == blocks[0]
+        source.read(16)
+        assert len(blocks) == 2
+
+    def test_large_reads_bypass_buffer(self):
+        """Test reads of a block or more are returned whole"""
+        source = OSEntropySource(buffer_size=4096)
+        assert len(source.read(100000)) == 100000
+
+    def test_single_failure_recovers(self, monkeypatch):
+        """Test one failing block is discarded and replaced"""
+        blocks = iter([bytes(4096), os.urandom(4096)])
+        monkeypatch.setattr(entropy.os, 'urandom', lambda n: next(blocks))
+        source = OSEntropySource(buffer_size=4096)
+        assert source.read(8) != bytes(8)
+        assert source.failures == 1
+        assert source.healthy()
+
+    def test_repeated_failure_disables_source(self, monkeypatch):
+        """Test two failing blocks in a row make the source unusable"""
+        monkeypatch.setattr(entropy.os, 'urandom', bytes)
+        source = OSEntropySource(buffer_size=4096)
+        with pytest.raises(EntropyError):
+            source.read(8)
+        assert not source.healthy()
+        monkeypatch.undo()
+        with pytest.raises(EntropyError):
+            source.read(8)
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork')
+    def test_fork_discards_buffer(self):
+        """Test a forked child never repeats the parent's buffered bytes"""
+        source = OSEntropySource(buffer_size=4096)
+        source.read(16)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write_fd, source.read(16))
+            os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        child = os.read(read_fd, 16)
+        os.close(read_fd)
+        assert len(child) == 16
+        assert source.read(16) != child
+
+
+class TestSeededEntropySource:
+    """Test the deterministic test-only source"""
+
+    def test_exact_outputs(self, seeded):
+        """Test the engine is reproducible under a fixed seed"""
+        assert entropy.read(8).hex() == 'c1daed36bebc2b1a'
+        entropy.set_source(SeededEntropySource(b'test'))
+        alphabet = compile_alphabet(string.ascii_letters + string.digits)
+        assert random_string(alphabet, 16) == 'hGZ2ecRAo5Qc0SEx'
+        assert random_below(7776, 4) == [684, 1184, 3204, 115]
+
+    def test_stream_independent_of_read_sizes(self):
+        """Test the stream is the same however it is split into reads"""
+        one, two = SeededEntropySource('x'), SeededEntropySource('x')
+        assert one.read(10000) == two.read(1) + two.read(5000) + two.read(4999)
+
+    def test_refused_outside_tests(self, monkeypatch):
+        """Test the seeded source cannot be created outside pytest"""
+        monkeypatch.delenv('PYTEST_CURRENT_TEST')
+        with pytest.raises(RuntimeError):
+            SeededEntropySource(b'test')
+
+
+class TestUnhealthySource:
+    """Test the application when the entropy source fails"""
+
+    def test_generation_unavailable(self, monkeypatch):
+        """Test generation returns 503 and readiness fails"""
+        source = OSEntropySource(buffer_size=4096)
+        monkeypatch.setattr(entropy.os, 'urandom', bytes)
+        previous = entropy.set_source(source)
+        try:
+            client = create_app().test_client()
+            response = client.post('/api/generate', json={})
+            assert response.status_code == 503
+            assert json.loads(response.data)['success'] is False
+            response = client.get('/health/ready')
+            assert response.status_code == 503
+            assert json.loads(response.data)['checks']['entropy'] is False
+        finally:
+            entropy.set_source(previous)
@@ -0,0 +1,80 @@
+"""
+Unit tests for the JSON provider and pre-encoded fragments
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from flask import jsonify
+
+from app import OPTIONS_FRAGMENTS, create_app
+import jsonprovider
+from jsonprovider import CompactJSONProvider, Fragment, OrjsonProvider, provider_class
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request):
+    """Application using each provider"""
+    if request.param == 'orjson' and jsonprovider.orjson is None:
+        pytest.skip('orjson not installed')
+    return create_app({'TESTING': True, 'JSON_PROVIDER': request.param})
+
+
+class TestProviderSelection:
+    """Test provider choice and fallback"""
+
+    def test_auto(self):
+        """Test auto prefers orjson when it is installed"""
+        expected = CompactJSONProvider if jsonprovider.orjson is None else OrjsonProvider
+        assert provider_class('auto') is expected
+        assert provider_class('stdlib') is CompactJSONProvider
+
+    def test_fallback_without_orjson(self, monkeypatch):
+        """Test auto falls back to stdlib and explicit orjson fails clearly"""
+        monkeypatch.setattr(jsonprovider, 'orjson', None)
+        assert provider_class('auto') is CompactJSONProvider
+        with pytest.raises(ValueError):
+            provider_class('orjson')
+
+    def test_unknown_provider(self):
+        """Test invalid JSON_PROVIDER values are rejected"""
+        with pytest.raises(ValueError):
+            provider_class('simplejson')
+
+
+class TestSerialization:
+    """Test output of both providers"""
+
+    def test_compact_jsonify(self, app):
+        """Test production responses use compact separators"""
+        with app.test_request_context():
+            body = jsonify({'a': [1, 2], 'b': 'x'}).get_data()
+        assert body.strip() == b'{"a":[1,2],"b":"x"}'
+
+    def test_fragments(self, app):
+        """Test fragments serialize like their value at any depth"""
+        fragment = Fragment({'digits': True, 'symbols': [1, 2]})
+        assert fragment.raw == b'{"digits":true,"symbols":[1,2]}'
+        with app.test_request_context():
+            body = jsonify({'success': True, 'nested': [fragment], 'options': fragment}).get_data()
+        assert json.loads(body) == {'success': True, 'nested': [fragment.value],
+                                    'options': fragment.value}
+
+    def test_request_parsing(self, app):
+        """Test request bodies are parsed by the provider"""
+        response = app.test_client().post('/api/generate', json={'length': 20})
+        data = json.loads(response.data)
+        assert data['length'] == 20
+        assert data['options'] == {'uppercase': True, 'lowercase': True,
+                                   'digits': True, 'symbols': True}
+
+    def test_options_fragments(self):
+        """Test every cached fragment decodes to its flag combination"""
+        assert len(OPTIONS_FRAGMENTS) == 16
+        for flags, fragment in OPTIONS_FRAGMENTS.items():
+            assert tuple(json.loads(fragment.raw).values()) == flags
@@ -0,0 +1,144 @@
+"""
+Unit tests for Prometheus metrics
+"""
+
+import pytest
+import json
+import multiprocessing
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import metrics
+from app import app
+from metrics import MetricsStore, mark_process_dead
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+def increment_in_child(directory, amount):
+    store = MetricsStore(directory)
+    store.inc('requests|requests|', amount)
+    store.inc_live('in_flight|in_flight|', 1)
+
+
+class TestMetricsStore:
+    """Test in-process and file-backed storage"""
+
+    def test_in_memory(self):
+        """Test values accumulate without a directory"""
+        store = MetricsStore('')
+        store.inc('a|a|', 2)
+        store.inc('a|a|', 3)
+        store.inc_live('b|b|', 1)
+        assert store.collect() == {'a|a|': 5.0, 'b|b|': 1.0}
+
+    def test_aggregates_across_processes(self, tmp_path):
+        """Test values written by several processes are summed"""
+        directory = str(tmp_path)
+        context = multiprocessing.get_context('fork')
+        children = [context.Process(target=increment_in_child, args=(directory, n))
+                    for n in (1, 2, 3)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join()
+
+        totals = MetricsStore(directory).collect()
+        assert totals['requests|requests|'] == 6
+        assert totals['in_flight|in_flight|'] == 3
+
+        # Dead workers keep their counters but drop their in-flight gauges
+        for child in children:
+            mark_process_dead(child.pid, directory)
+        totals = MetricsStore(directory).collect()
+        assert totals['requests|requests|'] == 6
+        assert totals.get('in_flight|in_flight|', 0) == 0
+        assert sorted(os.listdir(directory)) == ['archive.lock', 'metrics_archive.db']
+
+    def test_reentrant_mark_process_dead(self, tmp_path, monkeypatch):
+        """Test a worker reaped during another fold is queued, not deadlocked"""
+        directory = str(tmp_path)
+        for pid, amount in ((101, 1), (102, 2)):
+            values = metrics._MmapValues(os.path.join(directory, f'metrics_{pid}.db'))
+            values.inc('requests|requests|', amount)
+            values.close()
+        real_read_file = metrics._read_file
+
+        def read_file(path):
+            # What gunicorn's SIGCHLD handler does when a second worker dies
+            if path.endswith('metrics_101.db'):
+                mark_process_dead(102, directory)
+            return real_read_file(path)
+
+        monkeypatch.setattr(metrics, '_read_file', read_file)
+        mark_process_dead(101, directory)
+        assert MetricsStore(directory).collect()['requests|requests|'] == 3
+        assert sorted(os.listdir(directory)) == ['archive.lock', 'metrics_archive.db']
+
+    def test_file_grows(self, tmp_path):
+        """Test many distinct keys grow the backing file"""
+        store = MetricsStore(str(tmp_path))
+        for index in range(5000):
+            store.inc(f'metric|metric|id="{index}"', index)
+        totals = store.collect()
+        assert len(totals) == 5000
+        assert totals['metric|metric|id="4999"'] == 4999
+
+
+class TestRender:
+    """Test the text exposition format"""
+
+    def test_histogram_is_cumulative(self):
+        """Test bucket counts are cumulative and end with +Inf"""
+        store = MetricsStore('')
+        original = metrics.store
+        metrics.store = store
+        try:
+            metrics.observe('http_request_duration_seconds', 0.003,
+                            metrics.REQUEST_BUCKETS, (('route', '/x'),))
+            metrics.observe('http_request_duration_seconds', 20,
+                            metrics.REQUEST_BUCKETS, (('route', '/x'),))
+        finally:
+            metrics.store = original
+        text = metrics.render(store.collect())
+        assert '# TYPE http_request_duration_seconds histogram' in text
+        assert 'http_request_duration_seconds_bucket{route="/x",le="0.0025"} 0' in text
+        assert 'http_request_duration_seconds_bucket{route="/x",le="0.005"} 1' in text
+        assert 'http_request_duration_seconds_bucket{route="/x",le="+Inf"} 2' in text
+        assert 'http_request_duration_seconds_count{route="/x"} 2' in text
+
+
+class TestMetricsEndpoint:
+    """Test /metrics endpoint"""
+
+    def test_metrics_endpoint(self, client):
+        """Test request, generation and entropy metrics are exposed"""
+        client.post('/api/generate', data=json.dumps({'length': 20}),
+                    content_type='application/json')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        text = response.data.decode()
+        assert 'http_requests_total{method="POST",route="/api/generate",status="200"}' in text
+        assert 'password_generation_seconds_count{length="17-32",options="ulds"}' in text
+        assert 'password_entropy_bytes_total' in text
+        in_flight = [line for line in text.splitlines()
+                     if line.startswith('http_requests_in_flight ')]
+        assert int(in_flight[0].split()[1]) >= 1
+
+    def test_generation_labels_for_patterns_and_streams(self, client):
+        """Test patterns are labelled by their own length and stream chunks are timed"""
+        client.post('/api/generate', json={'pattern': 'A{40}'})
+        client.post('/api/generate/stream', json={'length': 70, 'count': 10, 'format': 'text',
+                                                  'lowercase': False, 'symbols': False})
+        text = client.get('/metrics').data.decode()
+        assert 'password_generation_seconds_count{length="33-64",options="pattern"}' in text
+        assert 'password_generation_seconds_count{length="65-128",options="ud"}' in text
@@ -0,0 +1,80 @@
+"""
+Unit tests for passphrase generation
+"""
+
+import pytest
+import math
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from passphrase import Wordlist, generate_passphrase, load_wordlist, passphrase_entropy
+
+
+@pytest.fixture
+def small_wordlist(tmp_path):
+    """Four-word list without a trailing newline, with a blank line and a hyphenated word"""
+    path = tmp_path / 'words.txt'
+    path.write_bytes(b'alpha\nbravo\n\ncharlie\r\nyo-yo\ndelta')
+    return Wordlist(str(path))
+
+
+class TestWordlist:
+    """Test the memory-mapped wordlist index"""
+
+    def test_default_wordlist(self):
+        """Test the bundled EFF list is indexed without its hyphenated words"""
+        wordlist = load_wordlist()
+        assert len(wordlist) == 7772
+        assert wordlist[0] == 'abacus'
+        assert wordlist[7771] == 'zoom'
+        assert all(wordlist[i].isalpha() for i in range(len(wordlist)))
+
+    def test_loaded_once(self):
+        """Test the wordlist is loaded once per process"""
+        assert load_wordlist() is load_wordlist()
+
+    def test_offsets_index(self, small_wordlist):
+        """Test blank lines, CRLF, non-letter words and a missing final newline"""
+        assert len(small_wordlist) == 4
+        assert [small_wordlist[i] for i in range(4)] == ['alpha', 'bravo', 'charlie', 'delta']
+
+
+class TestPassphrase:
+    """Test passphrase generation"""
+
+    def test_word_count_and_separator(self):
+        """Test word count and separator"""
+        passphrase, _ = generate_passphrase(words=5, separator=' ')
+        words = passphrase.split(' ')
+        assert len(words) == 5
+        wordlist = load_wordlist()
+        known = {wordlist[i] for i in range(len(wordlist))}
+        assert all(word in known for word in words)
+
+    def test_capitalize(self, small_wordlist):
+        """Test every word is capitalized"""
+        passphrase, _ = generate_passphrase(words=8, capitalize=True, wordlist=small_wordlist)
+        assert all(word[0].isupper() for word in passphrase.split('-'))
+
+    def test_digit_and_symbol_injection(self, small_wordlist):
+        """Test a digit and a symbol are injected"""
+        passphrase, _ = generate_passphrase(words=4, separator=' ', include_digit=True,
+                                            include_symbol=True, wordlist=small_wordlist)
+        assert any(c.isdigit() for c in passphrase)
+        assert any(not c.isalnum() and c != ' ' for c in passphrase)
+
+    def test_ambiguous_separators_rejected(self, small_wordlist):
+        """Test separators that let words run together are refused"""
+        for separator in ['', 'x', ' and ', '-' * 9]:
+            with pytest.raises(ValueError):
+                generate_passphrase(words=3, separator=separator, wordlist=small_wordlist)
+
+    def test_entropy(self):
+        """Test entropy accounting"""
+        _, entropy = generate_passphrase(words=6)
+        assert entropy == pytest.approx(6 * math.log2(7772))
+        assert passphrase_entropy(4, 7776, include_digit=True) == \
+            pytest.approx(4 * math.log2(7776) + math.log2(40))
@@ -9,7 +9,7 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from app import generate_password
+from app import generate_password, generate_passwords
 
 
 class TestPasswordGeneration:
@@ -100,6 +100,12 @@ class TestPasswordGeneration:
         assert len(password) == 12
         assert len(password) > 0
     
+    def test_custom_alphabet(self):
+        """Test password drawn from a custom alphabet"""
+        password = generate_password(length=40, alphabet='01')
+        assert len(password) == 40
+        assert set(password) <= {'0', '1'}
+    
     def test_randomness(self):
         """Test that generated passwords are different (randomness)"""
         passwords = [generate_password(length=16) for _ in range(10)]
@@ -144,6 +150,32 @@ class TestPasswordGeneration:
             assert len(password) == config['length']
 
 
+class TestBatchGeneration:
+    """Test batch password generation function"""
+    
+    def test_batch_count_and_length(self):
+        """Test batch returns count passwords of the requested length"""
+        passwords = generate_passwords(50, length=16)
+        assert len(passwords) == 50
+        assert all(len(pwd) == 16 for pwd in passwords)
+    
+    def test_batch_shared_options(self):
+        """Test options apply to every password in the batch"""
+        passwords = generate_passwords(20, length=10, use_uppercase=False,
+                                       use_lowercase=False, use_digits=True,
+                                       use_symbols=False)
+        assert all(pwd.isdigit() for pwd in passwords)
+    
+    def test_batch_uniqueness(self):
+        """Test passwords in a batch are independent"""
+        passwords = generate_passwords(100, length=16)
+        assert len(set(passwords)) == 100
+    
+    def test_empty_batch(self):
+        """Test zero count returns an empty list"""
+        assert generate_passwords(0) == []
+
+
 class TestEdgeCases:
     """Test edge cases and boundary conditions"""
     
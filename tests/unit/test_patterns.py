@@ -0,0 +1,137 @@
+"""
+Unit tests for pattern templates
+"""
+
+import pytest
+import json
+import math
+import string
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from patterns import MAX_PATTERN_LENGTH, Pattern, compile_pattern, parse_template
+
+
+class TestParseTemplate:
+    """Test template parsing"""
+
+    def test_placeholders_and_literals(self):
+        """Test placeholders map to alphabets and other characters are literal"""
+        tokens = parse_template('Aa9!-x')
+        assert [alphabet for alphabet, _ in tokens[:4]] == [
+            string.ascii_uppercase, string.ascii_lowercase, string.digits, string.punctuation]
+        assert tokens[4:] == [(None, '-'), (None, 'x')]
+
+    def test_classes_and_repeats(self):
+        """Test ranges, escapes and {n} repeats"""
+        tokens = parse_template('[a-c\\-]{3}\\A')
+        assert tokens == [('abc-', '[')] * 3 + [(None, 'A')]
+        assert parse_template('[]x]') == [(']x', '[')]
+
+    @pytest.mark.parametrize('template', [
+        '', '[abc', 'A\\', 'A{x}', 'A{2', '}', '[z-a]', 'A' * 300, 'A{1000}',
+    ])
+    def test_invalid(self, template):
+        """Test malformed and oversized templates are rejected"""
+        with pytest.raises(ValueError):
+            parse_template(template)
+
+    def test_repeat_limit(self):
+        """Test huge repeats fail before any tokens are built"""
+        with pytest.raises(ValueError):
+            parse_template('A{99999999999}')
+        assert len(parse_template(f'A{{{MAX_PATTERN_LENGTH}}}')) == MAX_PATTERN_LENGTH
+
+
+class TestPattern:
+    """Test compiled patterns"""
+
+    def test_entropy(self):
+        """Test entropy is the sum of log2 alphabet sizes over positions"""
+        pattern = Pattern('Aaaa-9999-!!')
+        expected = math.log2(26) * 4 + math.log2(10) * 4 + math.log2(32) * 2
+        assert pattern.length == 12
+        assert pattern.entropy == pytest.approx(expected)
+
+    def test_positions_follow_template(self):
+        """Test every position is drawn from its own alphabet"""
+        for password in compile_pattern('Aaaa-9999-!![xyz]{4}').generate_many(500):
+            assert len(password) == 16
+            assert password[0] in string.ascii_uppercase
+            assert all(c in string.ascii_lowercase for c in password[1:4])
+            assert password[4] == '-' and password[9] == '-'
+            assert password[5:9].isdigit()
+            assert all(c in string.punctuation for c in password[10:12])
+            assert all(c in 'xyz' for c in password[12:])
+
+    def test_positions_independent(self):
+        """Test positions sharing an alphabet are not filled with the same value"""
+        passwords = compile_pattern('9999').generate_many(2000)
+        assert sum(p[0] == p[1] == p[2] == p[3] for p in passwords) < 20
+        assert len(set(passwords)) > 1500
+
+    def test_needs_choices(self):
+        """Test templates without randomness are rejected"""
+        with pytest.raises(ValueError):
+            Pattern('-_.\\A')
+        with pytest.raises(ValueError):
+            Pattern('[x]{8}')
+
+    def test_single_character_class_is_literal(self):
+        """Test a one-character class becomes a fixed character"""
+        pattern = Pattern('[x]9{4}')
+        assert pattern.entropy == pytest.approx(4 * math.log2(10))
+        assert all(p[0] == 'x' for p in pattern.generate_many(50))
+
+    def test_control_characters_rejected(self):
+        """Test templates that would break line-delimited output are rejected"""
+        with pytest.raises(ValueError):
+            parse_template('A{4}\n9{4}')
+
+    def test_cached(self):
+        """Test compiled plans are reused"""
+        assert compile_pattern('Aaaa-9999') is compile_pattern('Aaaa-9999')
+        assert compile_pattern('Aaaa-9999').generate() != compile_pattern('Aaaa-9999').generate()
+
+
+class TestPatternEndpoints:
+    """Test the pattern field on the generation endpoints"""
+
+    def test_generate(self):
+        """Test /api/generate follows the pattern and reports its entropy"""
+        client = create_app().test_client()
+        data = json.loads(client.post('/api/generate', json={'pattern': 'Aaaa-9999-!!'}).data)
+        assert data['length'] == 12
+        assert data['password'][4] == '-'
+        assert data['options']['pattern'] == 'Aaaa-9999-!!'
+        assert data['entropy'] == round(compile_pattern('Aaaa-9999-!!').entropy, 2)
+
+    def test_batch_and_stream(self):
+        """Test batches and streams use the pattern's length"""
+        client = create_app().test_client()
+        data = json.loads(client.post('/api/generate/batch',
+                                      json={'pattern': '9{6}', 'count': 50}).data)
+        assert data['length'] == 6
+        assert all(len(p) == 6 and p.isdigit() for p in data['passwords'])
+        response = client.post('/api/generate/stream',
+                               json={'pattern': 'a{5}', 'count': 20, 'format': 'text'})
+        lines = response.get_data(as_text=True).splitlines()
+        assert len(lines) == 20
+        assert all(len(line) == 5 and line.islower() for line in lines)
+
+    @pytest.mark.parametrize('body', [
+        {'pattern': '[abc'},
+        {'pattern': '---'},
+        {'pattern': 'A{4}', 'alphabet': 'abc'},
+    ])
+    def test_invalid(self, body):
+        """Test bad patterns return 400 with a field error"""
+        client = create_app().test_client()
+        response = client.post('/api/generate', json=body)
+        assert response.status_code == 400
+        details = json.loads(response.data)['details']
+        assert [detail['field'] for detail in details] == ['pattern']
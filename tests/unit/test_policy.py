@@ -0,0 +1,86 @@
+"""
+Unit tests for policy-constrained generation
+"""
+
+import pytest
+import math
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from engine import RandomIndexes
+from policy import (AMBIGUOUS_CHARACTERS, CLASSES, Policy, compile_policy,
+                    required_length)
+
+STRICT = dict(min_counts={'uppercase': 2, 'lowercase': 2, 'digits': 2, 'symbols': 2},
+              exclude_ambiguous=True, no_repeats=True, prefix='uppercase', suffix='digits')
+
+
+class TestRandomIndexes:
+    """Test buffered uniform indexes"""
+
+    def test_bounds(self):
+        """Test every value falls below its bound"""
+        indexes = RandomIndexes(16)
+        for n in [1, 2, 3, 94, 1000, 2 ** 31 + 1] * 50:
+            assert 0 <= indexes.below(n) < n
+
+
+class TestPolicy:
+    """Test one-pass policy construction"""
+
+    def test_minimum_counts_always_met(self):
+        """Test short passwords always contain every required class"""
+        policy = Policy(min_counts={name: 1 for name in CLASSES})
+        for password in policy.generate_many(2000, 4):
+            assert len(password) == 4
+            for characters in CLASSES.values():
+                assert any(c in characters for c in password)
+
+    def test_strict_policy(self):
+        """Test all rules hold together"""
+        policy = Policy(**STRICT)
+        for password in policy.generate_many(1000, 10):
+            assert policy.satisfied_by(password)
+            assert password[0].isupper() and password[-1].isdigit()
+            assert not set(password) & set(AMBIGUOUS_CHARACTERS)
+            assert all(a != b for a, b in zip(password, password[1:]))
+
+    def test_prefix_counts_towards_minimum(self):
+        """Test prefix/suffix slots satisfy their class minimum"""
+        policy = Policy(min_counts={'digits': 1}, prefix='digits', suffix='digits')
+        assert policy.min_length == 2
+
+    def test_required_positions_uniform(self):
+        """Test the required digit is placed uniformly over positions"""
+        policy = Policy(classes=('lowercase', 'digits'), min_counts={'digits': 1})
+        counts = [0] * 4
+        for password in policy.generate_many(8000, 4):
+            for position, c in enumerate(password):
+                counts[position] += c.isdigit()
+        expected = sum(counts) / 4
+        assert all(abs(count - expected) < 5 * math.sqrt(expected) for count in counts)
+
+    def test_invalid_policies(self):
+        """Test impossible rules are rejected up front"""
+        with pytest.raises(ValueError):
+            Policy(classes=('lowercase',), min_counts={'digits': 1})
+        with pytest.raises(ValueError):
+            Policy(prefix='symbols', classes=('digits',))
+        with pytest.raises(ValueError):
+            compile_policy(('lowercase',), prefix='emoji')
+        with pytest.raises(ValueError):
+            Policy(**STRICT).generate(7)
+
+    def test_required_slots_stored_per_class(self):
+        """Test large minimums are kept as counts, not expanded per slot"""
+        policy = Policy(min_counts={'digits': 10 ** 9}, prefix='digits')
+        assert policy.required == ((policy.alphabets['digits'], 10 ** 9 - 1),)
+        assert policy.min_length == required_length({'digits': 10 ** 9}, 'digits') == 10 ** 9
+
+    def test_compiled_policies_cached(self):
+        """Test identical rules reuse one compiled policy"""
+        args = (tuple(CLASSES), (('digits', 2),), True)
+        assert compile_policy(*args) is compile_policy(*args)
@@ -0,0 +1,99 @@
+"""
+Unit tests for the pre-generated password pool
+"""
+
+import pytest
+import itertools
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from pool import PasswordPool, parse_option_sets
+
+KEY = (12, True, True, True, True)
+
+
+def counter_generate():
+    """Deterministic generator so handed-out passwords can be tracked"""
+    sequence = itertools.count()
+    return lambda count, key: [f'pw{next(sequence)}' for _ in range(count)]
+
+
+class TestOptionSetParsing:
+    """Test PASSWORD_POOL_OPTION_SETS parsing"""
+
+    def test_parse_option_sets(self):
+        """Test length and flag letters map to pool keys"""
+        assert parse_option_sets('12:ulds, 16:d') == [
+            (12, True, True, True, True),
+            (16, False, False, True, False),
+        ]
+
+    def test_invalid_flag(self):
+        """Test unknown flag letters are rejected"""
+        with pytest.raises(ValueError):
+            parse_option_sets('12:xyz')
+
+
+class TestPasswordPool:
+    """Test pool hand-out, refill and counters"""
+
+    def test_hands_out_each_password_once(self):
+        """Test every pooled password is returned exactly once"""
+        pool = PasswordPool([KEY], counter_generate(), size=50, low_watermark=0)
+        pool.refill()
+        taken = [pool.take(KEY) for _ in range(50)]
+        assert len(set(taken)) == 50
+        assert pool.take(KEY) is None
+
+    def test_hit_miss_counters(self):
+        """Test hits and misses are counted"""
+        pool = PasswordPool([KEY], counter_generate(), size=2, low_watermark=0)
+        pool.refill()
+        pool.take(KEY)
+        pool.take(KEY)
+        pool.take(KEY)
+        stats = pool.stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['available'] == {'12:ulds': 0}
+
+    def test_unpooled_key_ignored(self):
+        """Test option sets that are not pooled bypass the pool"""
+        pool = PasswordPool([KEY], counter_generate(), size=5)
+        assert pool.take((16, True, True, True, True)) is None
+        assert pool.stats()['misses'] == 0
+
+    def test_background_refill(self):
+        """Test the refill thread tops the pool up below the low watermark"""
+        pool = PasswordPool([KEY], counter_generate(), size=20, low_watermark=10)
+        pool.take(KEY)
+        for _ in range(200):
+            if pool.stats()['available']['12:ulds'] == 20:
+                break
+            pool._wakeup.set()
+            time.sleep(0.005)
+        assert pool.stats()['available']['12:ulds'] == 20
+
+    def test_clear_and_fork_reset(self):
+        """Test clearing and the post-fork hook discard pooled passwords"""
+        pool = PasswordPool([KEY], counter_generate(), size=5, low_watermark=0)
+        pool.refill()
+        pool._after_fork()
+        assert pool.stats()['available']['12:ulds'] == 0
+        assert pool.stats()['hits'] == 0
+
+    @pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+    def test_unhealthy_when_refill_thread_dies(self):
+        """Test readiness sees a crashed refill thread"""
+        def failing(count, key):
+            raise RuntimeError('generator broken')
+
+        pool = PasswordPool([KEY], failing, size=5)
+        assert pool.healthy()
+        pool.take(KEY)
+        pool._thread.join(timeout=1)
+        assert not pool.healthy()
@@ -0,0 +1,117 @@
+"""
+Unit tests for cached health probes and the probe server
+"""
+
+import pytest
+import json
+import urllib.error
+import urllib.request
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from probes import ProbeResponses, WorkerHealth, self_test, start_probe_server
+
+
+class TestProbeResponses:
+    """Test pre-serialized probe bodies"""
+
+    def test_bodies_cached_until_refresh(self):
+        """Test checks run once per refresh interval, not per probe"""
+        calls = []
+        probes = ProbeResponses('v1', 'test', {'check': lambda: calls.append(1) or True},
+                                refresh_seconds=60)
+        first = probes.get('ready')
+        assert probes.get('ready') is first
+        assert probes.get('health')[0] is probes.get('health')[0]
+        assert len(calls) == 1
+
+    def test_failed_check_not_ready(self):
+        """Test a failing or raising check turns readiness into 503"""
+        probes = ProbeResponses('v1', 'test', {'ok': lambda: True, 'broken': lambda: 1 / 0})
+        body, status = probes.get('ready')
+        assert status == 503
+        assert json.loads(body)['checks'] == {'ok': True, 'broken': False}
+        assert probes.get('live')[1] == 200
+
+    def test_self_test(self):
+        """Test the generator self-test passes"""
+        assert self_test()
+
+
+class TestProbeEndpoints:
+    """Test probe routes on the application"""
+
+    def test_live_and_ready(self):
+        """Test liveness and readiness including the pool check"""
+        client = create_app({'PASSWORD_POOL_ENABLED': True}).test_client()
+        assert client.get('/health/live').status_code == 200
+        response = client.get('/health/ready')
+        assert response.status_code == 200
+        assert json.loads(response.data)['checks'] == {'self_test': True, 'entropy': True,
+                                                         'password_pool': True}
+
+    def test_version_body(self):
+        """Test /version keeps its fields"""
+        data = json.loads(create_app().test_client().get('/version').data)
+        assert set(data) == {'version', 'service', 'environment', 'timestamp'}
+
+
+class TestProbeServer:
+    """Test the standalone probe server used by the gunicorn master"""
+
+    def test_serves_probes(self):
+        """Test probes are answered over HTTP on their own port"""
+        server = start_probe_server(ProbeResponses('v2', 'test', {}), 0, host='127.0.0.1')
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        try:
+            with urllib.request.urlopen(base + '/version') as response:
+                assert json.loads(response.read())['version'] == 'v2'
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(base + '/unknown')
+            assert error.value.code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestWorkerHealth:
+    """Test worker readiness reported to the gunicorn master"""
+
+    def test_ready_from_live_workers(self, tmp_path):
+        """Test readiness needs a fresh ready report and no failing one"""
+        health = WorkerHealth(str(tmp_path))
+        assert not health.ready([101, 102])
+        health.report(True, pid=101)
+        assert health.ready([101, 102])
+        health.report(False, pid=102)
+        assert not health.ready([101, 102])
+        # Reports from workers that are gone are not read
+        assert health.ready([101])
+        health.remove(101)
+        assert not health.ready([101])
+
+    def test_stale_reports_ignored(self, tmp_path):
+        """Test a report older than stale_after does not count"""
+        health = WorkerHealth(str(tmp_path))
+        health.report(True, pid=101)
+        old = time.time() - health.stale_after - 1
+        os.utime(tmp_path / 'health_101.db', (old, old))
+        assert not health.ready([101])
+
+    def test_reporting_thread(self, tmp_path):
+        """Test a worker's failing check reaches the master"""
+        health = WorkerHealth(str(tmp_path / 'health'), refresh_seconds=0.01)
+        stop = health.start_reporting({'pool': lambda: False})
+        try:
+            for _ in range(100):
+                if (tmp_path / 'health' / f'health_{os.getpid()}.db').exists():
+                    break
+                time.sleep(0.01)
+            assert not health.ready([os.getpid()])
+        finally:
+            stop.set()
@@ -0,0 +1,126 @@
+"""
+Unit tests for pronounceable password generation
+"""
+
+import pytest
+from fractions import Fraction
+from itertools import product
+import json
+import math
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from pronounceable import (LETTERS, MAX_LENGTH, MarkovModel, _alias_table,
+                           generate_pronounceable, load_model)
+
+
+def string_probability(model, password):
+    """Probability of ``password`` under the model, from its transition lists"""
+    probability = 1.0
+    first = second = len(LETTERS)
+    for letter in password:
+        index = LETTERS.index(letter)
+        transitions = dict(model.transitions[first * (len(LETTERS) + 1) + second])
+        probability *= transitions.get(index, 0.0)
+        first, second = second, index
+    return probability
+
+
+class TestAliasTable:
+    """Test integer alias tables"""
+
+    @pytest.mark.parametrize('weights', [[1], [1, 1], [5, 1, 1, 9], [3, 7, 1, 1, 2, 10, 4]])
+    def test_exact_probabilities(self, weights):
+        """Test every outcome's probability is exactly weight / total"""
+        total, threshold, alias = _alias_table(weights)
+        columns = len(weights)
+        probabilities = [Fraction(0)] * columns
+        for column in range(columns):
+            keep = Fraction(threshold[column], total)
+            probabilities[column] += keep / columns
+            probabilities[alias[column]] += (1 - keep) / columns
+        assert probabilities == [Fraction(weight, total) for weight in weights]
+
+
+class TestMarkovModel:
+    """Test the trained letter model"""
+
+    def test_entropy_matches_enumeration(self):
+        """Test Shannon and min-entropy against brute force on a tiny model"""
+        model = MarkovModel(['ab', 'ba', 'abb', 'bab', 'aab'])
+        for length in range(1, 5):
+            probabilities = [string_probability(model, ''.join(p))
+                             for p in product('ab', repeat=length)]
+            probabilities = [p for p in probabilities if p]
+            assert math.isclose(sum(probabilities), 1.0)
+            shannon = -sum(p * math.log2(p) for p in probabilities)
+            min_entropy = -math.log2(max(probabilities))
+            assert model.entropy(length) == pytest.approx((shannon, min_entropy))
+
+    def test_samples_follow_model(self):
+        """Test first-letter frequencies match the model (chi-square)"""
+        model = MarkovModel(['ab', 'ba', 'abb', 'bab', 'aab', 'ca'])
+        expected = dict(model.transitions[len(LETTERS) * (len(LETTERS) + 1) + len(LETTERS)])
+        samples = 30000
+        counts = {}
+        for _ in range(samples):
+            letter = LETTERS.index(model.generate(1))
+            counts[letter] = counts.get(letter, 0) + 1
+        assert set(counts) == set(expected)
+        statistic = sum((counts[letter] - samples * p) ** 2 / (samples * p)
+                        for letter, p in expected.items())
+        assert statistic < 25
+
+    def test_only_seen_transitions(self):
+        """Test generated letters only follow contexts seen in training"""
+        model = MarkovModel(['abc', 'bca', 'cab'])
+        for _ in range(200):
+            assert string_probability(model, model.generate(12)) > 0
+
+
+class TestGeneratePronounceable:
+    """Test the wordlist-trained generator"""
+
+    def test_lowercase_letters(self):
+        """Test output length and character set"""
+        password, shannon, min_entropy = generate_pronounceable(16)
+        assert len(password) == 16
+        assert set(password) <= set(LETTERS)
+        assert 0 < min_entropy < shannon < 16 * math.log2(26)
+
+    def test_entropy_grows_with_length(self):
+        """Test entropy is reported for every allowed length"""
+        model = load_model()
+        bits = [model.entropy(length)[0] for length in range(4, MAX_LENGTH + 1)]
+        assert bits == sorted(bits)
+
+    def test_invalid_length(self):
+        """Test lengths outside the model's range are rejected"""
+        with pytest.raises(ValueError):
+            generate_pronounceable(MAX_LENGTH + 1)
+
+
+class TestPronounceableEndpoint:
+    """Test pronounceable mode on /api/generate"""
+
+    def test_response(self):
+        """Test the response carries both entropy figures"""
+        client = create_app().test_client()
+        data = json.loads(client.post('/api/generate',
+                                      json={'mode': 'pronounceable', 'length': 12}).data)
+        assert data['mode'] == 'pronounceable'
+        assert len(data['password']) == 12
+        shannon, min_entropy = load_model().entropy(12)
+        assert data['entropy'] == round(min_entropy, 2)
+        assert data['shannon_entropy'] == round(shannon, 2)
+
+    def test_length_clamped(self):
+        """Test lengths above the model's maximum are clamped"""
+        client = create_app().test_client()
+        data = json.loads(client.post('/api/generate',
+                                      json={'mode': 'pronounceable', 'length': 128}).data)
+        assert len(data['password']) == MAX_LENGTH
@@ -0,0 +1,169 @@
+"""
+Unit tests for token-bucket rate limiting
+"""
+
+import pytest
+import json
+import multiprocessing
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+from ratelimit import TokenBuckets, request_cost
+
+_shared_buckets = None
+
+
+def take_shared(_):
+    """Pool task: one token from the bucket inherited over fork"""
+    return _shared_buckets.acquire('shared', 1)[0]
+
+
+class TestTokenBuckets:
+    """Test bucket accounting with an explicit clock"""
+
+    def test_burst_then_refill(self):
+        """Test the burst is spent, refused and refilled at the rate"""
+        buckets = TokenBuckets(rate=10, burst=20, slots=64, directory='')
+        assert buckets.acquire('a', 15, now=0.0) == (True, 0.0)
+        allowed, retry_after = buckets.acquire('a', 10, now=0.0)
+        assert not allowed
+        assert retry_after == pytest.approx(0.5)
+        assert buckets.acquire('a', 10, now=0.5)[0]
+
+    def test_clients_independent(self):
+        """Test one client's spending does not affect another"""
+        buckets = TokenBuckets(rate=1, burst=5, slots=64, directory='')
+        assert buckets.acquire('a', 5, now=0.0)[0]
+        assert buckets.acquire('b', 5, now=0.0)[0]
+        assert not buckets.acquire('a', 1, now=0.0)[0]
+
+    def test_cost_above_burst_never_allowed(self):
+        """Test requests larger than the bucket are not discounted to fit"""
+        buckets = TokenBuckets(rate=1, burst=5, slots=64, directory='')
+        assert not buckets.acquire('a', 1000, now=0.0)[0]
+        assert not buckets.acquire('a', 1000, now=1000.0)[0]
+        assert buckets.acquire('a', 5, now=1000.0)[0]
+
+    def test_eviction_when_group_full(self):
+        """Test a full group evicts the longest-idle bucket"""
+        buckets = TokenBuckets(rate=1, burst=5, slots=8, directory='')
+        for i in range(20):
+            assert buckets.acquire(f'client{i}', 5, now=float(i))[0]
+
+    def test_shared_across_processes(self, tmp_path):
+        """Test workers draw from the same file-backed bucket"""
+        global _shared_buckets
+        _shared_buckets = TokenBuckets(rate=0.001, burst=10, slots=64, directory=str(tmp_path))
+        context = multiprocessing.get_context('fork')
+        with context.Pool(2) as pool:
+            results = pool.map(take_shared, range(20))
+        assert sum(results) == 10
+        assert not _shared_buckets.acquire('shared', 1)[0]
+
+
+class TestRequestCost:
+    """Test cost weighting"""
+
+    def test_weighted_by_characters(self):
+        """Test cost grows with length and count"""
+        assert request_cost('main.api_generate', {'length': 128}, 16) == 8
+        assert request_cost('main.api_generate_batch', {'count': 100, 'length': 16}, 16) == 100
+        assert request_cost('main.api_generate', {}, 16) == 1
+        assert request_cost('main.api_generate_batch', {'count': 10, 'pattern': 'A{32}'}, 16) == 20
+        assert request_cost('main.api_strength', {'passwords': ['a' * 32] * 4}, 16) == 8
+
+    def test_invalid_values_use_defaults(self):
+        """Test malformed fields do not break cost estimation"""
+        assert request_cost('main.api_generate_batch', {'count': 'x', 'length': None}, 12) == 10
+
+    def test_count_capped_at_served_maximum(self):
+        """Test counts above what the endpoint serves are charged at its maximum"""
+        assert request_cost('main.api_generate_batch', {'count': 10 ** 9, 'length': 16}, 16,
+                            max_count=50000) == 50000
+
+    def test_infinite_values_use_defaults(self):
+        """Test Infinity and overflowing floats from JSON do not raise"""
+        assert request_cost('main.api_generate_batch', {'count': float('inf')}, 12) == 10
+        assert request_cost('main.api_generate', {'length': float('-inf')}, 12) == 1
+
+
+class TestRateLimitAPI:
+    """Test 429 responses from the application"""
+
+    @pytest.fixture
+    def client(self):
+        limited = create_app({'RATE_LIMIT_ENABLED': True, 'RATE_LIMIT_RATE': 0.01,
+                              'RATE_LIMIT_BURST': 10, 'RATE_LIMIT_DIR': '',
+                              'RATE_LIMIT_API_KEYS': 'partner'})
+        return limited.test_client()
+
+    def test_429_with_retry_after(self, client):
+        """Test exhausted clients get 429 and Retry-After before generation"""
+        assert client.post('/api/generate', json={'length': 128}).status_code == 200
+        response = client.post('/api/generate', json={'length': 128})
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        data = json.loads(response.data)
+        assert data['success'] is False
+        assert data['retry_after'] > 0
+
+    @pytest.mark.parametrize('body', ['{"count": Infinity}', '{"count": 5, "length": 1e400}'])
+    def test_infinite_values_are_validation_errors(self, body):
+        """Test non-finite numbers (parsed by the stdlib provider) reach validation"""
+        client = create_app({'RATE_LIMIT_ENABLED': True, 'RATE_LIMIT_DIR': '',
+                             'JSON_PROVIDER': 'stdlib'}).test_client()
+        response = client.post('/api/generate/batch', data=body,
+                               content_type='application/json')
+        assert response.status_code == 400
+
+    def test_probes_not_limited(self, client):
+        """Test non-generation endpoints are never charged"""
+        client.post('/api/generate/batch', json={'count': 10, 'length': 16})
+        assert client.get('/health').status_code == 200
+
+    def test_larger_than_burst_refused(self, client):
+        """Test requests costing more than the bucket get 413 with the largest count"""
+        response = client.post('/api/generate/batch', json={'count': 1000, 'length': 128})
+        assert response.status_code == 413
+        assert 'Retry-After' not in response.headers
+        data = json.loads(response.data)
+        assert data['max_count'] == 1
+        assert client.post('/api/generate/batch', json={'count': 10, 'length': 16}).status_code == 200
+        response = client.post('/api/strength', json={'password': 'x' * 200})
+        assert json.loads(response.data)['max_characters'] == 160
+
+    def test_batch_charged_for_served_count(self):
+        """Test a batch is charged for the count it is clamped to, not the one asked for"""
+        client = create_app({'RATE_LIMIT_ENABLED': True, 'RATE_LIMIT_BURST': 10,
+                             'RATE_LIMIT_DIR': '', 'MAX_BATCH_COUNT': 5}).test_client()
+        response = client.post('/api/generate/batch', json={'count': 1000, 'length': 16})
+        assert response.status_code == 200
+        assert json.loads(response.data)['count'] == 5
+
+    def test_stream_charged_per_chunk(self):
+        """Test streams larger than the bucket are paced instead of refused"""
+        client = create_app({'RATE_LIMIT_ENABLED': True, 'RATE_LIMIT_RATE': 2000,
+                             'RATE_LIMIT_BURST': 10, 'RATE_LIMIT_DIR': '',
+                             'STREAM_CHUNK_SIZE': 25}).test_client()
+        start = time.monotonic()
+        response = client.post('/api/generate/stream',
+                               json={'count': 400, 'length': 16, 'format': 'text'})
+        assert response.status_code == 200
+        assert len(response.get_data(as_text=True).splitlines()) == 400
+        # 400 tokens, 10 prepaid, the rest refilled at 2000 per second
+        assert time.monotonic() - start >= 0.15
+        assert client.post('/api/generate', json={'length': 128}).status_code == 429
+
+    def test_known_api_key_has_own_bucket(self, client):
+        """Test configured API keys are limited separately from the IP"""
+        client.post('/api/generate/batch', json={'count': 10, 'length': 16})
+        assert client.post('/api/generate', json={}).status_code == 429
+        response = client.post('/api/generate', json={}, headers={'X-API-Key': 'partner'})
+        assert response.status_code == 200
+        response = client.post('/api/generate', json={}, headers={'X-API-Key': 'made-up'})
+        assert response.status_code == 429
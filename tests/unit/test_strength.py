@@ -0,0 +1,125 @@
+"""
+Unit tests for server-side strength scoring (parity with static/script.js)
+"""
+
+import pytest
+import json
+import random
+import shutil
+import string
+import subprocess
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from strength import estimate_crack_time, score_password, score_passwords
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+ALL = {'uppercase': True, 'lowercase': True, 'digits': True, 'symbols': True}
+
+# Expected values produced by calculatePasswordStrength() in static/script.js:
+# (password, options, score, strength, charTypes, entropy, uniqueness, crackTime)
+JS_FIXTURES = [
+    ('abc', {'lowercase': True}, 15, 'very-weak', 1, 14, 100, 'Instant'),
+    ('Tr0ub4dor&3', ALL, 72, 'strong', 4, 72, 91, 'Millions of years'),
+    ('aaaaaaaaaaaa', {'lowercase': True}, 42, 'weak', 1, 56, 8, '2 months'),
+    ('P@ssw0rd', dict(ALL, symbols=False), 54, 'medium', 3, 53, 88, '4 days'),
+    ('correcthorsebatterystaple', {'lowercase': True},
+     45, 'medium', 1, 118, 48, 'Millions of years'),
+    ('x' * 128, ALL, 45, 'medium', 1, 841, 1, 'Millions of years'),
+    ('12345678', {'digits': True}, 30, 'weak', 1, 27, 100, 'Instant'),
+    ('abcdefgh', {'lowercase': True}, 35, 'weak', 1, 38, 100, '10 seconds'),
+    ('Kq7#vB2!mZ9$', ALL, 82, 'strong', 4, 79, 100, 'Millions of years'),
+    ('hunter2', {}, 20, 'very-weak', 0, 36, 100, '4 seconds'),
+    ('zX9!', ALL, 15, 'very-weak', 4, 26, 100, 'Instant'),
+    ('passwordpassword', {'lowercase': True, 'uppercase': True},
+     45, 'medium', 1, 91, 44, 'Millions of years'),
+    ('😀ab', {}, 7, 'very-weak', 0, 24, 75, 'Instant'),
+    ('aB3$xY9#mK2@pL5!qR7t', ALL, 100, 'very-strong', 4, 131, 100, 'Millions of years'),
+]
+
+NODE_SCRIPT = """
+const fs = require('fs');
+const vm = require('vm');
+const context = {};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(process.argv[1], 'utf8'), context);
+const cases = JSON.parse(fs.readFileSync(0, 'utf8'));
+console.log(JSON.stringify(cases.map(([pw, opts]) => context.calculatePasswordStrength(pw, opts))));
+"""
+
+
+def as_js(result):
+    """Convert a Python result to the JS object layout"""
+    details = result['details']
+    return {
+        'score': result['score'],
+        'strength': result['strength'],
+        'strengthText': result['strength_text'],
+        'warningMessage': result['warning_message'],
+        'details': {
+            'length': details['length'],
+            'charTypes': details['char_types'],
+            'entropy': details['entropy'],
+            'uniqueness': details['uniqueness'],
+            'crackTime': details['crack_time'],
+        },
+    }
+
+
+class TestScoringParity:
+    """Test scores match the browser algorithm"""
+
+    @pytest.mark.parametrize('password,options,score,strength,char_types,entropy,'
+                             'uniqueness,crack_time', JS_FIXTURES)
+    def test_js_fixtures(self, password, options, score, strength, char_types,
+                         entropy, uniqueness, crack_time):
+        """Test against values computed by static/script.js"""
+        result = score_password(password, options)
+        assert result['score'] == score
+        assert result['strength'] == strength
+        assert result['details']['char_types'] == char_types
+        assert result['details']['entropy'] == entropy
+        assert result['details']['uniqueness'] == uniqueness
+        assert result['details']['crack_time'] == crack_time
+
+    @pytest.mark.skipif(shutil.which('node') is None, reason='node not installed')
+    def test_randomized_parity_with_node(self):
+        """Test random passwords and options against script.js run in node"""
+        rng = random.Random(1234)
+        alphabet = string.ascii_letters + string.digits + string.punctuation + ' é😀'
+        cases = []
+        for _ in range(500):
+            password = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 40)))
+            options = {key: rng.random() < 0.5 for key in ALL}
+            cases.append([password, options])
+        output = subprocess.run(
+            ['node', '-e', NODE_SCRIPT, os.path.join(ROOT, 'static', 'script.js')],
+            input=json.dumps(cases), capture_output=True, text=True, check=True)
+        expected = json.loads(output.stdout)
+        for (password, options), js_result in zip(cases, expected):
+            assert as_js(score_password(password, options)) == js_result, password
+
+
+class TestScoring:
+    """Test scoring helpers"""
+
+    def test_inferred_options(self):
+        """Test flags are inferred from the password when not supplied"""
+        result = score_password('aB3$xY9#mK2@pL5!qR7t')
+        assert result['details']['char_types'] == 4
+        assert result['strength'] == 'very-strong'
+
+    def test_batch_matches_single(self):
+        """Test the batch path returns the same results as single scoring"""
+        passwords = [fixture[0] for fixture in JS_FIXTURES]
+        assert score_passwords(passwords, ALL) == \
+            [score_password(password, ALL) for password in passwords]
+
+    def test_crack_time_units(self):
+        """Test crack time formatting thresholds"""
+        assert estimate_crack_time(1e9) == 'Instant'
+        assert estimate_crack_time(2e12) == '2 minutes'
+        assert estimate_crack_time(float('inf')) == 'Millions of years'
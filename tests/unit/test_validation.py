@@ -0,0 +1,110 @@
+"""
+Unit tests for request validation
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app import create_app
+import validation
+
+SCHEMA = validation.Schema({
+    'length': (validation.integer(4, 128), 12),
+    'digits': (validation.boolean(), True),
+    'format': (validation.choice('text', 'ndjson'), 'text'),
+})
+
+
+@pytest.fixture
+def client():
+    """Create test client"""
+    return create_app({'TESTING': True, 'MAX_CONTENT_LENGTH': 4096}).test_client()
+
+
+def error_fields(response):
+    data = json.loads(response.data)
+    assert data['success'] is False
+    return {detail['field'] for detail in data['details']}
+
+
+class TestSchema:
+    """Test precompiled schemas"""
+
+    def test_defaults_and_clamping(self):
+        """Test missing and null fields use defaults and integers are clamped"""
+        assert SCHEMA.validate({}) == {'length': 12, 'digits': True, 'format': 'text'}
+        assert SCHEMA.validate({'length': 500, 'digits': None})['length'] == 128
+
+    @pytest.mark.parametrize('data, field', [
+        ({'length': '16'}, 'length'),
+        ({'length': 16.0}, 'length'),
+        ({'length': True}, 'length'),
+        ({'digits': 'false'}, 'digits'),
+        ({'digits': 0}, 'digits'),
+        ({'format': 'xml'}, 'format'),
+        ({'lenght': 16}, 'lenght'),
+    ])
+    def test_rejections(self, data, field):
+        """Test wrong types, strings for booleans and unknown fields"""
+        with pytest.raises(validation.ValidationError) as error:
+            SCHEMA.validate(data)
+        assert error.value.details[0]['field'] == field
+
+    def test_all_errors_reported(self):
+        """Test every invalid field is listed at once"""
+        with pytest.raises(validation.ValidationError) as error:
+            SCHEMA.validate({'length': 'x', 'digits': 'y', 'extra': 1})
+        assert [d['field'] for d in error.value.details] == ['length', 'digits', 'extra']
+
+    def test_body_must_be_object(self):
+        """Test non-object JSON bodies are rejected"""
+        with pytest.raises(validation.ValidationError):
+            SCHEMA.validate([1, 2])
+
+
+class TestRequestValidation:
+    """Test structured errors from every generation endpoint"""
+
+    @pytest.mark.parametrize('path', ['/api/generate', '/api/generate/batch',
+                                      '/api/generate/stream'])
+    def test_structured_400(self, client, path):
+        """Test non-numeric lengths and string booleans return 400, never 500"""
+        response = client.post(path, json={'length': 'abc', 'symbols': 'false'})
+        assert response.status_code == 400
+        assert json.loads(response.data)['error'] == 'validation_error'
+        assert error_fields(response) == {'length', 'symbols'}
+
+    def test_oversized_body_rejected(self, client):
+        """Test bodies above MAX_CONTENT_LENGTH get a JSON 413"""
+        response = client.post('/api/strength',
+                               json={'passwords': ['x' * 100] * 100})
+        assert response.status_code == 413
+        assert json.loads(response.data)['error'] == 'request_too_large'
+
+    def test_invalid_json(self, client):
+        """Test malformed JSON returns a structured 400"""
+        response = client.post('/api/generate', data='{"length": 1',
+                               content_type='application/json')
+        assert response.status_code == 400
+
+    def test_wrong_content_type(self, client):
+        """Test non-JSON bodies return 415"""
+        response = client.post('/api/generate', data='length=12',
+                               content_type='application/x-www-form-urlencoded')
+        assert response.status_code == 415
+
+    def test_empty_body_uses_defaults(self, client):
+        """Test a bodyless POST generates with default options"""
+        response = client.post('/api/generate')
+        assert response.status_code == 200
+        assert len(json.loads(response.data)['password']) == 12
+
+    def test_nested_policy_errors(self, client):
+        """Test policy fields are reported with their path"""
+        response = client.post('/api/generate', json={'policy': {'no_repeats': 'yes'}})
+        assert error_fields(response) == {'policy.no_repeats'}